@@ -0,0 +1,94 @@
+"""
+Compare the overhead of a burst of ChatbotAgent.chat calls with the previous
+implementation, which read the configuration file and built a new client,
+memory and chatbot on every message.
+
+Usage:
+    python benchmarks/chat_benchmark.py [number_of_chats]
+
+The model is a local stub that answers at once, so the times are only the
+per-message overhead of the agent. Both runs go through ChatbotAgent.chat,
+the previous behaviour is emulated by re-reading the configuration and
+dropping the clients and the memory before each message. The stub counts
+the clients it builds and the memory shows how many messages were kept.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fridacli.chatbot import model_manager, ChatbotAgent
+
+current_refresh = model_manager.ModelManager.refresh
+
+
+class StubModel:
+    builds = 0
+
+    def __init__(self, api_key, model_name):
+        StubModel.builds += 1
+        self.model_name = model_name
+
+
+class StubMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class StubResponse:
+    def __init__(self, content, model):
+        self.message = StubMessage(content)
+        self.model = model
+        self.usage = None
+
+
+class StubChatbot:
+    def __init__(self, model, description, memory):
+        self.model = model
+        self.memory = memory
+
+    def chat(self, message):
+        self.memory.add_message(role="user", content=message)
+        self.memory.add_message(role="assistant", content="ok")
+        return StubResponse("ok", self.model.model_name)
+
+
+def legacy_refresh(manager) -> bool:
+    # The previous update_env_vars(): read the file, new client and new memory on every message
+    manager._ModelManager__stamp = None
+    current_refresh(manager)
+    manager.clear()
+    manager.get_session("chat").memory.clear_messages()
+    return True
+
+
+def measure(chat, chats: int) -> float:
+    start = time.perf_counter()
+    for i in range(chats):
+        chat(f"message {i}")
+    return time.perf_counter() - start
+
+
+def main():
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    model_manager.SofttekOpenAI = StubModel
+    model_manager.Chatbot = StubChatbot
+
+    agent = ChatbotAgent()
+    results = {}
+    for label, refresh in (("previous", legacy_refresh), ("manager", current_refresh)):
+        model_manager.ModelManager.refresh = refresh
+        agent.clear_context()
+        StubModel.builds = 0
+        total = measure(lambda message: agent.chat(message, True), chats)
+        results[label] = (total, StubModel.builds, len(agent.context.get_messages()))
+
+    print(f"{chats} chats against a stub model")
+    print(f"{'agent':<10}{'total s':>10}{'per chat ms':>13}{'clients':>9}{'messages kept':>15}")
+    for label, (total, builds, kept) in results.items():
+        print(f"{label:<10}{total:>10.3f}{total / chats * 1000:>13.3f}{builds:>9}{kept:>15}")
+
+
+if __name__ == "__main__":
+    main()
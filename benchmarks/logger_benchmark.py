@@ -0,0 +1,60 @@
+"""
+Compare the synchronous and the queue-based modes of fridacli.logger.Logger.
+
+Usage:
+    python benchmarks/logger_benchmark.py [number_of_lines]
+
+For each mode it reports the number of open() calls, the mean latency of a
+Logger.info call and the total time until every line is on disk.
+"""
+import os
+import sys
+import time
+import builtins
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fridacli.logger import Logger
+
+
+def run(logger: Logger, lines: int):
+    real_open = builtins.open
+    counter = {"open": 0}
+
+    def counting_open(*args, **kwargs):
+        counter["open"] += 1
+        return real_open(*args, **kwargs)
+
+    builtins.open = counting_open
+    try:
+        start = time.perf_counter()
+        for i in range(lines):
+            logger.info(__name__, f"(run) Traversing path: /project/src/module_{i}.py")
+        calls_done = time.perf_counter()
+        logger.flush()
+        end = time.perf_counter()
+    finally:
+        builtins.open = real_open
+    return counter["open"], (calls_done - start) / lines * 1e6, end - start
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logger = Logger()
+    with tempfile.TemporaryDirectory() as tmp:
+        logger.update_log_paths(os.path.join(tmp, ""))
+        results = {}
+        for mode, enabled in (("sync", False), ("async", True)):
+            logger.set_async_mode(enabled)
+            results[mode] = run(logger, lines)
+        logger.set_async_mode(False)
+
+    print(f"{lines} log lines")
+    print(f"{'mode':<8}{'open() calls':>14}{'us/call':>12}{'total s':>10}")
+    for mode, (opens, latency, total) in results.items():
+        print(f"{mode:<8}{opens:>14}{latency:>12.2f}{total:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare running a file with a new interpreter per run, as Python.run did, with
+a warm worker of the Python pool.
+
+Usage:
+    python benchmarks/python_run_benchmark.py [number_of_runs] [python_path]
+
+The file prints a line and imports json, the interpreter defaults to the one
+running the benchmark. The first run of the pool is left out, it is the one
+that waits for the workers to start.
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fridacli.frida_coder.languague.python_pool import PythonWorkerPool
+
+CODE = 'import json\nprint(json.dumps({"result": sum(range(1000))}))\n'
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    python_path = sys.argv[2] if len(sys.argv) > 2 else sys.executable
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "code.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(CODE)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            subprocess.run([python_path, path], capture_output=True, text=True)
+        previous = time.perf_counter() - start
+
+        pool = PythonWorkerPool(python_path)
+        pool.run(path, CODE)
+        start = time.perf_counter()
+        for _ in range(runs):
+            pool.run(path, CODE)
+        warm = time.perf_counter() - start
+        pool.close()
+
+    print(f"{runs} runs with {python_path}")
+    print(f"{'runner':<14}{'total s':>10}{'per run ms':>12}")
+    for label, total in (("subprocess", previous), ("worker pool", warm)):
+        print(f"{label:<14}{total:>10.3f}{total / runs * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
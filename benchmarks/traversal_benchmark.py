@@ -0,0 +1,85 @@
+"""
+Compare the original os.listdir + os.path.isdir traversal with the parallel
+os.scandir traversal of fridacli.file_manager.FileManager.
+
+Usage:
+    python benchmarks/traversal_benchmark.py [number_of_files]
+
+A synthetic project is created in a temporary directory: source folders plus a
+.git folder, a node_modules folder and a virtualenv that the ignore rules skip.
+The new traversal is measured with a cold project index and with a warm one.
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def create_tree(root: str, files: int) -> None:
+    # 80% of the files in the sources, the rest in folders that are ignored
+    layout = [("src", 0.8), (".git/objects", 0.05), ("node_modules", 0.1), (".venv/lib", 0.05)]
+    for folder, share in layout:
+        count = int(files * share)
+        for i in range(count):
+            directory = os.path.join(root, folder, f"pkg_{i // 1000}", f"mod_{i // 50}")
+            if i % 50 == 0:
+                os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"file_{i}.py"), "w") as f:
+                f.write("x = 1\n")
+
+
+def listdir_traversal(path: str, current_node, files: dict) -> None:
+    # The traversal that FileManager used before, with the same Tree and files map
+    from fridacli.file_manager.graph import Tree
+
+    for item in os.listdir(path):
+        item_path = os.path.join(path, item)
+        if os.path.isdir(item_path):
+            child_node = Tree(item_path)
+            current_node.add_children(child_node)
+            listdir_traversal(item_path, child_node, files)
+        else:
+            files[item] = item_path
+            if len(item.split(".")) == 2:
+                current_node.add_children(Tree(item_path))
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the project index of the benchmark out of the real ~/fridacli
+        os.environ["HOME"] = tmp
+        from fridacli.file_manager import FileManager
+        from fridacli.file_manager.graph import Tree
+
+        root = os.path.join(tmp, "project")
+        create_tree(root, files)
+
+        # load_folder also prints the tree, so the old traversal does it too
+        start = time.perf_counter()
+        root_node = Tree(root)
+        listdir_traversal(root, root_node, {})
+        root_node.print_directory()
+        listdir_time = time.perf_counter() - start
+
+        file_manager = FileManager()
+        start = time.perf_counter()
+        file_manager.load_folder(root)
+        cold_time = time.perf_counter() - start
+        loaded_files = len(file_manager.get_files())
+
+        start = time.perf_counter()
+        file_manager.load_folder(root)
+        warm_time = time.perf_counter() - start
+
+    print(f"{files} files, {loaded_files} loaded after the ignore rules")
+    print(f"{'traversal':<28}{'seconds':>10}")
+    print(f"{'listdir + isdir':<28}{listdir_time:>10.3f}")
+    print(f"{'scandir parallel (cold)':<28}{cold_time:>10.3f}")
+    print(f"{'scandir parallel (warm)':<28}{warm_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
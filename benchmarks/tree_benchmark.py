@@ -0,0 +1,115 @@
+"""
+Compare the memory and the render time of fridacli.file_manager.graph.Tree
+with the previous implementation (a __dict__ and a list per node, recursive
+rendering with string concatenation).
+
+Usage:
+    python benchmarks/tree_benchmark.py [number_of_nodes]
+
+The tree has folders of 50 files, 20 folders per parent, so it is shallow
+enough for the previous recursive rendering. A chain of nested folders is
+rendered too, to check the recursion limit.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fridacli.file_manager.graph import Tree
+
+
+class LegacyTree:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.__children = []
+
+    def add_children(self, node):
+        self.__children.append(node)
+
+    def get_children(self):
+        return self.__children
+
+    def print_directory(self, node=None, indent=''):
+        if node == None:
+            node = self
+        tree_string = f"{indent}+ {node.name}/\n"
+
+        for child in node.get_children():
+            if child.get_children():
+                tree_string += self.print_directory(child, indent + '  ')
+            else:
+                tree_string += f"{indent}- {child.name}\n"
+
+        return tree_string
+
+
+def build(tree_class, nodes: int):
+    root = tree_class("/project")
+    created = 1
+    directories = [root]
+    index = 0
+    while created < nodes:
+        parent = directories[index // 20]
+        directory = tree_class(os.path.join(parent.path, f"dir_{index}"))
+        parent.add_children(directory)
+        directories.append(directory)
+        created += 1
+        for i in range(min(50, nodes - created)):
+            directory.add_children(tree_class(os.path.join(directory.path, f"file_{i}.py")))
+            created += 1
+        index += 1
+    return root
+
+
+def measure(tree_class, nodes: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    root = build(tree_class, nodes)
+    build_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    rendered = root.print_directory()
+    render_time = time.perf_counter() - start
+    return memory, build_time, render_time, rendered
+
+
+def render_deep(tree_class, depth: int) -> str:
+    # A chain of nested folders, deeper than the default recursion limit
+    root = node = tree_class("/project")
+    for i in range(depth):
+        child = tree_class(os.path.join(node.path, f"d{i}"))
+        node.add_children(child)
+        node = child
+    node.add_children(tree_class(os.path.join(node.path, "leaf.py")))
+    try:
+        start = time.perf_counter()
+        root.print_directory()
+        return f"{time.perf_counter() - start:.3f}s"
+    except RecursionError:
+        return "RecursionError"
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    results = {}
+    for label, tree_class in (("previous", LegacyTree), ("slots", Tree)):
+        results[label] = measure(tree_class, nodes)
+
+    print(f"{nodes} nodes, same output: {results['previous'][3] == results['slots'][3]}")
+    print(f"{'tree':<10}{'memory MB':>11}{'build s':>10}{'render s':>10}")
+    for label, (memory, build_time, render_time, _) in results.items():
+        print(f"{label:<10}{memory / 2**20:>11.1f}{build_time:>10.3f}{render_time:>10.3f}")
+
+    depth = 5000
+    print(f"\n{depth} nested folders")
+    for label, tree_class in (("previous", LegacyTree), ("slots", Tree)):
+        print(f"{label:<10}{render_deep(tree_class, depth):>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import re
+import time
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import textdistance as td
-from softtek_llm.models import SofttekOpenAI
-from softtek_llm.memory import WindowMemory
-from softtek_llm.chatbots.chatbot import Chatbot
 from .predefined_phrases import (
     chatbot_unauthorized,
     chatbot_badrequest,
@@ -13,16 +14,66 @@ from .predefined_phrases import (
     chatbot_talk_prompt,
     generate_prompt_with_files,
 )
-from fridacli.config import get_config_vars
 from fridacli.prompts_provider.chatbot_prompts import system_prompt
 from fridacli.file_manager import FileManager
 from fridacli.logger import Logger
+from fridacli.logger.metrics import Metrics
 from fridacli.config import SUPPORTED_PROGRAMMING_LANGUAGES
+from .model_manager import ModelManager
+from .response_cache import ResponseCache, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from .context_builder import ContextBuilder, count_tokens, get_context_tokens, FILES_SHARE, MAX_FILES_IN_CONTEXT
+from .streaming import build_messages, stream_completion, get_stream_endpoint
 
 logger = Logger()
+metrics = Metrics()
+response_cache = ResponseCache()
+
+# Calls to the model running at the same time, shared by the sync and the async API
+DEFAULT_LLM_CONCURRENCY = 4
+# Session of the chat view, session=None makes a one-shot call without memory
+DEFAULT_SESSION = "chat"
+
+
+def get_llm_concurrency(env_vars: dict) -> int:
+    """
+        Get the LLM_CONCURRENCY configuration variable, DEFAULT_LLM_CONCURRENCY if it is missing or invalid
+    """
+    try:
+        return max(1, int(env_vars.get("LLM_CONCURRENCY", DEFAULT_LLM_CONCURRENCY)))
+    except (TypeError, ValueError):
+        logger.warning(__name__, "(get_llm_concurrency) Invalid LLM_CONCURRENCY, using %s", DEFAULT_LLM_CONCURRENCY)
+        return DEFAULT_LLM_CONCURRENCY
+
+
+def configure_response_cache(env_vars: dict) -> None:
+    """
+        Apply RESPONSE_CACHE (on/off), RESPONSE_CACHE_TTL_DAYS and RESPONSE_CACHE_MAX_MB to the response cache
+    """
+    try:
+        ttl_days = env_vars.get("RESPONSE_CACHE_TTL_DAYS", "")
+        max_mb = env_vars.get("RESPONSE_CACHE_MAX_MB", "")
+        response_cache.configure(
+            enabled=env_vars.get("RESPONSE_CACHE", "on").lower() not in ("off", "false", "0"),
+            ttl=float(ttl_days) * 24 * 3600 if ttl_days else DEFAULT_TTL,
+            max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES,
+        )
+    except ValueError as e:
+        logger.warning(__name__, "(configure_response_cache) Invalid response cache configuration: %s", e)
 
 
 class ChatbotAgent:
+    """
+    Singleton agent that talks to the model for the chat and the recipes.
+
+    The model clients are kept by a ModelManager, the configuration file is only read again
+    when it changes. Each chat session has its own memory, which survives a change of model,
+    and the recipes make one-shot calls (session=None) that don't read or write any memory.
+    The calls run on a fixed pool of LLM_CONCURRENCY threads. The threads live as long as
+    the agent, so the HTTP session the client keeps in each thread (and its keep-alive
+    connection) is reused by every call instead of being opened by a new thread each time.
+    achat awaits a call without blocking the event loop, chat waits for it, and astream
+    yields the response of the model while it is generated.
+    """
     _instance = None
     SIMILARITY_THRESHOLD = 0.8
 
@@ -33,129 +84,229 @@ class ChatbotAgent:
         return cls._instance        
 
     def __init__(self) -> None:
-        env_vars = get_config_vars()
+        # __new__ already initialized the singleton, ChatbotAgent() must not reset it
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self.__models = ModelManager(system_prompt)
+        self.context = self.__models.get_session(DEFAULT_SESSION).memory
+        self.__version = 3
+        env_vars = self.__models.env_vars
 
         self.__LLMOPS_API_KEY = env_vars["LLMOPS_API_KEY"]
         self.__CHAT_MODEL_NAME = env_vars["CHAT_MODEL_NAME"]
 
-        self.__files_required = set()
+        # Used as an ordered set, the most recently mentioned files last
+        self.__files_required = {}
         self.__file_manager = FileManager()
-        logger.info(__name__, f"""ChatbotAgent init
-            Model name: {self.__CHAT_MODEL_NAME}
-            LLMOPS API key: {self.__LLMOPS_API_KEY}
-        """)
+        self.__context_builder = ContextBuilder(self.__file_manager)
+        self.__concurrency = get_llm_concurrency(env_vars)
+        self.__executor = ThreadPoolExecutor(max_workers=self.__concurrency, thread_name_prefix="fridacli-llm")
+        configure_response_cache(env_vars)
+        logger.debug(__name__, """ChatbotAgent init
+            Model name: %s
+            LLMOPS API key: %s
+        """, self.__CHAT_MODEL_NAME, self.__LLMOPS_API_KEY)
         self.__build_model()
     
     def update_env_vars(self):
-        env_vars = get_config_vars()
-
+        """
+            Apply the configuration file if it changed since the last call.
+        """
+        changed = self.__models.refresh()
+        self.set_concurrency(get_llm_concurrency(self.__models.env_vars))
+        configure_response_cache(self.__models.env_vars)
+        if not changed:
+            return
+        env_vars = self.__models.env_vars
         self.__LLMOPS_API_KEY = env_vars["LLMOPS_API_KEY"]
-        self.__CHAT_MODEL_NAME = env_vars["CHAT_MODEL_NAME"]
+        self.__CHAT_MODEL_NAME = env_vars["CHAT_MODEL_NAME_V4" if self.__version == 4 else "CHAT_MODEL_NAME"]
         self.__build_model()
 
+    def set_concurrency(self, concurrency: int):
+        """
+            Change the number of calls to the model running at the same time, the running calls finish on the old pool.
+        """
+        if concurrency == self.__concurrency:
+            return
+        logger.info(__name__, "(set_concurrency) Changing the LLM concurrency to: %s", concurrency)
+        old_executor = self.__executor
+        self.__concurrency = concurrency
+        self.__executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fridacli-llm")
+        old_executor.shutdown(wait=False)
+
     def __build_model(self):
         """
-            Build the chatbot model using the SofttekOpenAI model.
+            Warm up the client of the current model, it is only built the first time.
         """
-        logger.info(__name__, "Building model")
-        model = SofttekOpenAI(
-            api_key=self.__LLMOPS_API_KEY, model_name=self.__CHAT_MODEL_NAME
-        )
-        self.context = WindowMemory(window_size=10)
-        self.__chatbot = Chatbot(model=model, description=system_prompt, memory=self.context)
+        self.__models.get_client(self.__CHAT_MODEL_NAME)
 
     def is_files_open(self):
         """
             Determine if there are files in context.
         """
-        logger.info(__name__, f"(is_files_open) Files required: {len(self.__files_required)}")
+        logger.debug(__name__, "(is_files_open) Files required: %s", len(self.__files_required))
         return len(self.__files_required) > 0
     
     def change_version(self, version=4):
-        logger.info(__name__, f"(change_version) Changing model version to: {version}")
-        env_vars = get_config_vars()
+        logger.info(__name__, "(change_version) Changing model version to: %s", version)
+        self.__models.refresh()
+        env_vars = self.__models.env_vars
+        self.__version = version
         if version == 3:
             if self.__CHAT_MODEL_NAME != env_vars["CHAT_MODEL_NAME"]:
                 self.__CHAT_MODEL_NAME = env_vars["CHAT_MODEL_NAME"]
                 self.__build_model()
-                logger.info(__name__, f"Model changed to: {self.__chatbot.model.model_name}")
+                logger.info(__name__, "Model changed to: %s", self.__CHAT_MODEL_NAME)
         elif version == 4:
             if self.__CHAT_MODEL_NAME != env_vars["CHAT_MODEL_NAME_V4"]:
                 self.__CHAT_MODEL_NAME = env_vars["CHAT_MODEL_NAME_V4"]
                 self.__build_model()
-                logger.info(__name__, f"Model changed to: {self.__chatbot.model.model_name}")
+                logger.info(__name__, "Model changed to: %s", self.__CHAT_MODEL_NAME)
 
     def get_files_required(self):
         """
             Get the files required in context.
         """
-        logger.info(__name__, f"(get_files_required) Files required: {str(self.__files_required)}")
-        return self.__files_required
+        logger.debug(__name__, "(get_files_required) Files required: %s", self.__files_required)
+        return list(self.__files_required)
 
     def add_files_required(self, files, special_file):
         """
             Add files to the context.
         """
-        logger.info(__name__, f"(add_files_required) Adding files to context with files: {str(files)} and special_file: {special_file}")
-        if len(files) > 0:
-            for file in files:
-                self.__files_required.add(file)
+        logger.debug(__name__, "(add_files_required) Adding files to context with files: %s and special_file: %s", files, special_file)
+        for file in list(files) + ([special_file] if special_file != "" else []):
+            # Mentioning a file again makes it the most recent one
+            self.__files_required.pop(file, None)
+            self.__files_required[file] = True
 
-        if special_file != "":
-            self.__files_required.add(special_file)
+        for file in list(self.__files_required):
+            if self.__file_manager.get_file_path(file) == -1:
+                self.__files_required.pop(file)
+        while len(self.__files_required) > MAX_FILES_IN_CONTEXT:
+            dropped = next(iter(self.__files_required))
+            logger.debug(__name__, "(add_files_required) Dropping the oldest file from context: %s", dropped)
+            self.__files_required.pop(dropped)
+
+    def remove_files_required(self, files):
+        """
+            Remove files from the context.
+        """
+        for file in files:
+            self.__files_required.pop(file, None)
 
     def is_file_format(self, word):
         """
             Determine if a word follows the file format (name.extension).
         """
-        logger.info(__name__, f"(is_file_format) Checking if word: {word} is file format")
-        pattern = f'^[a-zA-Z_][a-zA-Z0-9_]*({ "|".join(SUPPORTED_PROGRAMMING_LANGUAGES)})$'
+        logger.debug(__name__, "(is_file_format) Checking if word: %s is file format", word)
+        pattern = f'^(?:[\\w.-]+/)*[a-zA-Z_][a-zA-Z0-9_]*({ "|".join(SUPPORTED_PROGRAMMING_LANGUAGES)})$'
         match = re.match(pattern, word)
-        logger.info(__name__, f"(is_file_format) Word: {word} is file format: {str(bool(match))}")
+        logger.debug(__name__, "(is_file_format) Word: %s is file format: %s", word, bool(match))
         return bool(match)
 
     def get_matching_files(self, message, available_files):
         """
             Get the matching files in the message.
         """
-        logger.info(__name__, f"(get_matching_files) Getting matching files in message: {str(message)}")
+        logger.debug(__name__, "(get_matching_files) Getting matching files in message: %s", message)
         message_words = message.split(" ")
         located_files = []
 
-        all_files = self.__file_manager.get_files()
-
         for word in message_words:
             if self.is_file_format(word):
-                if word in all_files and word not in available_files:
-                    located_files.append(self.__file_manager.get_file_path(word))
+                # A name shared by several files matches all of them, a path with folders narrows it down
+                for file in self.__file_manager.find_files(word):
+                    if file not in available_files:
+                        located_files.append(self.__file_manager.get_file_path(file))
 
         return located_files
     
 
-    def decorate_prompt(self, message):
+    def get_context_budget(self, message):
+        """
+            Get the tokens the files can use in a prompt for the current model, CONTEXT_TOKEN_BUDGET overrides it.
+        """
+        budget = self.__models.env_vars.get("CONTEXT_TOKEN_BUDGET", "")
+        try:
+            budget = int(budget) if budget else int(get_context_tokens(self.__CHAT_MODEL_NAME) * FILES_SHARE)
+        except ValueError:
+            logger.warning(__name__, "(get_context_budget) Invalid CONTEXT_TOKEN_BUDGET: %s", budget)
+            budget = int(get_context_tokens(self.__CHAT_MODEL_NAME) * FILES_SHARE)
+        return max(0, budget - count_tokens(message) - count_tokens(chatbot_with_file_prompt))
+
+    def decorate_prompt(self, message, session=DEFAULT_SESSION):
         """
             Decorate the prompt with the required files.
         """
 
-        logger.info(__name__, f"(decorate_prompt) Decorating prompt: {message}")
+        logger.debug(__name__, "(decorate_prompt) Decorating prompt: %s", message)
 
         if len(self.__files_required) > 0:
             # When files are in context, generate a prompt by incorporating the required files.
-            message = generate_prompt_with_files(
-                message, self.__files_required, self.__file_manager
+            sections = self.__context_builder.build(
+                message,
+                list(self.__files_required),
+                self.get_context_budget(message),
+                self.__models.get_session(session) if session is not None else None,
+                # Each turn keeps two messages in the memory
+                self.__models.window_size // 2,
             )
+            message = generate_prompt_with_files(message, sections)
             return message
         return chatbot_without_file_prompt(message)
 
-    def __exec_chat(self, message: str):
+    def __record_call(self, response, wall_time: float, recipe: str, retries: int, cached: bool = False):
+        """
+            Record the token usage and the latency of a call to the model.
+        """
+        usage = getattr(response, "usage", None)
+        metrics.record_llm_call(
+            cached=cached,
+            model=getattr(response, "model", None) or self.__CHAT_MODEL_NAME,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            wall_time=wall_time,
+            retries=retries,
+            recipe=recipe,
+            success=response is not None or cached,
+        )
+
+    def __exec_chat(self, message: str, recipe: str = "chat", retries: int = 0, session: str = DEFAULT_SESSION, cache: bool = True):
         """
             Execute the chat function.
         """
+        start = time.perf_counter()
+        # Only one-shot calls are cached, a retry means the cached response wasn't valid
+        use_cache = cache and session is None
+        if use_cache and retries == 0:
+            cached = response_cache.get(self.__CHAT_MODEL_NAME, message)
+            if cached is not None:
+                logger.debug(__name__, "(__exec_chat) Response cache hit for recipe: %s", recipe)
+                self.__record_call(None, time.perf_counter() - start, recipe, retries, cached=True)
+                return cached
         try:
-            response = self.__chatbot.chat(message)
-            logger.info(__name__, f"(__exec_chat) Chat response: {response}")
+            if session is None:
+                response = self.__models.get_chatbot(self.__CHAT_MODEL_NAME).chat(message)
+            else:
+                chat_session = self.__models.get_session(session)
+                # The messages of a session are sent and appended in order, one call at a time
+                with chat_session.lock:
+                    try:
+                        response = self.__models.get_chatbot(self.__CHAT_MODEL_NAME, chat_session).chat(message)
+                    except Exception:
+                        chat_session.discard_sent_files()
+                        raise
+                    chat_session.turns += 1
+                    chat_session.confirm_sent_files()
+            self.__record_call(response, time.perf_counter() - start, recipe, retries)
+            logger.debug(__name__, "(__exec_chat) Chat response: %s", response)
+            if use_cache:
+                response_cache.put(self.__CHAT_MODEL_NAME, message, response.message.content)
             return response.message.content
         except Exception as e:
+            self.__record_call(None, time.perf_counter() - start, recipe, retries)
             if e == "Unauthorized":
                 error_message = chatbot_unauthorized
             elif (
@@ -171,28 +322,135 @@ class ChatbotAgent:
             # system.notification(error_message, bottom=0)
             return "An error has occurred"
 
-    def clear_context(self):
+    def clear_context(self, session=DEFAULT_SESSION):
         """
-            Clear the context.
+            Clear the context of a session.
+        """
+        logger.info(__name__, "(clear_context) Clearing context of session: %s", session)
+        chat_session = self.__models.get_session(session)
+        with chat_session.lock:
+            chat_session.clear()
+
+    def close_session(self, session):
+        """
+            Forget a session and its messages.
+        """
+        logger.info(__name__, "(close_session) Closing session: %s", session)
+        self.__models.remove_session(session)
+
+    def chat(self, message, special_prompt=False, recipe="chat", retries=0, session=DEFAULT_SESSION, cache=True):
+        """
+        Chat with the model and wait for the response.
+        recipe and retries are only used to label the call in stats.log.
+        session is the conversation the message belongs to, None for a one-shot call without memory.
+        The responses of one-shot calls are kept in the response cache, cache=False skips it.
+        """
+        return self.__executor.submit(self.__chat, message, special_prompt, recipe, retries, session, cache).result()
+
+    async def achat(self, message, special_prompt=False, recipe="chat", retries=0, session=DEFAULT_SESSION, cache=True):
+        """
+        Chat with the model without blocking the event loop, several calls can be awaited at once
+        (for example with asyncio.gather), at most LLM_CONCURRENCY of them reach the model at the same time.
+        """
+        future = self.__executor.submit(self.__chat, message, special_prompt, recipe, retries, session, cache)
+        return await asyncio.wrap_future(future)
+
+    async def astream(self, message, special_prompt=False, recipe="chat", session=DEFAULT_SESSION):
         """
-        logger.info(__name__, "(clear_context) Clearing context")
-        self.context.clear_messages()
+        Chat with the model and yield the text of the response as it arrives, for the chat view.
+        The request runs in the pool of the agent, the chunks are passed to the event loop as they come.
+        If the model can't stream, the whole response is yielded at once.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+
+        def on_chunk(chunk):
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+        future = self.__executor.submit(self.__stream_chat, message, special_prompt, recipe, session, on_chunk)
+        # None marks the end of the response, also when the call failed
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(chunks.put_nowait, None))
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        await asyncio.wrap_future(future)
+
+    def __stream_chat(self, message, special_prompt, recipe, session, on_chunk):
+        """
+        Execute a streamed chat, the messages of the session are only updated once the response is complete.
+        """
+        self.update_env_vars()
+        if not special_prompt:
+            message = self.decorate_prompt(message, session)
+        start = time.perf_counter()
+        chat_session = self.__models.get_session(session) if session is not None else None
+        model_name = self.__CHAT_MODEL_NAME
+        endpoint = get_stream_endpoint(self.__models.env_vars)
+        if endpoint is None:
+            logger.debug(__name__, "(__stream_chat) LLMOPS_API_BASE isn't configured, the response isn't streamed")
+            on_chunk(self.__exec_chat(message, recipe, 0, session, False))
+            return
+        received = []
+        streamed = True
+        with chat_session.lock if chat_session is not None else contextlib.nullcontext():
+            memory = chat_session.memory if chat_session is not None else None
+            try:
+                messages = build_messages(self.__models.description, memory, message)
+                for chunk in stream_completion(endpoint, model_name, messages):
+                    if not received:
+                        logger.debug(__name__, "(__stream_chat) First chunk after %.3f s", time.perf_counter() - start)
+                    received.append(chunk)
+                    on_chunk(chunk)
+            except Exception as e:
+                logger.error(__name__, "(__stream_chat) Error streaming the response: %s", e)
+                streamed = False
+            if streamed and memory is not None:
+                memory.add_message(role="user", content=message)
+                memory.add_message(role="assistant", content="".join(received))
+                chat_session.turns += 1
+                chat_session.confirm_sent_files()
+            elif chat_session is not None and received:
+                # The partial response isn't kept in the memory. When nothing arrived __exec_chat records the files
+                chat_session.discard_sent_files()
+        if streamed:
+            self.__record_stream(model_name, message, "".join(received), start, recipe, True)
+        elif received:
+            on_chunk("\n\nAn error has occurred")
+            self.__record_stream(model_name, message, "".join(received), start, recipe, False)
+        else:
+            # Nothing arrived, the response is requested without streaming
+            on_chunk(self.__exec_chat(message, recipe, 0, session, False))
+
+    def __record_stream(self, model_name, message, response, start, recipe, success):
+        """
+            Record a streamed call, the usage isn't sent with the chunks so the tokens are estimated.
+        """
+        metrics.record_llm_call(
+            model=model_name,
+            prompt_tokens=count_tokens(message),
+            completion_tokens=count_tokens(response),
+            wall_time=time.perf_counter() - start,
+            recipe=recipe,
+            success=success,
+        )
 
-    def chat(self, message, special_prompt=False):
+    def __chat(self, message, special_prompt=False, recipe="chat", retries=0, session=DEFAULT_SESSION, cache=True):
         """
         TODO:
             The chatbot is incapable to response simple questions like:
             how are you, since it tries to responde with code
         """
         self.update_env_vars()
-        logger.info(__name__, f"(chat) Chat with message: {message} and special_prompt: {special_prompt}")
+        logger.debug(__name__, "(chat) Chat with message: %s and special_prompt: %s", message, special_prompt)
         response = ""
         if not special_prompt:
-            logger.info(__name__, "helloooo")
-            message = self.decorate_prompt(message)
-            logger.info(__name__, f"Decorated message: {message}")
-            response = self.__exec_chat(message)
+            logger.debug(__name__, "helloooo")
+            message = self.decorate_prompt(message, session)
+            logger.debug(__name__, "Decorated message: %s", message)
+            response = self.__exec_chat(message, recipe, retries, session, cache)
             return response
 
-        response = self.__exec_chat(message)
+        response = self.__exec_chat(message, recipe, retries, session, cache)
         return response
@@ -0,0 +1,151 @@
+import os
+import re
+import hashlib
+from fridacli.file_manager.outline import get_outline, is_supported
+from fridacli.logger import Logger
+
+logger = Logger()
+
+# Context window (tokens) of the known models, matched by the longest prefix of the model name
+MODEL_CONTEXT_TOKENS = {
+    "gpt-35-turbo-16k": 16384,
+    "gpt-35-turbo": 4096,
+    "gpt-3.5-turbo-16k": 16384,
+    "gpt-3.5-turbo": 4096,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4": 8192,
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+# Part of the context window the files can use, the rest is for the history and the response
+FILES_SHARE = 0.5
+# Tokens a file gets at least when several files share the budget
+MIN_FILE_TOKENS = 64
+# Files kept in the chat context, the least recently mentioned ones are dropped
+MAX_FILES_IN_CONTEXT = 8
+COLLAPSED = "..."
+UNCHANGED = "(unchanged, its content was already sent above in this conversation)"
+
+
+def count_tokens(text: str) -> int:
+    """
+        Estimate the tokens of a text, about 4 characters per token for code and English
+    """
+    return (len(text) + 3) // 4
+
+
+def get_context_tokens(model_name: str) -> int:
+    """
+        Get the context window of a model, DEFAULT_CONTEXT_TOKENS if it is unknown
+    """
+    name = (model_name or "").lower()
+    matches = [prefix for prefix in MODEL_CONTEXT_TOKENS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_TOKENS
+    return MODEL_CONTEXT_TOKENS[max(matches, key=len)]
+
+
+class ContextBuilder:
+    """
+    Builds the file sections of a chat prompt within a token budget.
+
+    Attributes:
+        - file_manager (FileManager): Used to read the files.
+
+    The files are ranked: the ones named in the message first, then the most recently
+    added. A file that doesn't fit is trimmed to its outline (the headers of its classes
+    and functions) keeping the bodies of the symbols named in the message. A section the
+    session already received, still inside its memory window, is replaced by a short note.
+    """
+
+    def __init__(self, file_manager) -> None:
+        self.file_manager = file_manager
+
+    def build(self, message: str, files: list, budget: int, session=None, window_turns: int = 0) -> list:
+        """
+            Get the (file, content) sections for the files, within budget tokens
+        """
+        words = set(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", message))
+
+        def rank(item):
+            position, file = item
+            return (os.path.basename(file) not in message, -position)
+
+        ranked = sorted(enumerate(files), key=rank)
+        sections = []
+        remaining = budget
+        for position, (_, file) in enumerate(ranked):
+            text = self.file_manager.get_file_content(file)
+            if text is None:
+                continue
+            files_left = len(ranked) - position
+            reserved = (files_left - 1) * MIN_FILE_TOKENS
+            if count_tokens(text) <= remaining - reserved:
+                content = text
+            else:
+                content = self.trim(text, os.path.splitext(file)[1], words, max(MIN_FILE_TOKENS, remaining // files_left))
+            content = self.__deduplicate(file, content, session, window_turns)
+            remaining -= count_tokens(content)
+            sections.append((file, content))
+        logger.debug(
+            __name__,
+            "(build) %s files in %s of %s tokens",
+            len(sections),
+            budget - remaining,
+            budget,
+        )
+        return sections
+
+    def trim(self, text: str, extension: str, words: set, budget: int) -> str:
+        """
+            Fit a file in budget tokens: outline with the bodies of the named symbols, then a cut
+        """
+        if is_supported(extension):
+            lines = text.split("\n")
+            outline = get_outline(text, extension)
+            if outline:
+                text = "\n".join(self.__render(lines, outline, words))
+                if count_tokens(text) <= budget:
+                    return text
+        # Cut on a line boundary and say so
+        limit = max(0, budget * 4 - len(COLLAPSED) - 1)
+        cut = text[:limit]
+        if "\n" in cut:
+            cut = cut[: cut.rindex("\n")]
+        return f"{cut}\n{COLLAPSED}"
+
+    def __render(self, lines: list, symbols: list, words: set, start: int = 0, end: int = None) -> list:
+        """
+            The lines from start to end, with the symbols not named in the message collapsed to their headers
+        """
+        end = len(lines) if end is None else end
+        result = []
+        position = start
+        for symbol in symbols:
+            result.extend(lines[position : symbol.start])
+            if symbol.name in words:
+                result.extend(lines[symbol.start : symbol.end + 1])
+            else:
+                result.extend(lines[symbol.start : symbol.header_end])
+                if symbol.children:
+                    # The class stays an outline of its members
+                    result.extend(self.__render(lines, symbol.children, words, symbol.header_end, symbol.header_end))
+                elif symbol.header_end <= symbol.end:
+                    header = lines[symbol.start]
+                    indent = header[: len(header) - len(header.lstrip())]
+                    result.append(f"{indent}    {COLLAPSED}")
+            position = symbol.end + 1
+        result.extend(lines[position:end])
+        return result
+
+    def __deduplicate(self, file: str, content: str, session, window_turns: int) -> str:
+        if session is None:
+            return content
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        sent = session.sent_files.get(file)
+        if sent is not None and sent[0] == digest and session.turns - sent[1] < window_turns:
+            return UNCHANGED
+        # Recorded as sent once the response arrives, a failed call sends the file again
+        session.pending_files[file] = (digest, session.turns)
+        return content
@@ -0,0 +1,146 @@
+import os
+import threading
+from softtek_llm.models import SofttekOpenAI
+from softtek_llm.memory import WindowMemory
+from softtek_llm.chatbots.chatbot import Chatbot
+from fridacli.config import get_config_vars, config_file_path
+from fridacli.logger import Logger
+
+logger = Logger()
+
+# Configuration variables that change the model clients
+MODEL_KEYS = ("LLMOPS_API_KEY", "CHAT_MODEL_NAME", "CHAT_MODEL_NAME_V4")
+
+
+class ChatSession:
+    """
+    An isolated conversation: its own memory and a lock so only one call uses it at a time.
+
+    Attributes:
+        - name (str): The name of the session.
+        - memory (WindowMemory): The messages of the conversation.
+        - lock (threading.Lock): Held while a call reads and updates the memory.
+        - turns (int): The number of messages sent in the session.
+        - sent_files (dict): For each file the digest of the content sent and the turn it was sent.
+        - pending_files (dict): The files of the prompt being sent, they are moved to sent_files once the response arrives.
+    """
+
+    def __init__(self, name: str, window_size: int) -> None:
+        self.name = name
+        self.memory = WindowMemory(window_size=window_size)
+        self.lock = threading.Lock()
+        self.turns = 0
+        self.sent_files = {}
+        self.pending_files = {}
+
+    def confirm_sent_files(self) -> None:
+        """
+            The model received the prompt, its files can be deduplicated in the next turns
+        """
+        self.sent_files.update(self.pending_files)
+        self.pending_files = {}
+
+    def discard_sent_files(self) -> None:
+        """
+            The call failed, the model never saw the files of the prompt
+        """
+        self.pending_files = {}
+
+    def clear(self) -> None:
+        self.memory.clear_messages()
+        self.turns = 0
+        self.sent_files = {}
+        self.pending_files = {}
+
+
+class ModelManager:
+    """
+    Keeps the model clients of the chatbot, the configuration they were built with and the chat sessions.
+
+    Attributes:
+        - description (str): The system prompt of the chatbots.
+        - window_size (int): The number of messages each session remembers.
+        - env_vars (dict): The configuration variables read the last time the file changed.
+        - __stamp (tuple): (mtime_ns, size) of the configuration file when it was read.
+        - __clients (dict): A warm SofttekOpenAI client for each (api key, model name).
+        - __sessions (dict): The ChatSession of each name, they survive a change of model.
+
+    The configuration file is only read again when its mtime or size change, and a client
+    is only built the first time a model is used with an api key. Every session and every
+    one-shot call gets its own Chatbot over the shared client, so they never see each other's messages.
+    """
+
+    def __init__(self, description: str, window_size: int = 10, path: str = config_file_path) -> None:
+        self.description = description
+        self.window_size = window_size
+        self.env_vars = {}
+        self.__path = path
+        self.__stamp = None
+        self.__clients = {}
+        self.__sessions = {}
+        self.__lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+            Read the configuration again if the file changed, returns True if a key of the model changed
+        """
+        try:
+            stat = os.stat(self.__path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        with self.__lock:
+            if stamp is not None and stamp == self.__stamp:
+                return False
+            env_vars = get_config_vars(self.__path)
+            changed = any(env_vars.get(key) != self.env_vars.get(key) for key in MODEL_KEYS)
+            if env_vars.get("LLMOPS_API_KEY") != self.env_vars.get("LLMOPS_API_KEY"):
+                # The clients of the old api key won't be used again
+                self.__clients = {}
+            self.env_vars = env_vars
+            self.__stamp = stamp
+        if changed:
+            logger.info(__name__, "(refresh) The model configuration changed")
+        return changed
+
+    def get_client(self, model_name: str) -> SofttekOpenAI:
+        """
+            Get the client of a model with the configured api key, building it the first time
+        """
+        api_key = self.env_vars.get("LLMOPS_API_KEY", "")
+        key = (api_key, model_name)
+        with self.__lock:
+            client = self.__clients.get(key)
+            if client is None:
+                logger.info(__name__, "(get_client) Building model: %s", model_name)
+                client = self.__clients[key] = SofttekOpenAI(api_key=api_key, model_name=model_name)
+            return client
+
+    def get_session(self, name: str) -> ChatSession:
+        """
+            Get a session by its name, creating it the first time
+        """
+        with self.__lock:
+            session = self.__sessions.get(name)
+            if session is None:
+                session = self.__sessions[name] = ChatSession(name, self.window_size)
+            return session
+
+    def remove_session(self, name: str) -> None:
+        with self.__lock:
+            self.__sessions.pop(name, None)
+
+    def get_chatbot(self, model_name: str, session: ChatSession = None) -> Chatbot:
+        """
+            Get a chatbot of a model over the memory of a session, or over an empty memory for a one-shot call
+        """
+        memory = session.memory if session is not None else WindowMemory(window_size=self.window_size)
+        return Chatbot(model=self.get_client(model_name), description=self.description, memory=memory)
+
+    def clear(self) -> None:
+        """
+            Forget the clients, the sessions are kept
+        """
+        with self.__lock:
+            self.__clients = {}
@@ -58,7 +58,7 @@ In the first line, add a comment with a brief description (4 words) of the code.
 IMPORTANT: Not include input statements in the code insted add fixed variables with the test value.
 """
 
-def generate_prompt_with_files(message, files_required, file_manager):
+def generate_prompt_with_files(message, sections):
     # Generate a prompt by incorporating the required files.
     """
     Create a list of steps and generate the necessary code, if needed, to accomplish the following instruction.
@@ -68,9 +68,10 @@ def generate_prompt_with_files(message, files_required, file_manager):
     """
     lines = [message, chatbot_with_file_prompt]
 
-    for file in files_required:
+    # sections are the (file, content) pairs built by the ContextBuilder, within the token budget
+    for file, content in sections:
         lines.append(f"{file}:")
-        lines.append(file_manager.get_file_content(file))
+        lines.append(content)
 
     result_string = "\n".join(lines)
     return result_string + "\n"
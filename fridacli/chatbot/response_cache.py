@@ -0,0 +1,196 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from fridacli.config import FRIDA_DIR_PATH
+from fridacli.logger import Logger
+
+logger = Logger()
+
+RESPONSE_CACHE_PATH = os.path.join(FRIDA_DIR_PATH, "response_cache.sqlite3")
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# Stored responses between two checks of the size budget
+EVICTION_INTERVAL = 50
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+        Remove the differences that don't change a prompt: line endings, trailing spaces and the common indentation
+    """
+    lines = [line.rstrip() for line in prompt.replace("\r\n", "\n").split("\n")]
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    indents = [len(line) - len(line.lstrip()) for line in lines if line]
+    indent = min(indents) if indents else 0
+    return "\n".join(line[indent:] for line in lines)
+
+
+def get_cache_key(model_name: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Singleton on-disk cache of the responses of the model to one-shot prompts.
+
+    Attributes:
+        - enabled (bool): When False nothing is read or stored.
+        - ttl (float): Seconds a response stays valid, 0 keeps it until it is evicted by size.
+        - max_bytes (int): Budget of the stored responses, the least recently used ones are evicted first.
+        - __connection (sqlite3.Connection): The database in ~/fridacli/response_cache.sqlite3.
+
+    The key is the model name and the hash of the normalized prompt. Only prompts whose
+    response doesn't depend on a conversation can be cached (session=None).
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ResponseCache, cls).__new__(cls)
+            cls._instance.enabled = True
+            cls._instance.ttl = DEFAULT_TTL
+            cls._instance.max_bytes = DEFAULT_MAX_BYTES
+            cls._instance.__path = RESPONSE_CACHE_PATH
+            cls._instance.__connection = None
+            cls._instance.__bytes = 0
+            cls._instance.__stores = 0
+            cls._instance.__hits = 0
+            cls._instance.__misses = 0
+            cls._instance.__evictions = 0
+            cls._instance.__lock = threading.Lock()
+        return cls._instance
+
+    def configure(self, enabled: bool = None, ttl: float = None, max_bytes: int = None, path: str = None) -> None:
+        """
+            Update the settings, None keeps the current value
+        """
+        with self.__lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if ttl is not None:
+                self.ttl = ttl
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if path is not None and path != self.__path:
+                self.__close()
+                self.__path = path
+
+    def get(self, model_name: str, prompt: str):
+        """
+            Get the cached response of a prompt, None if there is none or it expired
+        """
+        if not self.enabled:
+            return None
+        key = get_cache_key(model_name, prompt)
+        now = time.time()
+        with self.__lock:
+            try:
+                connection = self.__connect()
+                row = connection.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or (self.ttl and now - row[1] > self.ttl):
+                    self.__misses += 1
+                    return None
+                connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                connection.commit()
+                self.__hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                logger.error(__name__, "(get) Error reading the response cache: %s", e)
+                return None
+
+    def put(self, model_name: str, prompt: str, response: str) -> None:
+        """
+            Store the response of a prompt
+        """
+        if not self.enabled:
+            return
+        key = get_cache_key(model_name, prompt)
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.__lock:
+            try:
+                connection = self.__connect()
+                previous = connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_name, response, size, now, now),
+                )
+                self.__bytes += size - (previous[0] if previous else 0)
+                self.__stores += 1
+                if self.__bytes > self.max_bytes or self.__stores % EVICTION_INTERVAL == 0:
+                    self.__evict(now)
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.error(__name__, "(put) Error writing the response cache: %s", e)
+
+    def clear(self) -> None:
+        with self.__lock:
+            try:
+                connection = self.__connect()
+                connection.execute("DELETE FROM responses")
+                connection.commit()
+                self.__bytes = 0
+            except sqlite3.Error as e:
+                logger.error(__name__, "(clear) Error clearing the response cache: %s", e)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "bytes": self.__bytes,
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+            }
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            # The lock of the cache serializes the threads that share the connection
+            connection = sqlite3.connect(self.__path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT,
+                    size INTEGER,
+                    created REAL,
+                    last_used REAL
+                )"""
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self.__bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self.__connection = connection
+        return self.__connection
+
+    def __close(self) -> None:
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __evict(self, now: float) -> None:
+        connection = self.__connection
+        if self.ttl:
+            removed = connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,)).rowcount
+            self.__evictions += max(0, removed)
+            self.__bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self.__bytes <= self.max_bytes:
+            return
+        # Oldest first until the budget is met
+        rows = connection.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if self.__bytes <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.__bytes -= size
+            self.__evictions += 1
+        logger.debug(__name__, "(__evict) Response cache at %s bytes", self.__bytes)
@@ -0,0 +1,60 @@
+import openai
+from fridacli.logger import Logger
+
+logger = Logger()
+
+
+def get_message_dict(message) -> dict:
+    """
+        Get the role and the content of a message of the memory, a schema object or a dict
+    """
+    if isinstance(message, dict):
+        return {"role": message["role"], "content": message["content"]}
+    return {"role": message.role, "content": message.content}
+
+
+def build_messages(description: str, memory, message: str) -> list:
+    """
+        Get the messages of a request: the system prompt, the memory of the session and the new message
+    """
+    messages = [{"role": "system", "content": description}]
+    if memory is not None:
+        messages.extend(get_message_dict(m) for m in memory.get_messages())
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+def get_stream_endpoint(env_vars: dict):
+    """
+        Get the settings of the streamed requests from the configuration, None if LLMOPS_API_BASE isn't set.
+        The key must only be sent to the configured endpoint, never to the default of the openai module.
+    """
+    api_base = (env_vars.get("LLMOPS_API_BASE") or "").strip()
+    if not api_base:
+        return None
+    endpoint = {"api_key": env_vars.get("LLMOPS_API_KEY", ""), "api_base": api_base}
+    if env_vars.get("LLMOPS_API_TYPE"):
+        endpoint["api_type"] = env_vars["LLMOPS_API_TYPE"]
+    if env_vars.get("LLMOPS_API_VERSION"):
+        endpoint["api_version"] = env_vars["LLMOPS_API_VERSION"]
+    return endpoint
+
+
+def stream_completion(endpoint: dict, model_name: str, messages: list):
+    """
+        Request a chat completion with stream=True to the configured endpoint and yield the text of each chunk as it arrives
+    """
+    if not endpoint or not endpoint.get("api_base"):
+        raise ValueError("LLMOPS_API_BASE isn't configured, the response can't be streamed")
+    kwargs = dict(endpoint)
+    if kwargs.get("api_type", "").lower().startswith("azure"):
+        kwargs["engine"] = model_name
+    else:
+        kwargs["model"] = model_name
+    for chunk in openai.ChatCompletion.create(messages=messages, stream=True, **kwargs):
+        choices = chunk.get("choices") or []
+        if not choices:
+            continue
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
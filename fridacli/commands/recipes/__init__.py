@@ -9,10 +9,10 @@ chatbot_agent = ChatbotAgent()
 file_manager = FileManager()
 frida_coder = FridaCoder()
 
-async def document_files(formats, method, doc_path, use_formatter):
+async def document_files(formats, method, doc_path, use_formatter, cancel_event=None, incremental=False):
     #chatbot_agent.update_env_vars()
-    return await exec_document(formats, method, doc_path, use_formatter, chatbot_agent, file_manager, frida_coder)
+    return await exec_document(formats, method, doc_path, use_formatter, chatbot_agent, file_manager, frida_coder, cancel_event=cancel_event, incremental=incremental)
 
-def generate_epics(text, path):
+async def generate_epics(text, path):
     #chatbot_agent.update_env_vars()
-    exec_generate_epics(chatbot_agent, text, path)
+    await exec_generate_epics(chatbot_agent, text, path)
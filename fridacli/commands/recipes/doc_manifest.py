@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import threading
+from fridacli.config import FRIDA_DIR_PATH
+from fridacli.logger import Logger
+
+logger = Logger()
+
+DOC_MANIFEST_PATH = os.path.join(FRIDA_DIR_PATH, "doc_manifest")
+MANIFEST_VERSION = 1
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_function_keys(functions: list) -> list:
+    """
+        Get a key for each function: its definition, numbered when several functions share it
+    """
+    keys, seen = [], {}
+    for func in functions:
+        count = seen.get(func["definition"], 0)
+        seen[func["definition"]] = count + 1
+        keys.append(f"{func['definition']}#{count}")
+    return keys
+
+
+def hash_function(func: dict) -> str:
+    return hash_text(func["definition"] + func["body"])
+
+
+class DocManifest:
+    """
+    What the documentation recipe left in each file the last time it ran on a project.
+
+    Attributes:
+        - root (str): The project folder.
+        - __files (dict): For each file (relative path) the hash of its content and the hash
+          of each function, keyed by get_function_keys. Saved in ~/fridacli/doc_manifest.
+
+    The hashes are taken after the documented code is written, so a function whose hash
+    didn't change since then was not edited and keeps the documentation it got.
+    """
+
+    def __init__(self, root: str, manifest_dir: str = DOC_MANIFEST_PATH) -> None:
+        self.root = root
+        digest = hashlib.sha1(root.encode("utf-8")).hexdigest()
+        self.__path = os.path.join(manifest_dir, f"{digest}.json")
+        self.__files = {}
+        self.__lock = threading.Lock()
+        self.__load()
+
+    def __load(self) -> None:
+        try:
+            if not os.path.exists(self.__path):
+                return
+            with open(self.__path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION and data.get("root") == self.root:
+                self.__files = data.get("files", {})
+        except Exception as e:
+            logger.error(__name__, "(__load) Error reading the documentation manifest: %s", e)
+            self.__files = {}
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            with self.__lock:
+                data = json.dumps(
+                    {"version": MANIFEST_VERSION, "root": self.root, "files": self.__files},
+                    separators=(",", ":"),
+                )
+            tmp_path = f"{self.__path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.__path)
+        except Exception as e:
+            logger.error(__name__, "(save) Error saving the documentation manifest: %s", e)
+
+    def is_file_unchanged(self, file: str, code: str) -> bool:
+        """
+            Check if a file has the content it had after the last run
+        """
+        with self.__lock:
+            entry = self.__files.get(file)
+        return entry is not None and entry["hash"] == hash_text(code)
+
+    def get_pending_functions(self, file: str, functions: list) -> list:
+        """
+            For each function, True if it must be documented: it has no doc comment or it changed since the last run
+        """
+        with self.__lock:
+            recorded = self.__files.get(file, {}).get("functions", {})
+        pending = []
+        for key, func in zip(get_function_keys(functions), functions):
+            previous = recorded.get(key)
+            changed = previous is not None and previous != hash_function(func)
+            pending.append(not func.get("comments") or changed)
+        return pending
+
+    def record(self, file: str, code: str, functions: list) -> None:
+        """
+            Keep the hashes of a file as the recipe left it
+        """
+        entry = {
+            "hash": hash_text(code),
+            "functions": {
+                key: hash_function(func) for key, func in zip(get_function_keys(functions), functions)
+            },
+        }
+        with self.__lock:
+            self.__files[file] = entry
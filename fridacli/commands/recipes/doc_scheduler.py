@@ -0,0 +1,163 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from fridacli.file_manager.graph import Graph
+from fridacli.logger import Logger
+
+logger = Logger()
+
+DEFAULT_DOC_PARALLELISM = 5
+# Seconds a file can take before its dependents stop waiting for it, 0 disables it
+DEFAULT_DOC_FILE_TIMEOUT = 600
+# Seconds between the checks of the cancellation and the timeouts
+POLL_INTERVAL = 0.5
+
+
+class DocumentationScheduler:
+    """
+    Run a task for each file in dependency order: a file starts once every project
+    file it imports is finished, so its prompt can use their documentation.
+
+    Attributes:
+        - graph (Graph): The dependency graph, nodes are the relative paths of the files.
+        - files (list): The files to run.
+        - parallelism (int): Maximum number of tasks running at the same time.
+        - levels (list): The schedule, leaves first. Each level is a list of components,
+          the files of a component import each other (a cycle) and run without waiting for each other.
+        - timed_out (list): The files of the last run that exceeded the timeout.
+        - cancelled (list): The files of the last run that never started because it was cancelled.
+
+    Independent files don't wait for a whole level to finish, each component is
+    ready as soon as the components it depends on are done. The ready files wait in a
+    queue and only parallelism of them are handed to the executor, so the threads and
+    the pending work stay bounded whatever the size of the project.
+    A task gets a stop_event that is set when it times out or the run is cancelled,
+    it must check it between its steps and return early.
+    """
+
+    def __init__(self, graph: Graph, files: list, parallelism: int = DEFAULT_DOC_PARALLELISM) -> None:
+        self.graph = graph
+        self.files = list(files)
+        self.parallelism = max(1, parallelism)
+        self.levels = graph.get_levels(self.files)
+        self.__components = [component for level in self.levels for component in level]
+        self.__component_of = {
+            file: i for i, component in enumerate(self.__components) for file in component
+        }
+        self.level_of = {
+            file: level for level, components in enumerate(self.levels) for component in components for file in component
+        }
+        adjacency = graph.get_graph()
+        allowed = set(self.files)
+        self.dependencies = {
+            file: [d for d in adjacency.get(file, []) if d in allowed and d != file] for file in self.files
+        }
+        self.timed_out = []
+        self.cancelled = []
+
+    def get_dependencies(self, file: str) -> list:
+        """
+            Get the files that file imports and that run before it (not the ones in its own cycle)
+        """
+        component = self.__component_of.get(file)
+        return [d for d in self.dependencies.get(file, []) if self.__component_of.get(d) != component]
+
+    def run(self, task, cancel_event: threading.Event = None, timeout: float = None) -> None:
+        """
+            Call task(file, dependencies, stop_event) for every file, with at most parallelism calls at once
+        """
+        components = self.__components
+        waiting_on = {}
+        dependents = {i: set() for i in range(len(components))}
+        for i, component in enumerate(components):
+            required = {
+                self.__component_of[d] for file in component for d in self.dependencies[file]
+            } - {i}
+            waiting_on[i] = len(required)
+            for other in required:
+                dependents[other].add(i)
+        remaining = {i: len(component) for i, component in enumerate(components)}
+        # Files whose dependencies are done, only parallelism of them are handed to the executor
+        ready = deque(
+            (i, file) for i in range(len(components)) if waiting_on[i] == 0 for file in components[i]
+        )
+        self.timed_out = []
+        self.cancelled = []
+
+        logger.info(
+            __name__,
+            "(run) Scheduling %s files in %s levels with parallelism %s",
+            len(self.files),
+            len(self.levels),
+            self.parallelism,
+        )
+
+        def finish(component_index):
+            remaining[component_index] -= 1
+            if remaining[component_index] > 0:
+                return
+            for dependent in dependents[component_index]:
+                waiting_on[dependent] -= 1
+                if waiting_on[dependent] == 0:
+                    ready.extend((dependent, file) for file in components[dependent])
+
+        def start(file, dependencies, stop_event):
+            started[file] = time.monotonic()
+            if stop_event.is_set():
+                return None
+            return task(file, dependencies, stop_event)
+
+        executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="fridacli-doc")
+        pending = {}
+        started = {}
+        try:
+            while ready or pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                while ready and len(pending) < self.parallelism:
+                    component_index, file = ready.popleft()
+                    stop_event = threading.Event()
+                    future = executor.submit(start, file, self.get_dependencies(file), stop_event)
+                    pending[future] = (component_index, file, stop_event)
+                done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    component_index, file, _ = pending.pop(future)
+                    if future.exception() is not None:
+                        logger.error(__name__, "(run) Error documenting %s: %s", file, future.exception())
+                    finish(component_index)
+                if not timeout:
+                    continue
+                now = time.monotonic()
+                for future, (component_index, file, stop_event) in list(pending.items()):
+                    if file in started and now - started[file] > timeout:
+                        # The task stops at its next check, its dependents don't wait for it
+                        logger.warning(__name__, "(run) %s timed out after %s seconds", file, timeout)
+                        stop_event.set()
+                        del pending[future]
+                        self.timed_out.append(file)
+                        finish(component_index)
+        finally:
+            if ready or pending:
+                logger.info(__name__, "(run) Cancelling %s files", len(ready) + len(pending))
+            self.cancelled = [file for _, file in ready]
+            for future, (_, file, stop_event) in pending.items():
+                stop_event.set()
+                if future.cancel():
+                    self.cancelled.append(file)
+            # Wait for the running tasks, they stop at their next check
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def describe(self) -> list:
+        """
+            Get the schedule as text lines, one per level
+        """
+        lines = []
+        for level, components in enumerate(self.levels):
+            names = []
+            for component in components:
+                names.append(
+                    " <-> ".join(component) + " (cycle)" if len(component) > 1 else component[0]
+                )
+            lines.append(f"Level {level + 1}: {', '.join(names)}")
+        return lines
@@ -1,15 +1,21 @@
 import re
 import os
+import asyncio
+import textwrap
 import threading
 from typing import List, Tuple, Dict
 from docx import Document
 from mdutils.mdutils import MdUtils
 from fridacli.logger import Logger
 from fridacli.chatbot import ChatbotAgent
+from fridacli.chatbot.context_builder import count_tokens
 from fridacli.frida_coder import FridaCoder
+from fridacli.frida_coder.code_fences import get_closed_blocks
 from fridacli.file_manager import FileManager
+from fridacli.file_manager.content_cache import ContentCache
 from .predefined_phrases import (
     generate_document_for_funct_prompt,
+    generate_document_for_functs_prompt,
     generate_full_document_prompt,
 )
 from .documentation import (
@@ -23,17 +29,15 @@ from .documentation import (
     extract_doc_csharp_one_func,
     extract_doc_csharp_all_func,
 )
-from .regex_configuration import CODE_FROM_ALL_EXTENSIONS
-from fridacli.config import OS
-from tree_sitter import Language, Parser
-from fridacli.logger import Logger
-import tree_sitter_c_sharp as tscsharp
-import tree_sitter_java as tsjava
-import tree_sitter_python as tspython
-
-PY_LANGUAGE = Language(tspython.language())
-CS_LANGUAGE = Language(tscsharp.language())
-JAVA_LANGUAGE = Language(tsjava.language())
+from .regex_configuration import FUNCTION_MARKER
+from .doc_manifest import DocManifest
+from .doc_scheduler import (
+    DocumentationScheduler,
+    DEFAULT_DOC_PARALLELISM,
+    DEFAULT_DOC_FILE_TIMEOUT,
+)
+from fridacli.config import OS, get_vars_as_dict
+from fridacli.file_manager.languages import get_parser
 
 logger = Logger()
 
@@ -41,33 +45,37 @@ MAX_RETRIES = 2
 # Programming languages that can be fully documented without major issues
 SUPPORTED_DOC_EXTENSION = [".py", ".cs", ".java"]
 # The dictionary is structured as follows:
-# extension: [documentation symbols, function to extract all functions, language parser,
+# extension: [documentation symbols, function to extract all functions,
 #             function to extract documentation from one function, function to extract documentation from all functions]
+# The parsers come from get_parser, a tree-sitter Parser can't be shared between threads
 COMMENT_EXTENSION = {
     ".py": [
         '"""',
         find_all_func_python,
-        Parser(PY_LANGUAGE),
         extract_doc_python_one_func,
         extract_doc_python_all_func,
     ],
     ".cs": [
         "///",
         find_all_func_csharp,
-        Parser(CS_LANGUAGE),
         extract_doc_csharp_one_func,
         extract_doc_csharp_all_func,
     ],
     ".java": [
         "/**",
         find_all_func_java,
-        Parser(JAVA_LANGUAGE),
         extract_doc_java_one_func,
         extract_doc_java_all_func,
     ],
-    ".js": ["*", None, None, None, None],
+    ".js": ["*", None, None, None],
 }
 RESUMES = []
+# Limits of the summaries of the documented dependencies added to the prompts
+MAX_SUMMARY_CHARS = 1500
+MAX_CONTEXT_CHARS = 4000
+# Tokens of code sent in one request of the per-function method, 0 sends each function alone
+DEFAULT_DOC_BATCH_TOKENS = 1500
+MAX_BATCH_FUNCTIONS = 15
 
 
 def save_documentation(path: str, lines: List[Tuple[str, str]]) -> None:
@@ -83,7 +91,7 @@ def save_documentation(path: str, lines: List[Tuple[str, str]]) -> None:
     """
     try:
         if "docx" in path:
-            logger.info(__name__, f"Saving documentation (docx) in: {path}")
+            logger.info(__name__, "Saving documentation (docx) in: %s", path)
             doc = Document()
 
             for format, text in lines:
@@ -101,7 +109,7 @@ def save_documentation(path: str, lines: List[Tuple[str, str]]) -> None:
 
             doc.save(path)
         else:
-            logger.info(__name__, f"Saving documentation (md): {path}")
+            logger.info(__name__, "Saving documentation (md): %s", path)
             mdFile = None
             bullets = []
             for format, text in lines:
@@ -127,9 +135,9 @@ def save_documentation(path: str, lines: List[Tuple[str, str]]) -> None:
                 bullets = []
 
             mdFile.create_md_file()
-        logger.info(__name__, f"Documentation saved succesfully.")
+        logger.info(__name__, "Documentation saved succesfully.")
     except Exception as e:
-        logger.error(__name__, f"(save_documentation) {e}")
+        logger.error(__name__, "(save_documentation) %s", e)
 
 
 def extract_documentation(
@@ -157,19 +165,20 @@ def extract_documentation(
     """
     try:
         if extension in SUPPORTED_DOC_EXTENSION:
-            tree = COMMENT_EXTENSION[extension][2].parse(bytes(code, encoding="utf8"))
+            tree = get_parser(extension).parse(bytes(code, encoding="utf8"))
             return (
-                COMMENT_EXTENSION[extension][3](tree.root_node, funct_definition)
+                COMMENT_EXTENSION[extension][2](tree.root_node, funct_definition)
                 if one_function
-                else COMMENT_EXTENSION[extension][4](tree.root_node, file_name)
+                else COMMENT_EXTENSION[extension][3](tree.root_node, file_name)
             )
         else:
             logger.error(
                 __name__,
-                f"(extract_documentation) Do not support the {extension} extension by now.",
+                "(extract_documentation) Do not support the %s extension by now.",
+                extension,
             )
     except Exception as e:
-        logger.error(__name__, f"(extract_documentation) {e}")
+        logger.error(__name__, "(extract_documentation) %s", e)
         return [], e
 
 
@@ -198,14 +207,24 @@ def get_code_block(
         Exception: If there is an error while executing the function.
     """
     try:
-        # Extracts the code block from the response
-        code_pattern = re.compile(CODE_FROM_ALL_EXTENSIONS, re.DOTALL)
-        matches = code_pattern.findall(text)
+        # Extracts the code block from the response, the longest one if the model split a function
+        blocks = get_closed_blocks(text)
+
+        if not one_function and len(blocks) > 1:
+            # The file replaces the source, keeping one of the blocks would drop the code of the others
+            logger.error(
+                __name__,
+                "(get_code_block) The code of the file %s came in %s code blocks",
+                file_name,
+                len(blocks),
+            )
+            return None, "The code of the file came in several code blocks.", None
 
-        if matches == []:
+        if blocks == []:
             logger.error(
                 __name__,
-                f"(get_code_block) Didn't match to extract the code block: {text}",
+                "(get_code_block) Didn't match to extract the code block: %s",
+                text,
             )
             return (
                 None,
@@ -219,10 +238,11 @@ def get_code_block(
                 None,
             )
         else:
-            information = {"code": matches[0].replace("```", "")}
-            logger.info(
+            information = {"code": max((code for _, code in blocks), key=len)}
+            logger.debug(
                 __name__,
-                f"(get_code_block) code block: {matches[0].replace('```', '')}",
+                "(get_code_block) code block: %s",
+                information["code"],
             )
 
             if extension in SUPPORTED_DOC_EXTENSION:
@@ -250,17 +270,16 @@ def get_code_block(
                 else:
                     logger.error(
                         __name__,
-                        (
-                            f"(get_code_block) Couldn't generate documentation for function {funct_definition}"
-                            if one_function
-                            else f"(get_code_block) Couldn't generate documentation for file {file_name}"
-                        ),
+                        "(get_code_block) Couldn't generate documentation for %s %s",
+                        "function" if one_function else "file",
+                        funct_definition if one_function else file_name,
                     )
                 return information, errors, count
             else:
                 logger.error(
                     __name__,
-                    f"(get_code_block) Do not support the {extension} extension by now.",
+                    "(get_code_block) Do not support the %s extension by now.",
+                    extension,
                 )
                 return (
                     information,
@@ -274,7 +293,7 @@ def get_code_block(
                     None,
                 )
     except Exception as e:
-        logger.error(__name__, f"(get_code_block) {e}")
+        logger.error(__name__, "(get_code_block) %s", e)
         return None, e, None
 
 
@@ -302,7 +321,380 @@ def write_code_to_path(
                 os.system(f"python -m black {path} -q")
 
     except Exception as e:
-        logger.error(__name__, f"(write_code_to_path) {e}")
+        logger.error(__name__, "(write_code_to_path) %s", e)
+    finally:
+        ContentCache().invalidate(path)
+
+
+def summarize_documentation(file: str, lines: List[Tuple[str, str]]) -> str:
+    """
+    Builds a short summary of the documented functions of a file, used in the prompts
+    of the files that import it.
+
+    Args:
+        file (str): The relative path of the file.
+        lines (List[Tuple[str, str]]): The documentation lines of the file (format, text).
+
+    Returns:
+        str: One line per function with its definition and description, empty if nothing was documented.
+    """
+    entries = []
+    for format, text in lines:
+        if format == "subheader":
+            entries.append([text.replace("Function: ", "", 1), ""])
+        elif format == "text" and entries and entries[-1][1] == "":
+            entries[-1][1] = text.strip().splitlines()[0] if text.strip() else ""
+    if not entries:
+        return ""
+    summary = "\n".join(
+        f"- {definition}: {description}" if description else f"- {definition}"
+        for definition, description in entries
+    )
+    return f"{file}:\n{summary}"[:MAX_SUMMARY_CHARS]
+
+
+def get_outer_functions(functions: List[Dict]) -> List[Dict]:
+    """
+    Keeps the functions that are not inside another function of the list, in the order of the file.
+
+    Args:
+        functions (List[Dict]): The functions found by the find_all_func functions.
+
+    Returns:
+        List[Dict]: The outermost functions, a nested function is documented with the one that contains it.
+    """
+    outer = []
+    for func in sorted(functions, key=lambda func: func["range"][0]):
+        if outer and func["range"][0] < outer[-1]["range"][1]:
+            continue
+        outer.append(func)
+    return outer
+
+
+def count_functions(code: str, extension: str, file_name: str) -> int:
+    """
+    Counts the functions of a code, to check that a documented file kept all of them.
+
+    Args:
+        code (str): The code of the file.
+        extension (str): The extension of the file, it must be in SUPPORTED_DOC_EXTENSION.
+        file_name (str): The name of the file.
+
+    Returns:
+        int: The number of functions, nested ones included.
+    """
+    tree = get_parser(extension).parse(bytes(code, encoding="utf8"))
+    return len(COMMENT_EXTENSION[extension][1](tree.root_node, file_name)[0])
+
+
+def get_function_range(func: Dict, replace_comments: bool) -> Tuple[int, int]:
+    """
+    Gets the byte range of a function, from its doc comment when the comment is above it and will be replaced.
+
+    Args:
+        func (Dict): The function found by a find_all_func function.
+        replace_comments (bool): Whether the function will be replaced by a documented one.
+
+    Returns:
+        Tuple[int, int]: The start and end bytes.
+    """
+    start, end = func["range"]
+    comments_range = func.get("comments_range")
+    if replace_comments and func.get("comments") and comments_range and 0 <= comments_range[0] < start:
+        start = comments_range[0]
+    return start, end
+
+
+def get_indentation(code_bytes: bytes, start: int) -> str:
+    """
+    Gets the whitespace before the byte start on its line.
+    """
+    line_start = code_bytes.rfind(b"\n", 0, start) + 1
+    prefix = code_bytes[line_start:start].decode("utf8")
+    return prefix if prefix.strip() == "" else ""
+
+
+def get_function_text(code_bytes: bytes, func: Dict) -> str:
+    """
+    Gets the code of a function without the indentation it has in the file.
+    """
+    start, end = func["range"]
+    text = get_indentation(code_bytes, start) + code_bytes[start:end].decode("utf8")
+    return textwrap.dedent(text)
+
+
+def indent_function(code: str, indentation: str) -> str:
+    """
+    Indents a function returned by the model to the place of the original one.
+
+    Args:
+        code (str): The code of the function, its first line goes right after the existing indentation.
+        indentation (str): The indentation of the original function.
+
+    Returns:
+        str: The code ready to replace the original function.
+    """
+    lines = textwrap.dedent(code.strip("\n")).split("\n")
+    return "\n".join(
+        [lines[0]] + [indentation + line if line.strip() else "" for line in lines[1:]]
+    )
+
+
+def skip_unchanged_file(
+    file: str, code: str, extension: str, functions: List[Dict] | None
+) -> str:
+    """
+    Reports a file that didn't change since the last incremental run and gets its summary from its documentation.
+
+    Returns:
+        str: The summary of the documentation of the file for the files that import it.
+    """
+    total = len(functions) if functions is not None else -1
+    RESUMES.append(
+        {
+            "file": file,
+            "global_error": None,
+            "total_functions": total,
+            "documented_functions": total,
+            "function_errors": {},
+            "unchanged": True,
+        }
+    )
+    if extension not in SUPPORTED_DOC_EXTENSION:
+        return ""
+    result = extract_documentation(code, extension, False, file, None)
+    lines = result[0] if result else []
+    return summarize_documentation(file, lines or [])
+
+
+def record_documented_file(
+    manifest: DocManifest,
+    file: str,
+    full_path: str,
+    extension: str,
+    frida_coder: FridaCoder,
+) -> None:
+    """
+    Records the hashes of a file as it was written, the next incremental run compares with them.
+    """
+    try:
+        code = frida_coder.get_code_from_path(full_path)
+        functions = []
+        if extension in SUPPORTED_DOC_EXTENSION:
+            functions = get_outer_functions(
+                COMMENT_EXTENSION[extension][1](
+                    get_parser(extension).parse(bytes(code, encoding="utf8")).root_node,
+                    file,
+                )[0]
+            )
+        manifest.record(file, code, functions)
+    except Exception as e:
+        logger.error(__name__, "(record_documented_file) %s", e)
+
+
+def get_doc_batch_tokens() -> int:
+    """
+    Gets the tokens of code sent in one request of the per-function method, from the DOC_BATCH_TOKENS configuration variable.
+
+    Returns:
+        int: The configured value (0 sends each function alone), or DEFAULT_DOC_BATCH_TOKENS if it is missing or invalid.
+    """
+    try:
+        return max(0, int(get_vars_as_dict().get("DOC_BATCH_TOKENS", DEFAULT_DOC_BATCH_TOKENS)))
+    except Exception as e:
+        logger.error(__name__, "(get_doc_batch_tokens) %s", e)
+        return DEFAULT_DOC_BATCH_TOKENS
+
+
+def get_batches(functions: List[Dict], budget: int) -> List[List[int]]:
+    """
+    Groups the functions, in the order of the file, in batches of at most budget tokens of code.
+
+    Args:
+        functions (List[Dict]): The functions to document.
+        budget (int): Tokens of code of a batch, a function over it goes alone.
+
+    Returns:
+        List[List[int]]: The indexes of the functions of each batch.
+    """
+    batches, tokens = [], 0
+    for index, func in enumerate(functions):
+        size = count_tokens(func["definition"] + func["body"])
+        if (
+            not batches
+            or tokens + size > budget
+            or len(batches[-1]) >= MAX_BATCH_FUNCTIONS
+        ):
+            batches.append([])
+            tokens = 0
+        batches[-1].append(index)
+        tokens += size
+    return batches
+
+
+def split_batch_response(response: str) -> Dict[int, str]:
+    """
+    Splits the response to a batch of functions by the FUNCTION headers.
+
+    Args:
+        response (str): The response of the model.
+
+    Returns:
+        Dict[int, str]: The part of the response of each function number.
+    """
+    parts = {}
+    headers = list(re.finditer(FUNCTION_MARKER, response, re.MULTILINE))
+    for header, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following is not None else len(response)
+        parts.setdefault(int(header.group(1)), response[header.end() : end])
+    return parts
+
+
+def document_function(
+    file: str,
+    extension: str,
+    func: Dict,
+    chatbot_agent: ChatbotAgent,
+    dependency_summaries: str,
+    is_stopped,
+):
+    """
+    Documents one function in its own request, retrying when the response has no documentation.
+
+    Returns:
+        Dict[str, str | List[Tuple[str, str]]] | None: The documented code and its documentation.
+        Dict[str, str] | None: The error of the function, if any.
+    """
+    funct_definition = func["definition"]
+    logger.debug(
+        __name__,
+        "(document_function) Code for the function %s: %s",
+        funct_definition,
+        func["definition"] + "\n" + func["body"],
+    )
+    prompt = generate_document_for_funct_prompt(
+        func["definition"] + func["body"],
+        extension,
+        dependency_summaries,
+    )
+    response = chatbot_agent.chat(prompt, True, recipe="document", session=None)
+
+    i = 1
+    while (
+        COMMENT_EXTENSION[extension][0] not in response and "```" not in response
+    ) and i <= MAX_RETRIES and not is_stopped():
+        logger.debug(
+            __name__,
+            "(document_function) Retry # %s for file %s function %s response: %s",
+            i,
+            file,
+            funct_definition,
+            response,
+        )
+        response = chatbot_agent.chat(
+            prompt, True, recipe="document", retries=i, session=None
+        )
+        i += 1
+
+    if COMMENT_EXTENSION[extension][0] in response and "```" in response:
+        logger.debug(
+            __name__,
+            "(document_function) Final response for the function %s: %s",
+            funct_definition,
+            response,
+        )
+        information, errors, _ = get_code_block(
+            file, response, extension, True, funct_definition
+        )
+        return information, errors
+    return None, {
+        funct_definition: "Couldn't generate the documentation for the function."
+    }
+
+
+def document_functions(
+    file: str,
+    extension: str,
+    functions: List[Dict],
+    chatbot_agent: ChatbotAgent,
+    dependency_summaries: str,
+    is_stopped,
+) -> List[Tuple]:
+    """
+    Documents the functions of a file, several of them per request up to DOC_BATCH_TOKENS tokens of code.
+
+    Each function of a batch is answered under its number, the part of the response of each one is
+    handled as the response to a single function. The functions missing from the response, or whose
+    code block doesn't have the function or its documentation, are sent again alone.
+
+    Args:
+        file (str): The file of the functions.
+        extension (str): The extension of the file.
+        functions (List[Dict]): The functions to document, in the order of the file.
+        chatbot_agent (ChatbotAgent): The agent used for the requests.
+        dependency_summaries (str): The summaries of the dependencies of the file.
+        is_stopped (Callable[[], bool]): True when the file must stop, the functions left are not documented.
+
+    Returns:
+        List[Tuple]: The information and the errors of each function, like get_code_block returns them.
+    """
+    results = [None] * len(functions)
+    for batch in get_batches(functions, get_doc_batch_tokens()):
+        if is_stopped():
+            break
+        if len(batch) > 1:
+            prompt = generate_document_for_functs_prompt(
+                [
+                    (number, functions[index]["definition"] + functions[index]["body"])
+                    for number, index in enumerate(batch, 1)
+                ],
+                extension,
+                dependency_summaries,
+            )
+            response = chatbot_agent.chat(prompt, True, recipe="document", session=None)
+            parts = split_batch_response(response)
+            logger.debug(
+                __name__,
+                "(document_functions) %s of %s functions of %s answered in one request",
+                len(parts),
+                len(batch),
+                file,
+            )
+            for number, index in enumerate(batch, 1):
+                func = functions[index]
+                part = parts.get(number, "")
+                if COMMENT_EXTENSION[extension][0] not in part or "```" not in part:
+                    continue
+                information, errors, _ = get_code_block(
+                    file, part, extension, True, func["definition"]
+                )
+                if (
+                    information is not None
+                    and "documentation" in information
+                    and func["name"] in information["code"]
+                ):
+                    results[index] = (information, errors)
+        for index in batch:
+            if results[index] is None and not is_stopped():
+                results[index] = document_function(
+                    file,
+                    extension,
+                    functions[index],
+                    chatbot_agent,
+                    dependency_summaries,
+                    is_stopped,
+                )
+    return [
+        result
+        if result is not None
+        else (
+            None,
+            {
+                functions[index]["definition"]: "Couldn't generate the documentation for the function."
+            },
+        )
+        for index, result in enumerate(results)
+    ]
 
 
 def document_file(
@@ -311,17 +703,26 @@ def document_file(
     doc_path: str,
     use_formatter: bool,
     file: str,
-    thread_semaphore: threading.Semaphore,
     chatbot_agent: ChatbotAgent,
     file_manager: FileManager,
     frida_coder: FridaCoder,
-) -> None:
-    thread_semaphore.acquire()
+    dependency_summaries: str = "",
+    stop_event: threading.Event = None,
+    manifest: DocManifest = None,
+) -> str:
+    summary = ""
+
+    def is_stopped() -> bool:
+        # Set when the file times out or the run is cancelled, nothing is written then
+        if stop_event is not None and stop_event.is_set():
+            logger.warning(__name__, "(document_file) Stopped documenting %s", file)
+            return True
+        return False
 
     try:
         _, extension = os.path.splitext(file)
         if frida_coder.is_programming_language_extension(extension):
-            logger.info(__name__, f"(document_file) Working on {file}")
+            logger.info(__name__, "(document_file) Working on %s", file)
 
             full_path = file_manager.get_file_path(file)
 
@@ -339,33 +740,73 @@ def document_file(
 
             i = 1
 
-            if (
+            # In incremental mode only the functions without documentation or changed since the last run are sent
+            functions, pending = None, None
+            if manifest is not None:
+                if extension in SUPPORTED_DOC_EXTENSION:
+                    functions = get_outer_functions(
+                        COMMENT_EXTENSION[extension][1](
+                            get_parser(extension).parse(bytes(code, encoding="utf8")).root_node,
+                            file,
+                        )[0]
+                    )
+                    pending = manifest.get_pending_functions(file, functions)
+                if manifest.is_file_unchanged(file, code) and not any(pending or []):
+                    logger.info(__name__, "(document_file) %s is unchanged since the last run", file)
+                    return skip_unchanged_file(file, code, extension, functions)
+
+            whole_file = (
                 method == "Slow"
                 or num_lines <= 300
                 or extension not in SUPPORTED_DOC_EXTENSION
-            ):
-                prompt = generate_full_document_prompt(code, extension)
-                response = chatbot_agent.chat(prompt, True)
+            ) and (pending is None or all(pending))
+            if whole_file:
+                prompt = generate_full_document_prompt(
+                    code, extension, dependency_summaries
+                )
+                response = chatbot_agent.chat(
+                    prompt, True, recipe="document", session=None
+                )
 
                 while (
                     COMMENT_EXTENSION[extension][0] not in response
                     and "```" not in response
-                ) and i <= MAX_RETRIES:
-                    logger.info(
+                ) and i <= MAX_RETRIES and not is_stopped():
+                    logger.debug(
                         __name__,
-                        f"(document_file) Retry # {i} for file {file}: {response}",
+                        "(document_file) Retry # %s for file %s: %s",
+                        i,
+                        file,
+                        response,
+                    )
+                    response = chatbot_agent.chat(
+                        prompt, True, recipe="document", retries=i, session=None
                     )
-                    response = chatbot_agent.chat(prompt, True)
                     i += 1
 
                 if COMMENT_EXTENSION[extension][0] in response and "```" in response:
-                    logger.info(
+                    logger.debug(
                         __name__,
-                        f"(document_file) Final response for the file {file}: {response}",
+                        "(document_file) Final response for the file %s: %s",
+                        file,
+                        response,
                     )
                     information, errors, count = get_code_block(
                         file, response, extension, False
                     )
+                    if (
+                        information is not None
+                        and extension in SUPPORTED_DOC_EXTENSION
+                        and count_functions(information["code"], extension, file)
+                        != count_functions(code, extension, file)
+                    ):
+                        # The response lost or added functions, it can't replace the file
+                        logger.error(
+                            __name__,
+                            "(document_file) The documented code of %s doesn't have the functions of the file",
+                            file,
+                        )
+                        information, errors = None, "The documented code doesn't have the functions of the file."
                     if information is not None:
                         new_code = information["code"]
                         if extension in SUPPORTED_DOC_EXTENSION:
@@ -373,7 +814,7 @@ def document_file(
                         if "documentation" in information.keys():
                             new_doc.extend(information["documentation"])
                         if count is None and extension in SUPPORTED_DOC_EXTENSION:
-                            tree = COMMENT_EXTENSION[extension][2].parse(
+                            tree = get_parser(extension).parse(
                                 bytes(code, encoding="utf8")
                             )
                             functions, classes = COMMENT_EXTENSION[extension][1](
@@ -387,7 +828,7 @@ def document_file(
                     else:
                         global_error = errors
                         if extension in SUPPORTED_DOC_EXTENSION:
-                            tree = COMMENT_EXTENSION[extension][2].parse(
+                            tree = get_parser(extension).parse(
                                 bytes(code, encoding="utf8")
                             )
                             functions, classes = COMMENT_EXTENSION[extension][1](
@@ -395,13 +836,15 @@ def document_file(
                             )
                             total = len(functions)
                 else:
-                    logger.info(
+                    logger.debug(
                         __name__,
-                        f"(document_file) Couldn't get the expected response for the file {file}: {response}",
+                        "(document_file) Couldn't get the expected response for the file %s: %s",
+                        file,
+                        response,
                     )
                     global_error = "Couldn't generate the documentation for the file."
                     if extension in SUPPORTED_DOC_EXTENSION:
-                        tree = COMMENT_EXTENSION[extension][2].parse(
+                        tree = get_parser(extension).parse(
                             bytes(code, encoding="utf8")
                         )
                         functions, classes = COMMENT_EXTENSION[extension][1](
@@ -409,89 +852,101 @@ def document_file(
                         )
                         total = len(functions)
 
-                RESUMES.append(
-                    {
-                        "file": file,
-                        "global_error": global_error,
-                        "total_functions": total,
-                        "documented_functions": documented,
-                        "function_errors": all_errors,
-                    }
-                )
-
-            else:
-                tree = COMMENT_EXTENSION[extension][2].parse(
-                    bytes(code, encoding="utf8")
-                )
+                if is_stopped():
+                    return summary
+                if new_code is None and extension in SUPPORTED_DOC_EXTENSION:
+                    # The file is documented function by function instead
+                    logger.warning(
+                        __name__,
+                        "(document_file) Documenting %s function by function: %s",
+                        file,
+                        global_error,
+                    )
+                    whole_file = False
+                    new_doc = new_doc[:1]
+                    functions = None
+                else:
+                    RESUMES.append(
+                        {
+                            "file": file,
+                            "global_error": global_error,
+                            "total_functions": total,
+                            "documented_functions": documented,
+                            "function_errors": all_errors,
+                        }
+                    )
 
-                functions, classes = COMMENT_EXTENSION[extension][1](
-                    tree.root_node, file
-                )
+            if not whole_file:
+                code_bytes = bytes(code, encoding="utf8")
+                if functions is None:
+                    functions = get_outer_functions(
+                        COMMENT_EXTENSION[extension][1](
+                            get_parser(extension).parse(code_bytes).root_node, file
+                        )[0]
+                    )
+                if pending is None:
+                    pending = [True] * len(functions)
                 total = len(functions)
                 documented = 0
                 all_errors = {}
 
-                start_line = functions[0]["range"][0]
-                end_line = functions[-1]["range"][-1]
+                # The functions are sent in batches, results follows the order of the pending functions
+                results = iter(document_functions(
+                    file,
+                    extension,
+                    [func for func, needs_doc in zip(functions, pending) if needs_doc],
+                    chatbot_agent,
+                    dependency_summaries,
+                    is_stopped,
+                ))
 
-                new_file.append(code[: start_line - 1])
-                for func in functions:
+                # The code between the functions is kept as it is
+                position = 0
+                for func, needs_doc in zip(functions, pending):
+                    if is_stopped():
+                        return summary
                     funct_definition = func["definition"]
-                    func_body = func["definition"] + "\n" + func["body"]
-                    logger.info(
-                        __name__,
-                        f"(document_file) Code for the function {funct_definition}: {func_body}",
-                    )
-                    prompt = generate_document_for_funct_prompt(
-                        func["definition"] + func["body"], extension
-                    )
-                    response = chatbot_agent.chat(prompt, True)
+                    start, end = get_function_range(func, needs_doc)
+                    new_file.append(code_bytes[position:start].decode("utf8"))
+                    original = code_bytes[start:end].decode("utf8")
+                    position = end
 
-                    while (
-                        COMMENT_EXTENSION[extension][0] not in response
-                        and "```" not in response
-                    ) and i <= MAX_RETRIES:
-                        logger.info(
-                            __name__,
-                            f"(document_file) Retry # {i} for file {file} function {funct_definition} response: {response}",
+                    if not needs_doc:
+                        # Documented and unchanged since the last run, only its documentation is collected
+                        new_file.append(original)
+                        lines, _ = extract_documentation(
+                            get_function_text(code_bytes, func),
+                            extension,
+                            True,
+                            file,
+                            funct_definition,
                         )
-                        response = chatbot_agent.chat(prompt, True)
-                        i += 1
-                    i = 1
+                        if lines:
+                            new_doc.extend(lines)
+                            documented += 1
+                        continue
 
-                    if (
-                        COMMENT_EXTENSION[extension][0] in response
-                        and "```" in response
-                    ):
-                        logger.info(
-                            __name__,
-                            f"(document_file) Final response for the function {funct_definition}: {response}",
-                        )
-                        information, errors, _ = get_code_block(
-                            file, response, extension, True, funct_definition
-                        )
-                        if information is not None:
-                            document_code = information["code"]
-                            document_code = ("\n" + document_code).splitlines()
-                            new_file.extend(document_code)
-                            if "documentation" in information.keys():
-                                new_doc.extend(information["documentation"])
-                                documented += 1
-                        if errors is not None:
-                            all_errors.update(errors)
-                    else:
-                        new_lines = (
-                            "\n" + func["definition"] + func["body"]
-                        ).splitlines()
-                        new_file.extend(new_lines)
-                        all_errors.update(
-                            {
-                                funct_definition: "Couldn't generate the documentation for the function."
-                            }
+                    information, errors = next(results)
+                    if information is not None:
+                        new_file.append(
+                            indent_function(
+                                information["code"],
+                                get_indentation(code_bytes, start),
+                            )
                         )
+                        if "documentation" in information.keys():
+                            new_doc.extend(information["documentation"])
+                            documented += 1
+                    if errors is not None:
+                        all_errors.update(errors)
+                    if information is None:
+                        new_file.append(original)
+
+                new_file.append(code_bytes[position:].decode("utf8"))
+                new_code = "".join(new_file)
 
-                new_file.extend(code[end_line:])
-                new_code = "\n".join(new_file)
+                if is_stopped():
+                    return summary
 
                 RESUMES.append(
                     {
@@ -507,34 +962,69 @@ def document_file(
             if new_code is not None:
                 logger.info(
                     __name__,
-                    f"(document_file) Writing the documented code for the file {file}",
+                    "(document_file) Writing the documented code for the file %s",
+                    file,
                 )
                 write_code_to_path(full_path, new_code, extension, use_formatter)
+                if manifest is not None:
+                    record_documented_file(manifest, file, full_path, extension, frida_coder)
             else:
                 logger.error(
                     __name__,
-                    f"(document_file) Could not write new code for file {file}",
+                    "(document_file) Could not write new code for file %s",
+                    file,
                 )
 
             # If there is at least one new line of documentation
             if len(new_doc) > 1:
+                summary = summarize_documentation(file, new_doc)
                 for doctype, selected in formats.items():
                     if selected:
+                        # file is relative to the project, files with the same name get different documents
+                        doc_name = file.replace("/", "_")
                         filename = (
-                            ("readme_" + file + ".md")
+                            ("readme_" + doc_name + ".md")
                             if doctype == "md"
-                            else ("doc_" + file + ".docx")
+                            else ("doc_" + doc_name + ".docx")
                         )
                         save_documentation(os.path.join(doc_path, filename), new_doc)
             else:
                 logger.error(
                     __name__,
-                    f"(document_file) Could not write new documentation for file {file}",
+                    "(document_file) Could not write new documentation for file %s",
+                    file,
                 )
     except Exception as e:
-        logger.error(__name__, f"(document_file) {e}")
-    finally:
-        thread_semaphore.release()
+        logger.error(__name__, "(document_file) %s", e)
+    return summary
+
+
+def get_doc_parallelism() -> int:
+    """
+    Gets the number of files documented at the same time, from the DOC_PARALLELISM configuration variable.
+
+    Returns:
+        int: The configured value, or DEFAULT_DOC_PARALLELISM if it is missing or invalid.
+    """
+    try:
+        return max(1, int(get_vars_as_dict().get("DOC_PARALLELISM", DEFAULT_DOC_PARALLELISM)))
+    except Exception as e:
+        logger.error(__name__, "(get_doc_parallelism) %s", e)
+        return DEFAULT_DOC_PARALLELISM
+
+
+def get_doc_file_timeout() -> float:
+    """
+    Gets the seconds a file can take to be documented, from the DOC_FILE_TIMEOUT configuration variable.
+
+    Returns:
+        float: The configured value (0 means no timeout), or DEFAULT_DOC_FILE_TIMEOUT if it is missing or invalid.
+    """
+    try:
+        return max(0.0, float(get_vars_as_dict().get("DOC_FILE_TIMEOUT", DEFAULT_DOC_FILE_TIMEOUT)))
+    except Exception as e:
+        logger.error(__name__, "(get_doc_file_timeout) %s", e)
+        return DEFAULT_DOC_FILE_TIMEOUT
 
 
 async def exec_document(
@@ -545,10 +1035,18 @@ async def exec_document(
     chatbot_agent: ChatbotAgent,
     file_manager: FileManager,
     frida_coder: FridaCoder,
+    parallelism: int = None,
+    cancel_event: threading.Event = None,
+    timeout: float = None,
+    incremental: bool = False,
 ):
     """
     Execute the document generation process for multiple files.
 
+    The files are documented in dependency order, leaves first, so the prompt of a file
+    includes the summaries of the project files it imports. Files that don't depend on
+    each other are documented concurrently by a bounded pool of workers.
+
     Args:
         formats (Dict[str, bool]): A dictionary of file formats and their corresponding boolean values indicating whether
             to generate documents in that format.
@@ -558,6 +1056,14 @@ async def exec_document(
         chatbot_agent (ChatbotAgent): The chatbot agent object that will be used during the document generation process.
         file_manager (FileManager): The file manager object responsible for loading and managing files.
         frida_coder (FridaCoder): The Frida coder object that will be used for code-related methods.
+        parallelism (int, optional): Maximum number of files documented at the same time. Defaults to DOC_PARALLELISM.
+        cancel_event (threading.Event, optional): When set, the files not started yet are skipped and the running ones stop.
+        timeout (float, optional): Seconds a file can take, 0 disables it. Defaults to DOC_FILE_TIMEOUT.
+        incremental (bool, optional): Only document the functions without documentation or changed since the last
+            incremental run, the files that didn't change are skipped. Defaults to False.
+
+    Returns:
+        List[Dict]: The resume of each file, with its "level" in the schedule and its "dependencies".
     """
     # Loading current directory
     file_manager.load_folder(file_manager.get_folder_path())
@@ -566,39 +1072,78 @@ async def exec_document(
     if method == "Slow":
         chatbot_agent.change_version(4)
 
-    files = file_manager.get_files()
-    threads = []
-    thread_semaphore = threading.Semaphore(5)
+    RESUMES.clear()
+    files = [
+        file
+        for file in file_manager.get_files()
+        if frida_coder.is_programming_language_extension(os.path.splitext(file)[1])
+    ]
+    parallelism = parallelism or get_doc_parallelism()
+    timeout = get_doc_file_timeout() if timeout is None else timeout
     logger.info(
         __name__,
-        f"(exec_document) Documenting {len(files)} files using the method {method}",
+        "(exec_document) Documenting %s files using the method %s",
+        len(files),
+        method,
     )
 
-    for file in files:
-        thread = threading.Thread(
-            target=document_file,
-            args=(
-                formats,
-                method,
-                doc_path,
-                use_formatter,
-                file,
-                thread_semaphore,
-                chatbot_agent,
-                file_manager,
-                frida_coder,
-            ),
+    graph = file_manager.get_dependency_graph().get_graph()
+    scheduler = DocumentationScheduler(graph, files, parallelism)
+    for line in scheduler.describe():
+        logger.info(__name__, "(exec_document) %s", line)
+    summaries = {}
+    manifest = DocManifest(file_manager.get_folder_path()) if incremental else None
+
+    def document_task(
+        file: str, dependencies: List[str], stop_event: threading.Event
+    ) -> None:
+        context = "\n".join(summaries[d] for d in dependencies if summaries.get(d))
+        summaries[file] = document_file(
+            formats,
+            method,
+            doc_path,
+            use_formatter,
+            file,
+            chatbot_agent,
+            file_manager,
+            frida_coder,
+            context[:MAX_CONTEXT_CHARS],
+            stop_event,
+            manifest,
+        )
+
+    # The files are documented by the worker threads, the event loop stays free meanwhile
+    await asyncio.to_thread(scheduler.run, document_task, cancel_event, timeout)
+    if manifest is not None:
+        manifest.save()
+
+    documented_files = {resume["file"] for resume in RESUMES}
+    for file in scheduler.timed_out:
+        if file not in documented_files:
+            RESUMES.append(
+                {
+                    "file": file,
+                    "global_error": f"The file took more than {timeout} seconds, it wasn't modified.",
+                    "total_functions": 0,
+                    "documented_functions": 0,
+                    "function_errors": {},
+                }
+            )
+    if scheduler.cancelled:
+        logger.info(
+            __name__,
+            "(exec_document) The run was cancelled, %s files weren't documented",
+            len(scheduler.cancelled),
         )
-        threads.append(thread)
-        thread.start()
 
-    # Joining all the threads
-    for thread in threads:
-        thread.join()
+    for resume in RESUMES:
+        resume["level"] = scheduler.level_of.get(resume["file"], 0) + 1
+        resume["dependencies"] = scheduler.get_dependencies(resume["file"])
+    RESUMES.sort(key=lambda resume: (resume["level"], resume["file"]))
 
     # If the method is slow, the chat is changed back ChatGPT-3.x
     if method == "Slow":
         chatbot_agent.change_version(3)
 
-    logger.info(__name__, f"(exec_document) The final resumes: {RESUMES}")
+    logger.debug(__name__, "(exec_document) The final resumes: %s", RESUMES)
     return RESUMES
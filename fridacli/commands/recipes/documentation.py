@@ -95,7 +95,7 @@ def extract_doc_java(comments: str) -> Tuple[List, str | None]:
                             lines[-1][1] + "\n" + description_match.group(1),
                         )
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_java) {e}")
+        logger.error(__name__, "(extract_doc_java) %s", e)
         # If somethin went wrong, an empty list and the error is returned
         return [], e
     else:
@@ -185,7 +185,7 @@ def find_all_func_java(node: Tree, file_name: str):
                     classes.extend(c)
     except Exception as e:
         # If something went wrong, only empty lists are returned
-        logger.error(__name__, f"(find_all_func_java) {e}")
+        logger.error(__name__, "(find_all_func_java) %s", e)
         return [], []
     else:
         # logger.info(
@@ -217,17 +217,20 @@ def extract_doc_java_all_func(node: Tree, file_name: str):
         funct_definition = func["definition"]
         comments = func["comments"]
         if comments != "":
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_java_all_func) Comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_java_all_func) Comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_java(
                 comments.replace("*/", "").replace("/**", "")
             )
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_java_all_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_java_all_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
@@ -236,7 +239,8 @@ def extract_doc_java_all_func(node: Tree, file_name: str):
                 # If something went wrong while extracting the documentation from the comments
                 logger.error(
                     __name__,
-                    f"(extract_doc_java_all_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_java_all_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 errors.update(
                     {
@@ -247,7 +251,8 @@ def extract_doc_java_all_func(node: Tree, file_name: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_java_all_func) Could't extract the comments from the function {funct_definition}.",
+                "(extract_doc_java_all_func) Could't extract the comments from the function %s.",
+                funct_definition,
             )
             errors.update(
                 {funct_definition: "Could't extract the comments from the function."}
@@ -277,24 +282,28 @@ def extract_doc_java_one_func(node: Tree, funct_definition: str):
                 comments = n.text.decode("utf8")
                 break
         if comments != "":
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_java_one_func) Comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_java_one_func) Comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_java(
                 comments.replace("*/", "").replace("/**", "")
             )
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_java_one_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_java_one_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
             else:
                 logger.error(
                     __name__,
-                    f"(extract_doc_java_one_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_java_one_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 error = {
                     funct_definition: "Could't extract the documentation from the function."
@@ -303,13 +312,14 @@ def extract_doc_java_one_func(node: Tree, funct_definition: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_java_one_func) Could't extract the comments from the function {funct_definition}",
+                "(extract_doc_java_one_func) Could't extract the comments from the function %s",
+                funct_definition,
             )
             error = {
                 funct_definition: "Could't extract the comments from the function."
             }
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_java_one_func) {e}")
+        logger.error(__name__, "(extract_doc_java_one_func) %s", e)
 
     return docs, error
 
@@ -337,7 +347,7 @@ def extract_doc_python(comments: str) -> Tuple[List, str | None]:
         doc = comments.replace("\n    \n", "\n\n")
         doc = doc.split("\n\n")
 
-        logger.info(__name__, f"(extract_doc_python) Comment lines: {doc}")
+        logger.debug(__name__, "(extract_doc_python) Comment lines: %s", doc)
 
         if doc[0].strip() != "":
             lines.extend([("bold", "Description:"), ("text", doc[0].strip())])
@@ -441,7 +451,7 @@ def extract_doc_python(comments: str) -> Tuple[List, str | None]:
                         lines[-1][1] + "\n" + line.strip().replace("    ", ""),
                     )
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_python) {e}")
+        logger.error(__name__, "(extract_doc_python) %s", e)
         # If somethin went wrong, an empty list and the error is returned
         return [], e
     else:
@@ -542,7 +552,7 @@ def find_all_func_python(node: Tree, file_name: str):
                     classes.extend(c)
     except Exception as e:
         # If something went wrong, only empty lists are returned
-        logger.error(__name__, f"(find_all_func_python) {e}")
+        logger.error(__name__, "(find_all_func_python) %s", e)
         return [], []
     else:
         # logger.error(
@@ -574,15 +584,18 @@ def extract_doc_python_all_func(node: Tree, file_name: str):
         funct_definition = func["definition"]
         comments = func["comments"]
         if comments != "":
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_python_all_func) comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_python_all_func) comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_python(comments.replace('"""', ""))
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_python_all_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_python_all_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
@@ -591,7 +604,8 @@ def extract_doc_python_all_func(node: Tree, file_name: str):
                 # If something went wrong while extracting the documentation from the comments
                 logger.error(
                     __name__,
-                    f"(extract_doc_python_all_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_python_all_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 errors.update(
                     {
@@ -602,7 +616,8 @@ def extract_doc_python_all_func(node: Tree, file_name: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_python_all_func) Could't extract the comments from the function {funct_definition}.",
+                "(extract_doc_python_all_func) Could't extract the comments from the function %s.",
+                funct_definition,
             )
             errors.update(
                 {funct_definition: "Could't extract the comments from the function."}
@@ -641,22 +656,26 @@ def extract_doc_python_one_func(node: Tree, funct_definition: str):
                         break
                 break
         if '"""' in comments:
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_python_one_func) comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_python_one_func) comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_python(comments.replace('"""', ""))
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_python_one_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_python_one_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
             else:
                 logger.error(
                     __name__,
-                    f"(extract_doc_python_one_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_python_one_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 error = {
                     funct_definition: "Could't extract the documentation from the function."
@@ -665,13 +684,13 @@ def extract_doc_python_one_func(node: Tree, funct_definition: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_python_one_func) Could't extract the comments from the function.",
+                "(extract_doc_python_one_func) Could't extract the comments from the function.",
             )
             error = {
                 funct_definition: "Could't extract the comments from the function."
             }
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_python_one_func) {e}")
+        logger.error(__name__, "(extract_doc_python_one_func) %s", e)
 
     return docs, error
 
@@ -708,9 +727,7 @@ def extract_doc_csharp(comments: str) -> Tuple[List, str | None]:
         else:
             lines = []
 
-        logger.info(
-            __name__, f"(extract_doc_csharp) Comment lines: {comments.splitlines()}"
-        )
+        logger.debug(__name__, "(extract_doc_csharp) Comment lines: %s", comments)
 
         for comment in comments.splitlines():
             # Check if the current string refers to description, arguments, return values or exception
@@ -769,7 +786,7 @@ def extract_doc_csharp(comments: str) -> Tuple[List, str | None]:
                         )
                     )
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_csharp) {e}")
+        logger.error(__name__, "(extract_doc_csharp) %s", e)
         # If somethin went wrong, an empty list and the error is returned
         return [], e
     else:
@@ -900,7 +917,7 @@ def find_all_func_csharp(node: Tree, file_name: str):
                     classes.extend(c)
     except Exception as e:
         # If something went wrong, only empty lists are returned
-        logger.error(__name__, f"(find_all_func_csharp) {e}")
+        logger.error(__name__, "(find_all_func_csharp) %s", e)
         return [], []
     else:
         # logger.info(
@@ -932,15 +949,18 @@ def extract_doc_csharp_all_func(node: str, file_name: str):
         funct_definition = func["definition"]
         comments = func["comments"]
         if comments != "":
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_csharp_all_func) comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_csharp_all_func) comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_csharp(comments.replace("///", ""))
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_csharp_all_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_csharp_all_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
@@ -949,7 +969,8 @@ def extract_doc_csharp_all_func(node: str, file_name: str):
                 # If something went wrong while extracting the documentation from the comments
                 logger.error(
                     __name__,
-                    f"(extract_doc_csharp_all_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_csharp_all_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 errors.update(
                     {
@@ -960,7 +981,8 @@ def extract_doc_csharp_all_func(node: str, file_name: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_csharp_all_func) Could't extract the comments from the function {funct_definition}.",
+                "(extract_doc_csharp_all_func) Could't extract the comments from the function %s.",
+                funct_definition,
             )
             errors.update(
                 {funct_definition: "Could't extract the comments from the function."}
@@ -989,23 +1011,27 @@ def extract_doc_csharp_one_func(node: Tree, funct_definition: str):
             if n.type == "comment":
                 comments += n.text.decode("utf8") + "\n"
         if comments != "":
-            logger.info(
+            logger.debug(
                 __name__,
-                f"(extract_doc_csharp_one_func) comments retrieved from the function {funct_definition}: {comments}",
+                "(extract_doc_csharp_one_func) comments retrieved from the function %s: %s",
+                funct_definition,
+                comments,
             )
             documentation, error = extract_doc_csharp(comments.replace("///", ""))
 
             if error is None:
-                logger.info(
+                logger.debug(
                     __name__,
-                    f"(extract_doc_csharp_one_func) Successfully extracted the documentation for the function {funct_definition}",
+                    "(extract_doc_csharp_one_func) Successfully extracted the documentation for the function %s",
+                    funct_definition,
                 )
                 docs.append(("subheader", f"Function: {funct_definition}"))
                 docs.extend(documentation)
             else:
                 logger.error(
                     __name__,
-                    f"(extract_doc_csharp_one_func) Could't extract the documentation from the function {funct_definition}",
+                    "(extract_doc_csharp_one_func) Could't extract the documentation from the function %s",
+                    funct_definition,
                 )
                 error = {
                     funct_definition: "Could't extract the documentation from the function."
@@ -1014,12 +1040,12 @@ def extract_doc_csharp_one_func(node: Tree, funct_definition: str):
             # If comments weren't found
             logger.error(
                 __name__,
-                f"(extract_doc_csharp_one_func) Could't extract the comments from the function.",
+                "(extract_doc_csharp_one_func) Could't extract the comments from the function.",
             )
             error = {
                 funct_definition: "Could't extract the comments from the function."
             }
     except Exception as e:
-        logger.error(__name__, f"(extract_doc_csharp_one_func) {e}")
+        logger.error(__name__, "(extract_doc_csharp_one_func) %s", e)
 
     return docs, error
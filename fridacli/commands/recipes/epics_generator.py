@@ -1,19 +1,22 @@
 import csv
+import asyncio
 from .predefined_phrases import generate_epic
 from fridacli.logger import Logger
 
 logger = Logger()
 
 
-def exec_generate_epics(chatbot_agent, text, path):
+async def exec_generate_epics(chatbot_agent, text, path):
     epics = text.split(",")
+    # The epics are requested at the same time, the rows keep the order of the epics
+    responses = await asyncio.gather(
+        *(chatbot_agent.achat(generate_epic(epic.strip()), True, recipe="epics", session=None) for epic in epics)
+    )
     with open(f"{path}/output.csv", 'w', newline='') as file:
         writer = csv.DictWriter(file, fieldnames=['epic', 'user_story', 'description', 'acceptance_criteria', 'out_of_scope'])
         writer.writeheader()
-        for epic in epics:
-            message = generate_epic(epic.strip())
-            response = chatbot_agent.chat(message, True)
-            logger.info(__name__, response)
+        for epic, response in zip(epics, responses):
+            logger.debug(__name__, "%s", response)
             sections = response.strip().split("***")
             for section in sections:
                 values = section.split("$$")
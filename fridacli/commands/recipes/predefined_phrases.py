@@ -56,8 +56,18 @@ programming_languages = {
 }
 
 
+# Summaries of the project files that the code uses, already documented
+def dependencies_context_prompt(context):
+    if not context:
+        return ""
+    return f"""
+    The code uses these files of the project, which are already documented. Use them to understand the calls but do NOT document them:
+    {context}
+    """
+
+
 # Used to generate documentation for a full code file
-def generate_full_document_prompt(code, extension):
+def generate_full_document_prompt(code, extension, context=""):
     return f"""
     You are a professional coding and documentation assitant.
     You will be given a code written in {programming_languages[extension][0]} and your job is to generate and add the appropiate documentation for it.
@@ -86,14 +96,14 @@ def generate_full_document_prompt(code, extension):
     Do NOT alter the code or omit them; only add the documentation.
 
     Do NOT add anything to the code block besides the documentation and the code.
-
+    {dependencies_context_prompt(context)}
     This is the code to document:
     {code}
     """
 
 
 # Generates documentation for only one function
-def generate_document_for_funct_prompt(code, extension):
+def generate_document_for_funct_prompt(code, extension, context=""):
     return f"""
     You are a professional coding and documentation assistant.
     You will be given a function written in {programming_languages[extension][0]}, and your job is to generate the appropriate documentation for it.
@@ -128,12 +138,55 @@ def generate_document_for_funct_prompt(code, extension):
     Do NOT write observations.
 
     ONLY respond with a code block, omit anything else.
-
+    {dependencies_context_prompt(context)}
     This is the function to document:
     {code}
     """
 
 
+# Generates documentation for several functions in one request, each one is answered under its number
+def generate_document_for_functs_prompt(functions, extension, context=""):
+    functions_text = "\n".join(
+        f"""
+    ### FUNCTION {number}
+    {code}
+    """
+        for number, code in functions
+    )
+    return f"""
+    You are a professional coding and documentation assistant.
+    You will be given {len(functions)} functions written in {programming_languages[extension][0]}, and your job is to generate the appropriate documentation for each one of them.
+
+    Create a comprehensive documentation for each function given.
+    Do NOT generate anything else besides the documentation.
+
+    ALWAYS use this documentation style: {programming_languages[extension][1]}
+
+    The documentation of each function should include a brief overview of the following:
+    - Purpose of the function with a detailed description of what the function does.
+    - Descriptions of input parameters
+    - Return values
+    - Exceptions handled in the function
+
+    The description of each function MUST be within its code block.
+
+    The description of each function MUST be written with natural language.
+
+    For EACH function, write its header line exactly as given (for example ### FUNCTION 1) followed by ONE code block with the function and its documentation.
+
+    Answer the functions in the order given and do NOT omit any of them.
+
+    Do NOT alter the functions; only add the documentation.
+
+    Do NOT add anything to the code blocks besides the documentation and the function.
+
+    Do NOT write observations.
+    {dependencies_context_prompt(context)}
+    These are the functions to document:
+    {functions_text}
+    """
+
+
 generate_epic = (
     lambda epic_name: f"""Generate at least 5 user stories for the Epic {epic_name} in the project Innovasports Mobile, which is a mobile application designed for selling shoes.
 Each user story should consist of a title, a detailed description, and acceptance criteria to ensure clarity and understanding.
@@ -1,4 +1,5 @@
-CODE_FROM_ALL_EXTENSIONS = r"```(?:javascript|java|csharp|c#|C#|python)*(.*)```"
+# Header of each function in the response to a batch of functions
+FUNCTION_MARKER = r"^[ \t]*#{1,6}[ \t]*FUNCTION[ \t]+(\d+)[^\n]*$"
 PARAM_CSHARP = r"^\s*<\s*param\s*name\s*=\s*\"([\w\s]*)\">([\w\.\-\s<>=\"/{}]*)</param>\s*$"
 RETURN_CSHARP = r"^\s*<\s*returns\s*>([\w\.\-\s<>=\"/{}]*)</returns>\s*$"
 EXCEPTION_CSHARP = r"^\s*<\s*exception\s*cref\s*=\s*\"([\w\s.]*)\">([\w\.\-\s<>=\"/{}]*)</exception>\s*$"
@@ -1,4 +1,5 @@
 from fridacli.file_manager import FileManager
+from fridacli.config import get_vars_as_dict
 from fridacli.commands.subcommands.path_utilities import (
     check_samepath,
     check_valid_dir,
@@ -34,12 +35,13 @@ def open_subcommand(path_to_open):
     if not valid_path:
         return ERROR_PATH_DOES_NOT_EXIST
 
-    logger.info(__name__, f"Open command with path: {path_to_open}")
+    logger.info(__name__, "Open command with path: %s", path_to_open)
     file_manager = FileManager()
     active_folder = file_manager.get_folder_status()
     current_folder_active = check_samepath(get_current_dir(), path_to_open)
 
     project_type, tree_str = file_manager.load_folder(path=os.path.abspath(path_to_open))
+    file_manager.start_watching(get_vars_as_dict().get("FILE_WATCHER", "auto"))
     # change_directory(path_to_open)
 
     formatted_path = get_relative_path(path_to_open)
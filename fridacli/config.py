@@ -36,22 +36,39 @@ if OS == "linux":
 
 def config_file_exists(path: str = config_file_path) -> bool:
     """Check if the configuration file already exists."""
-    logger.info(__name__, f"(config_file_exists) Checking if the configuration file exists in path: {path}")
+    logger.debug(__name__, "(config_file_exists) Checking if the configuration file exists in path: %s", path)
     return os.path.exists(path)
 
 
 def get_config_vars(path: str = config_file_path) -> Dict:
     """Retrieve configuration variables from a given configuration file."""
-    logger.info(__name__, f"(get_config_vars) Getting configuration variables from path: {path}")
+    logger.info(__name__, "(get_config_vars) Getting configuration variables from path: %s", path)
     if not config_file_exists():
         keys = {}
         
         keys["PROJECT_PATH"] = ""
         keys["LOGS_PATH"] = ""
         keys["LLMOPS_API_KEY"] = ""
+        keys["LLMOPS_API_BASE"] = ""
+        keys["LLMOPS_API_TYPE"] = ""
+        keys["LLMOPS_API_VERSION"] = ""
         keys["CHAT_MODEL_NAME"] = ""
         keys["CHAT_MODEL_NAME_V4"] = ""
         keys["PYTHON_ENV_PATH"] = ""
+        keys["PYTHON_WORKERS"] = "2"
+        keys["PYTHON_RUN_TIMEOUT"] = "30"
+        keys["PYTHON_RUN_CPU_SECONDS"] = "20"
+        keys["PYTHON_RUN_MEMORY_MB"] = "1024"
+        keys["PYTHON_RUN_MAX_OUTPUT_KB"] = "1024"
+        keys["LOG_LEVEL"] = "INFO"
+        keys["FILE_WATCHER"] = "auto"
+        keys["DOC_PARALLELISM"] = "5"
+        keys["DOC_FILE_TIMEOUT"] = "600"
+        keys["DOC_BATCH_TOKENS"] = "1500"
+        keys["LLM_CONCURRENCY"] = "4"
+        keys["RESPONSE_CACHE"] = "on"
+        keys["RESPONSE_CACHE_TTL_DAYS"] = "30"
+        keys["RESPONSE_CACHE_MAX_MB"] = "100"
         write_config_to_file(keys)
         
     config_variables = {}
@@ -59,13 +76,13 @@ def get_config_vars(path: str = config_file_path) -> Dict:
         for line in file:
             key, value = line.strip().split("=")
             config_variables[key] = value
-    logger.info(__name__, f"(get_config_vars) Configuration variables: {config_variables}")
+    logger.debug(__name__, "(get_config_vars) Configuration variables: %s", config_variables)
     return config_variables
 
 
 def get_username() -> str:
     """Returns the name of the current user."""
-    logger.info(__name__, "(get_username) Getting the username")
+    logger.debug(__name__, "(get_username) Getting the username")
     try:
         if OS == "win":
             return os.getlogin()
@@ -80,31 +97,32 @@ def get_username() -> str:
 
 def write_config_to_file(keys: dict, path: str = config_file_path) -> None:
     """Write the configuration file with the API key."""
-    logger.info(__name__, f"(write_config_to_file) Writing configuration file with keys: {str(keys)} in path: {str(path)}")
+    logger.debug(__name__, "(write_config_to_file) Writing configuration file with keys: %s in path: %s", keys, path)
     try:
         if config_file_exists():
             os.remove(path)
         for key, value in keys.items():
             command = f"echo {key}={value} >> {path}"
             os.system(command)
+        logger.load_config(path)
     except Exception as e:
-        logger.error(__name__, f"Error configurating api keys: {str(e)}")
+        logger.error(__name__, "Error configurating api keys: %s", e)
 
 
 def read_config_file(path: str = config_file_path) -> str:
     """Read the contents of a configuration file and returns it."""
-    logger.info(__name__, f"(read_config_file) Reading configuration file in path: {path}")
+    logger.debug(__name__, "(read_config_file) Reading configuration file in path: %s", path)
     try:
         with open(path, "r") as file_content:
             configfile_content = file_content.read()
         return configfile_content.rstrip("\n")
     except Exception as e:
-        logger.error(__name__, f"Error reading cong file: {str(e)}")
+        logger.error(__name__, "Error reading cong file: %s", e)
 
 
 def get_vars_as_dict():
     """Get the variables as a dictionary."""
-    logger.info(__name__, "(get_vars_as_dict) Getting the variables as a dictionary")
+    logger.debug(__name__, "(get_vars_as_dict) Getting the variables as a dictionary")
     result_dict = {
         key_value.split("=")[0]: key_value.split("=")[1]
         for key_value in read_config_file().split("\n")
@@ -1,9 +1,20 @@
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from .graph import Tree
+from .project_index import ProjectIndex
+from .file_registry import FileRegistry
+from .content_cache import ContentCache
+from .ignore_rules import IgnoreRules, GITIGNORE_FILE
+from .watcher import ProjectWatcher, CREATED, DELETED, MOVED
+import threading
 import os
 from fridacli.logger import Logger
 
 logger = Logger()
+content_cache = ContentCache()
+
+# Number of threads that list directories in parallel while loading a project
+TRAVERSAL_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 
 class FileManager:
@@ -22,59 +33,144 @@ class FileManager:
             self.__folder_path = ""
             self.__folder_status = False
             self.__tree = None
-            self.__files = {}
+            self.__files = FileRegistry()
             self.__extension_counter = Counter()
+            self.__index = None
+            self.__dependency_graph = None
+            self.__nodes = {}
+            self.__rules = {}
+            self.__lock = threading.RLock()
+            self.__watcher = None
+            self.__listeners = []
             self._initialized = True
 
     def get_files(self):
         """
-            Get the files in the project
+            Get the files in the project, as paths relative to the project folder
         """
-        logger.info(__name__, f"(get_files) Getting files: {str(list(self.__files.keys()))}")
+        logger.debug(__name__, "(get_files) Getting %s files", len(self.__files))
         try:
-            return list(self.__files.keys())
+            return self.__files.paths()
         except Exception as e:
-            logger.error(__name__, f"(get_files) Error getting files: {str(e)}")
-    
+            logger.error(__name__, "(get_files) Error getting files: %s", e)
+
+    def find_files(self, name):
+        """
+            Get every file a name can refer to (relative path, basename or path suffix)
+        """
+        logger.debug(__name__, "(find_files) Finding files name: %s", name)
+        return self.__files.find(name)
+
+    def has_file(self, path):
+        """
+            Check if a relative or absolute path is a file of the project
+        """
+        return path in self.__files
+
+    def find_files_by_prefix(self, prefix):
+        return self.__files.find_by_prefix(prefix)
+
+    def find_files_by_suffix(self, suffix):
+        return self.__files.find_by_suffix(suffix)
+
+    def get_relative_path(self, path):
+        """
+            Get the key of a file in the project (its path relative to the project folder)
+        """
+        return self.__files.relative(path)
+
     def get_file_path(self, name):
         """
             Get the file path of a file in the project
         """
-        logger.info(__name__, f"(get_file_path) Getting file path name: {name}")
+        logger.debug(__name__, "(get_file_path) Getting file path name: %s", name)
         try:
-            return self.__files.get(name, -1)
+            candidates = self.__files.find(name)
+            if not candidates:
+                return -1
+            if len(candidates) > 1:
+                logger.warning(__name__, "(get_file_path) %s matches %s files, using %s", name, len(candidates), candidates[0])
+            return self.__files.absolute(candidates[0])
         except Exception as e:
-            logger.error(__name__, f"(get_file_path) Error getting file path: {str(e)}")
+            logger.error(__name__, "(get_file_path) Error getting file path: %s", e)
         
     def get_file_content(self, name):
         """
             Get the file content of a file in the project
         """
-        logger.info(__name__, f"(get_file_content) Getting file content name: {name}")
+        logger.debug(__name__, "(get_file_content) Getting file content name: %s", name)
         try:
-            path = self.__files.get(name, -1)
-            with open(path, "r") as f:
-                code = f.read()
-                return code
+            path = self.get_file_path(name)
+            return content_cache.read(path)
         except Exception as e:
-            logger.error(__name__, f"Error getting file content: {str(e)}")
+            logger.error(__name__, "Error getting file content: %s", e)
 
-    def __traverse(self, path, current_node):
+    def __list_dir(self, path, rules):
+        """
+            List a directory without the ignored entries, returns the entries and the rules for its subdirectories
+        """
+        try:
+            entries = self.__index.list_dir(path)
+        except Exception as e:
+            logger.error(__name__, "(__list_dir) Error listing %s: %s", path, e)
+            return [], rules
+
+        if any(item == GITIGNORE_FILE and not is_dir for item, is_dir in entries):
+            rules = rules.child(path)
+        if not rules.rules:
+            # Without .gitignore patterns only the directory names have to be checked
+            return [
+                (item, is_dir)
+                for item, is_dir in entries
+                if not (is_dir and item in rules.ignored_dirs)
+            ], rules
+        listing = [
+            (item, is_dir)
+            for item, is_dir in entries
+            if not rules.is_ignored(os.path.join(path, item), item, is_dir)
+        ]
+        return listing, rules
+
+    def __scan_directories(self, path, rules=None):
+        """
+            List every directory of the project in parallel, each subdirectory is submitted as soon as its parent is listed
+        """
+        listings = {}
+        with ThreadPoolExecutor(
+            max_workers=TRAVERSAL_WORKERS, thread_name_prefix="fridacli-traverse"
+        ) as executor:
+            pending = {executor.submit(self.__list_dir, path, rules or IgnoreRules()): path}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    listing, rules = future.result()
+                    listings[directory] = listing
+                    # Kept to check the entries that the watcher reports later
+                    self.__rules[directory] = rules
+                    for item, is_dir in listing:
+                        if is_dir:
+                            item_path = os.path.join(directory, item)
+                            pending[executor.submit(self.__list_dir, item_path, rules)] = item_path
+        return listings
+
+    def __traverse(self, path, current_node, listings):
         """
             Traverse recursively a directory to create the graphs
         """
 
-        logger.info(__name__, f"(__traverse) Traversing path: {path} current_node: {current_node}")
+        logger.debug(__name__, "(__traverse) Traversing path: %s current_node: %s", path, current_node)
         try:
-            for item in os.listdir(path):
+            for item, is_dir in listings.get(path, []):
                 item_path = os.path.join(path, item)
 
-                if os.path.isdir(item_path):
+                if is_dir:
                     child_node = Tree(item_path)
                     current_node.add_children(child_node)
-                    self.__traverse(item_path, child_node)
+                    self.__nodes[item_path] = child_node
+                    self.__traverse(item_path, child_node, listings)
                 else:
-                    self.__files[item] = item_path
+                    self.__files.add(item_path)
 
                     item_parts = item.split(".")
                     if len(item_parts) == 2:
@@ -82,7 +178,7 @@ class FileManager:
                         self.__extension_counter[extension] += 1
                         current_node.add_children(Tree(item_path))
         except Exception as e:
-            logger.error(__name__, f"(__traverse) Error traversing: {str(e)}")
+            logger.error(__name__, "(__traverse) Error traversing: %s", e)
 
     def __build_directory_tree(self, path):
         """
@@ -95,11 +191,20 @@ class FileManager:
         - None
         """
 
-        logger.info(__name__, f"(__build_directory_tree) Building directory tree path: {path}")
-        root_node = Tree(path)
-        self.__files = {}
-        self.__traverse(path, root_node)
-        return root_node
+        logger.info(__name__, "(__build_directory_tree) Building directory tree path: %s", path)
+        with self.__lock:
+            root_node = Tree(path)
+            self.__files = FileRegistry(path)
+            self.__extension_counter = Counter()
+            self.__nodes = {path: root_node}
+            self.__rules = {}
+            if self.__index is None or self.__index.root != path:
+                self.__index = ProjectIndex(path)
+            self.__index.begin()
+            listings = self.__scan_directories(path)
+            self.__traverse(path, root_node, listings)
+            self.__index.commit()
+            return root_node
 
 
     def load_folder(self, path: str):
@@ -110,7 +215,9 @@ class FileManager:
                 -When a directory is empty is printed as a file and the next dir
                 have wrong identation
         """
-        logger.info(__name__, f"(load_folder) Loading folder path: {path}")
+        logger.info(__name__, "(load_folder) Loading folder path: %s", path)
+        if self.__watcher is not None and self.__watcher.root != path:
+            self.stop_watching()
         self.__folder_status = True
         self.__folder_path = path
         # know the project type
@@ -121,14 +228,155 @@ class FileManager:
             project_type = ",".join(top_three_extensions)
             tree_str = self.__tree.print_directory()
         except Exception as e:
-            logger.error(__name__, f"(load_folder) Error loading folder: {str(e)}")
+            logger.error(__name__, "(load_folder) Error loading folder: %s", e)
         return (project_type, tree_str)
 
+    def get_dependency_graph(self, rebuild: bool = True):
+        """
+            Get the import graph of the project, rebuilt from the files that changed since the last build
+        """
+        # Imported here so the file manager doesn't load the tree-sitter grammars until they are needed
+        from .dependency_graph import DependencyGraph
+
+        with self.__lock:
+            if self.__dependency_graph is None or self.__dependency_graph.root != self.__folder_path:
+                self.__dependency_graph = DependencyGraph(self)
+                rebuild = True
+            graph = self.__dependency_graph
+        if rebuild:
+            graph.build()
+        return graph
+
+    def __uncount(self, node) -> None:
+        """
+            Subtract the files of a removed Tree node from the extension counter
+        """
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            if current.path in self.__nodes:
+                pending.extend(current.get_children())
+                continue
+            extension = current.name.split(".")[1]
+            self.__extension_counter[extension] -= 1
+            if self.__extension_counter[extension] <= 0:
+                del self.__extension_counter[extension]
+
+    def __remove_path(self, path, is_dir):
+        parent = self.__nodes.get(os.path.dirname(path))
+        node = parent.remove_children(path) if parent is not None else None
+        if is_dir:
+            prefix = os.path.join(path, "")
+            if node is not None:
+                self.__uncount(node)
+            for directory in [d for d in self.__nodes if d == path or d.startswith(prefix)]:
+                del self.__nodes[directory]
+                self.__rules.pop(directory, None)
+            self.__files.remove_directory(path)
+        else:
+            if node is not None:
+                self.__uncount(node)
+            self.__files.remove(path)
+            content_cache.invalidate(path)
+
+    def __add_path(self, path, is_dir):
+        parent_path = os.path.dirname(path)
+        parent = self.__nodes.get(parent_path)
+        rules = self.__rules.get(parent_path)
+        name = os.path.basename(path)
+        # Outside of the loaded tree, ignored or already added by the scan of a new directory
+        if parent is None or rules is None or rules.is_ignored(path, name, is_dir):
+            return
+        if is_dir:
+            if path in self.__nodes:
+                return
+            node = Tree(path)
+            parent.add_children(node)
+            self.__nodes[path] = node
+            self.__traverse(path, node, self.__scan_directories(path, rules))
+        else:
+            if path in self.__files:
+                return
+            self.__files.add(path)
+            item_parts = name.split(".")
+            if len(item_parts) == 2:
+                self.__extension_counter[item_parts[1]] += 1
+                parent.add_children(Tree(path))
+
+    def apply_events(self, events: list) -> None:
+        """
+            Update the files, the extension counter and the Tree with the changes reported by the watcher
+        """
+        logger.debug(__name__, "(apply_events) Applying %s events", len(events))
+        with self.__lock:
+            for event in events:
+                try:
+                    if event.kind in (DELETED, MOVED):
+                        self.__remove_path(event.path, event.is_dir)
+                    if event.kind == CREATED:
+                        self.__add_path(event.path, event.is_dir)
+                    elif event.kind == MOVED:
+                        self.__add_path(event.dest_path, event.is_dir)
+                except Exception as e:
+                    logger.error(__name__, "(apply_events) Error applying %s: %s", event, e)
+        for listener in list(self.__listeners):
+            try:
+                listener(events)
+            except Exception as e:
+                logger.error(__name__, "(apply_events) Error in listener: %s", e)
+
+    def get_tree(self) -> Tree:
+        """
+            Get the directory Tree of the current project
+        """
+        return self.__tree
+
+    def get_project_type(self) -> str:
+        """
+            Get the most common extension of the project, kept current by the watcher
+        """
+        with self.__lock:
+            return ",".join(ext for ext, _ in self.__extension_counter.most_common(1))
+
+    def start_watching(self, mode: str = "auto") -> None:
+        """
+            Watch the current project and apply its changes without loading it again
+        """
+        self.stop_watching()
+        if mode == "off" or not self.__folder_status:
+            return
+        try:
+            self.__watcher = ProjectWatcher(self.__folder_path, self.apply_events, mode)
+            self.__watcher.start()
+        except Exception as e:
+            logger.error(__name__, "(start_watching) Error watching %s: %s", self.__folder_path, e)
+            self.__watcher = None
+
+    def stop_watching(self) -> None:
+        if self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+
+    def is_watching(self) -> bool:
+        return self.__watcher is not None and self.__watcher.is_running()
+
+    def add_listener(self, callback) -> None:
+        """
+            Call callback with each batch of events, after they are applied (from the watcher thread)
+        """
+        if callback not in self.__listeners:
+            self.__listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        if callback in self.__listeners:
+            self.__listeners.remove(callback)
+
     def close_folder(self) -> None:
         """
             Close the current project
         """
         logger.info(__name__, "(close_folder) Closing folder")
+        self.stop_watching()
         self.__folder_status = False
         self.__folder_path = None
 
@@ -136,20 +384,20 @@ class FileManager:
         """
             Set the directory of the project
         """
-        logger.info(__name__, f"(set_dir) Setting directory: {file_directory}")
+        logger.info(__name__, "(set_dir) Setting directory: %s", file_directory)
         self.__folder_path = file_directory
 
     def get_folder_status(self) -> bool:
         """
             Get the status of the folder
         """
-        logger.info(__name__, f"(get_folder_status) Getting folder status: {str(self.__folder_status)}")
+        logger.debug(__name__, "(get_folder_status) Getting folder status: %s", self.__folder_status)
         return self.__folder_status
 
     def get_folder_path(self) -> str:
         """
             Get the path of the folder
         """
-        logger.info(__name__, f"(get_folder_path) Getting folder path: {str(self.__folder_path)}")
+        logger.debug(__name__, "(get_folder_path) Getting folder path: %s", self.__folder_path)
         return str(self.__folder_path)
 
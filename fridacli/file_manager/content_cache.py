@@ -0,0 +1,137 @@
+import os
+import mmap
+import locale
+import hashlib
+import threading
+from collections import OrderedDict
+from fridacli.logger import Logger
+
+logger = Logger()
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Files from this size on are read through mmap instead of a buffered read
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024
+
+
+class ContentCache:
+    """
+    Singleton cache of the text of the project files, shared by FileManager and FridaCoder.
+
+    Attributes:
+        - max_bytes (int): Budget of the cached contents, the least recently used files are evicted first.
+        - mmap_threshold (int): Size from which the files are read with mmap, 0 disables mmap.
+        - __entries (OrderedDict): For each path its (mtime_ns, size, digest), in LRU order.
+        - __blobs (dict): For each digest the decoded text and the number of paths that use it.
+
+    An entry is valid while the mtime and the size of the file don't change. Files with
+    the same bytes share one text, and only that text counts against the budget.
+    The text is decoded like open(path, "r") does: locale encoding and universal newlines.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ContentCache, cls).__new__(cls)
+            cls._instance.max_bytes = DEFAULT_MAX_BYTES
+            cls._instance.mmap_threshold = DEFAULT_MMAP_THRESHOLD
+            cls._instance.__entries = OrderedDict()
+            cls._instance.__blobs = {}
+            cls._instance.__bytes = 0
+            cls._instance.__hits = 0
+            cls._instance.__misses = 0
+            cls._instance.__lock = threading.Lock()
+        return cls._instance
+
+    def configure(self, max_bytes: int = None, mmap_threshold: int = None) -> None:
+        """
+            Update the limits, None keeps the current value
+        """
+        with self.__lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if mmap_threshold is not None:
+                self.mmap_threshold = mmap_threshold
+            self.__evict()
+
+    def read(self, path: str) -> str:
+        """
+            Get the text of a file, from the cache while the file doesn't change
+        """
+        stat = os.stat(path)
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self.__entries.move_to_end(path)
+                self.__hits += 1
+                return self.__blobs[entry[2]][0]
+            self.__misses += 1
+
+        data = self.__read_bytes(path, stat.st_size)
+        digest = hashlib.sha1(data).hexdigest()
+        with self.__lock:
+            blob = self.__blobs.get(digest)
+            text = blob[0] if blob is not None else self.__decode(data)
+            self.__remove(path)
+            if len(data) > self.max_bytes:
+                return text
+            if blob is None:
+                self.__blobs[digest] = [text, 1, len(data)]
+                self.__bytes += len(data)
+            else:
+                blob[1] += 1
+            self.__entries[path] = (stat.st_mtime_ns, stat.st_size, digest)
+            self.__evict()
+            return text
+
+    def invalidate(self, path: str) -> None:
+        """
+            Forget a file, used after writing it
+        """
+        with self.__lock:
+            self.__remove(path)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries = OrderedDict()
+            self.__blobs = {}
+            self.__bytes = 0
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "files": len(self.__entries),
+                "unique_contents": len(self.__blobs),
+                "bytes": self.__bytes,
+                "hits": self.__hits,
+                "misses": self.__misses,
+            }
+
+    def __read_bytes(self, path: str, size: int) -> bytes:
+        with open(path, "rb") as f:
+            if self.mmap_threshold and size >= self.mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:]
+            return f.read()
+
+    def __decode(self, data: bytes) -> str:
+        text = data.decode(locale.getpreferredencoding(False))
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def __remove(self, path: str) -> None:
+        entry = self.__entries.pop(path, None)
+        if entry is None:
+            return
+        blob = self.__blobs[entry[2]]
+        blob[1] -= 1
+        if blob[1] == 0:
+            del self.__blobs[entry[2]]
+            self.__bytes -= blob[2]
+
+    def __evict(self) -> None:
+        while self.__bytes > self.max_bytes and self.__entries:
+            path = next(iter(self.__entries))
+            logger.debug(__name__, "(__evict) Evicting %s", path)
+            self.__remove(path)
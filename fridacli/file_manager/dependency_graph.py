@@ -0,0 +1,334 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fridacli.config import FRIDA_DIR_PATH
+from fridacli.logger import Logger
+from .graph import Graph, AdjNode
+from .languages import LANGUAGES, get_parser
+
+logger = Logger()
+
+DEPENDENCY_INDEX_PATH = os.path.join(FRIDA_DIR_PATH, "dependency_index")
+INDEX_VERSION = 1
+PARSE_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+# Imports (and the packages or namespaces a file declares) of each language
+QUERIES = {
+    ".py": "(import_statement) @import (import_from_statement) @from",
+    ".java": "(package_declaration) @package (import_declaration) @import",
+    ".cs": """
+        (using_directive) @using
+        (namespace_declaration name: (_) @namespace)
+        (file_scoped_namespace_declaration name: (_) @namespace)
+    """,
+}
+_compiled_queries = {}
+
+
+def get_query(extension: str):
+    if extension not in _compiled_queries:
+        _compiled_queries[extension] = LANGUAGES[extension].query(QUERIES[extension])
+    return _compiled_queries[extension]
+
+
+def _text(node) -> str:
+    return node.text.decode("utf8", errors="replace")
+
+
+def _python_module(node) -> str:
+    # dotted_name, or aliased_import whose name is the dotted_name
+    if node.type == "aliased_import":
+        node = node.child_by_field_name("name")
+    return _text(node)
+
+
+def extract_python(root) -> tuple:
+    """
+        Get the modules imported by a Python file, relative ones keep their leading dots
+    """
+    imports = []
+    for node, capture in get_query(".py").captures(root):
+        if capture == "import":
+            imports.extend(_python_module(name) for name in node.children_by_field_name("name"))
+            continue
+        module_node = node.child_by_field_name("module_name")
+        if module_node is None:
+            continue
+        module = _text(module_node).replace(" ", "")
+        imports.append(module)
+        # "from pkg import name" can import the submodule pkg.name
+        separator = "" if module.endswith(".") else "."
+        for name in node.children_by_field_name("name"):
+            imports.append(f"{module}{separator}{_python_module(name)}")
+    return imports, []
+
+
+def extract_java(root) -> tuple:
+    """
+        Get the classes (or "package.*") imported by a Java file and its package
+    """
+    imports, declares = [], []
+    for node, capture in get_query(".java").captures(root):
+        names = [child for child in node.named_children if child.type in ("scoped_identifier", "identifier")]
+        if not names:
+            continue
+        name = _text(names[0])
+        if capture == "package":
+            declares.append(name)
+            continue
+        is_static = any(child.type == "static" for child in node.children)
+        is_wildcard = any(child.type == "asterisk" for child in node.children)
+        if is_static and not is_wildcard:
+            # import static package.Class.member
+            name = name.rsplit(".", 1)[0]
+        imports.append(f"{name}.*" if is_wildcard and not is_static else name)
+    return imports, declares
+
+
+def extract_csharp(root) -> tuple:
+    """
+        Get the namespaces (or types) used by a C# file and the namespaces it declares
+    """
+    imports, declares = [], []
+    for node, capture in get_query(".cs").captures(root):
+        if capture == "namespace":
+            declares.append(_text(node))
+            continue
+        alias = node.child_by_field_name("name")
+        names = [
+            child
+            for child in node.named_children
+            if child.type in ("qualified_name", "identifier") and child != alias
+        ]
+        if names:
+            imports.append(_text(names[-1]))
+    return imports, declares
+
+
+EXTRACTORS = {
+    ".py": extract_python,
+    ".java": extract_java,
+    ".cs": extract_csharp,
+}
+
+
+class DependencyGraph:
+    """
+    Dependency graph of the project files, built from their imports with tree-sitter.
+
+    Attributes:
+        - file_manager (FileManager): The loaded project.
+        - __entries (dict): For each file (relative path) [mtime, size, imports, declares],
+          persisted in ~/fridacli/dependency_index so only the files that changed are parsed again.
+        - __graph (Graph): The graph of the last build, the nodes are relative paths.
+        - __dependencies (dict): The project files imported by each file.
+        - __dependents (dict): The reverse adjacency list, which files import each file.
+
+    Python imports are resolved by path, Java imports by package and class name and
+    C# usings by the namespaces the files declare. Imports outside the project are dropped.
+    """
+
+    def __init__(self, file_manager, index_dir: str = DEPENDENCY_INDEX_PATH) -> None:
+        self.file_manager = file_manager
+        self.root = file_manager.get_folder_path()
+        digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()
+        self.__index_path = os.path.join(index_dir, f"{digest}.json")
+        self.__entries = {}
+        self.__dirty = False
+        self.__lock = threading.Lock()
+        self.__graph = Graph()
+        self.__dependencies = {}
+        self.__dependents = {}
+        self.__load()
+
+    def __load(self) -> None:
+        try:
+            if not os.path.exists(self.__index_path):
+                return
+            with open(self.__index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("root") == self.root:
+                self.__entries = data.get("files", {})
+        except Exception as e:
+            logger.error(__name__, "(__load) Error reading the dependency index: %s", e)
+            self.__entries = {}
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.__index_path), exist_ok=True)
+            tmp_path = f"{self.__index_path}.tmp"
+            data = json.dumps(
+                {"version": INDEX_VERSION, "root": self.root, "files": self.__entries},
+                separators=(",", ":"),
+            )
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.__index_path)
+            self.__dirty = False
+        except Exception as e:
+            logger.error(__name__, "(save) Error saving the dependency index: %s", e)
+
+    def __parse_file(self, file: str) -> list:
+        """
+            Get [mtime, size, imports, declares] of a file, parsing it only if it changed
+        """
+        path = self.file_manager.get_file_path(file)
+        try:
+            stat = os.stat(path)
+            cached = self.__entries.get(file)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                return cached
+            extension = os.path.splitext(file)[1]
+            with open(path, "rb") as f:
+                tree = get_parser(extension).parse(f.read())
+            imports, declares = EXTRACTORS[extension](tree.root_node)
+            with self.__lock:
+                self.__dirty = True
+            return [stat.st_mtime_ns, stat.st_size, imports, declares]
+        except Exception as e:
+            logger.error(__name__, "(__parse_file) Error parsing %s: %s", file, e)
+            return [0, 0, [], []]
+
+    def build(self) -> Graph:
+        """
+            Parse the supported files of the project in parallel and build the graph
+        """
+        files = [file for file in self.file_manager.get_files() if os.path.splitext(file)[1] in EXTRACTORS]
+        logger.info(__name__, "(build) Building the dependency graph of %s files", len(files))
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="fridacli-parse") as executor:
+            entries = dict(zip(files, executor.map(self.__parse_file, files)))
+        if len(entries) != len(self.__entries):
+            self.__dirty = True
+        self.__entries = entries
+
+        resolver = _Resolver(self.file_manager, entries)
+        graph = Graph()
+        dependencies, dependents = {}, {}
+        for file, (_, _, imports, _) in entries.items():
+            resolved = []
+            for spec in imports:
+                for target in resolver.resolve(file, spec):
+                    if target != file and target not in resolved:
+                        resolved.append(target)
+            graph.add_node(file, AdjNode(file, resolved))
+            dependencies[file] = resolved
+            for target in resolved:
+                dependents.setdefault(target, []).append(file)
+        graph.construct()
+
+        self.__graph, self.__dependencies, self.__dependents = graph, dependencies, dependents
+        if self.__dirty:
+            self.save()
+        return graph
+
+    def get_graph(self) -> Graph:
+        return self.__graph
+
+    def get_dependencies(self, file: str) -> list:
+        """
+            Get the project files imported by a file
+        """
+        return list(self.__dependencies.get(self.file_manager.get_relative_path(file), []))
+
+    def get_dependents(self, file: str) -> list:
+        """
+            Get the project files that import a file
+        """
+        return list(self.__dependents.get(self.file_manager.get_relative_path(file), []))
+
+    def get_neighbours(self, file: str, depth: int = 1) -> list:
+        """
+            Get the files up to depth imports away from a file, in both directions, nearest first
+        """
+        start = self.file_manager.get_relative_path(file)
+        seen = {start}
+        result = []
+        level = [start]
+        for _ in range(depth):
+            next_level = []
+            for current in level:
+                for neighbour in self.__dependencies.get(current, []) + self.__dependents.get(current, []):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        result.append(neighbour)
+                        next_level.append(neighbour)
+            level = next_level
+        return result
+
+
+class _Resolver:
+    """
+    Resolve the import specs of the files to project files.
+    """
+
+    def __init__(self, file_manager, entries: dict) -> None:
+        self.file_manager = file_manager
+        # Files of each Java package and C# namespace
+        self.declared = {}
+        for file, (_, _, _, declares) in entries.items():
+            for name in declares:
+                self.declared.setdefault(name, []).append(file)
+
+    def resolve(self, file: str, spec: str) -> list:
+        extension = os.path.splitext(file)[1]
+        if extension == ".py":
+            return self.__resolve_python(file, spec)
+        if extension == ".java":
+            return self.__resolve_java(spec)
+        return self.__resolve_csharp(spec)
+
+    def __closest(self, file: str, candidates: list) -> list:
+        # Several files end with the same path, keep the one that shares more folders with the importer
+        if len(candidates) <= 1:
+            return candidates
+        parts = file.split("/")
+
+        def shared(candidate):
+            count = 0
+            for a, b in zip(parts, candidate.split("/")):
+                if a != b:
+                    break
+                count += 1
+            return count
+
+        return [max(candidates, key=shared)]
+
+    def __resolve_python(self, file: str, spec: str) -> list:
+        module = spec.lstrip(".")
+        level = len(spec) - len(module)
+        module_path = module.replace(".", "/")
+        if level:
+            base = file.split("/")[:-1]
+            if level - 1 > len(base):
+                return []
+            base = base[: len(base) - (level - 1)]
+            prefix = "/".join(base + ([module_path] if module_path else []))
+            for candidate in (f"{prefix}.py", f"{prefix}/__init__.py" if prefix else "__init__.py"):
+                if self.file_manager.has_file(candidate):
+                    return [candidate]
+            return []
+        # Absolute imports: next to the file (scripts), from the root, or below a source folder
+        directory = file.rsplit("/", 1)[0] + "/" if "/" in file else ""
+        for suffix in (f"{module_path}.py", f"{module_path}/__init__.py"):
+            if self.file_manager.has_file(f"{directory}{suffix}"):
+                return [f"{directory}{suffix}"]
+            candidates = self.file_manager.find_files(suffix)
+            if candidates:
+                return self.__closest(file, candidates)
+        return []
+
+    def __resolve_java(self, spec: str) -> list:
+        if spec.endswith(".*"):
+            return list(self.declared.get(spec[:-2], []))
+        package, _, name = spec.rpartition(".")
+        files = [f for f in self.declared.get(package, []) if f.rsplit("/", 1)[-1] == f"{name}.java"]
+        return files or self.file_manager.find_files(spec.replace(".", "/") + ".java")
+
+    def __resolve_csharp(self, spec: str) -> list:
+        if spec in self.declared:
+            return list(self.declared[spec])
+        # using static Namespace.Type or an alias to a type
+        namespace, _, name = spec.rpartition(".")
+        return [f for f in self.declared.get(namespace, []) if f.rsplit("/", 1)[-1] == f"{name}.cs"]
@@ -0,0 +1,132 @@
+import os
+import sys
+import bisect
+import threading
+
+
+class FileRegistry:
+    """
+    The files of a project, keyed by their path relative to the project folder.
+
+    Attributes:
+        - root (str): The path of the project folder.
+        - __names (dict): For each relative path ("/" separated) its basename, in the order the files were added.
+        - __by_name (dict): For each basename the relative paths that have it.
+        - __sorted (list): The relative paths sorted, for the prefix lookups.
+        - __reversed (list): The relative paths reversed and sorted, for the suffix lookups.
+
+    The paths and the basenames are interned, so the indexes share the same strings.
+    The sorted lists are rebuilt on the first lookup after a change.
+    """
+
+    def __init__(self, root: str = "") -> None:
+        self.root = root
+        self.__prefix = os.path.join(root, "")
+        self.__names = {}
+        self.__by_name = {}
+        self.__sorted = None
+        self.__reversed = None
+        self.__lock = threading.RLock()
+
+    def relative(self, path: str) -> str:
+        """
+            Get the key of a path: relative paths are returned as they are and absolute ones made relative to root
+        """
+        if os.path.isabs(path):
+            if not path.startswith(self.__prefix):
+                return path
+            path = path[len(self.__prefix) :]
+        return path.replace("\\", "/")
+
+    def absolute(self, relative: str) -> str:
+        return os.path.join(self.root, relative.replace("/", os.sep))
+
+    def add(self, path: str) -> str:
+        relative = sys.intern(self.relative(path))
+        with self.__lock:
+            if relative in self.__names:
+                return relative
+            name = sys.intern(relative.rsplit("/", 1)[-1])
+            self.__names[relative] = name
+            self.__by_name.setdefault(name, []).append(relative)
+            self.__sorted = self.__reversed = None
+        return relative
+
+    def remove(self, path: str) -> bool:
+        relative = self.relative(path)
+        with self.__lock:
+            name = self.__names.pop(relative, None)
+            if name is None:
+                return False
+            candidates = self.__by_name[name]
+            candidates.remove(relative)
+            if not candidates:
+                del self.__by_name[name]
+            self.__sorted = self.__reversed = None
+        return True
+
+    def remove_directory(self, path: str) -> int:
+        """
+            Remove every file inside a directory, returns how many were removed
+        """
+        prefix = self.relative(path).rstrip("/") + "/"
+        removed = self.find_by_prefix(prefix)
+        for relative in removed:
+            self.remove(relative)
+        return len(removed)
+
+    def __contains__(self, path: str) -> bool:
+        return self.relative(path) in self.__names
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def paths(self) -> list:
+        with self.__lock:
+            return list(self.__names)
+
+    def find_by_name(self, name: str) -> list:
+        """
+            Get every file with the given basename
+        """
+        with self.__lock:
+            return list(self.__by_name.get(name, []))
+
+    def __get_sorted(self):
+        with self.__lock:
+            if self.__sorted is None:
+                self.__sorted = sorted(self.__names)
+                self.__reversed = sorted(relative[::-1] for relative in self.__names)
+            return self.__sorted, self.__reversed
+
+    def find_by_prefix(self, prefix: str) -> list:
+        """
+            Get the files whose relative path starts with prefix, sorted
+        """
+        prefix = prefix.replace("\\", "/")
+        sorted_paths, _ = self.__get_sorted()
+        start = bisect.bisect_left(sorted_paths, prefix)
+        end = bisect.bisect_left(sorted_paths, prefix + "\U0010ffff", start)
+        return sorted_paths[start:end]
+
+    def find_by_suffix(self, suffix: str) -> list:
+        """
+            Get the files whose relative path ends with suffix
+        """
+        reversed_suffix = suffix.replace("\\", "/")[::-1]
+        _, reversed_paths = self.__get_sorted()
+        start = bisect.bisect_left(reversed_paths, reversed_suffix)
+        end = bisect.bisect_left(reversed_paths, reversed_suffix + "\U0010ffff", start)
+        return sorted(relative[::-1] for relative in reversed_paths[start:end])
+
+    def find(self, reference: str) -> list:
+        """
+            Get the files a reference can point to: an absolute or relative path,
+            a basename or the last components of a path (e.g. "utils/__init__.py")
+        """
+        relative = self.relative(reference)
+        if relative in self.__names:
+            return [relative]
+        if "/" not in relative:
+            return sorted(self.find_by_name(relative))
+        return self.find_by_suffix("/" + relative.lstrip("/"))
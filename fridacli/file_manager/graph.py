@@ -21,29 +21,70 @@ class Tree:
         ExampleNode = Node(is_dir=True, name="example_directory", files_name=["file1.txt", "file2.txt"])
     """
 
+    __slots__ = ("path", "name", "__children")
+
     def __init__(self, path):
         self.path = path
-        self.name = os.path.basename(path)
-        self.__children = []
+        # Same as os.path.basename, without its overhead when there is only one separator
+        self.name = os.path.basename(path) if os.altsep else path[path.rfind(os.sep) + 1 :]
+        # Most nodes are files, the list is only created for the first child
+        self.__children = None
 
     def add_children(self, node):
-        self.__children.append(node)
+        if self.__children is None:
+            self.__children = [node]
+        else:
+            self.__children.append(node)
 
     def get_children(self):
-        return self.__children
+        return self.__children or ()
+
+    def remove_children(self, path):
+        """
+            Remove the child with the given path, returns it or None if it is not a child
+        """
+        for index, child in enumerate(self.get_children()):
+            if child.path == path:
+                return self.__children.pop(index)
+        return None
+
+    def print_directory(self, node=None, indent='', max_depth=None, max_nodes=None):
+        """
+        Render the tree below node, directories with "+" and files with "-".
+
+        Args:
+            node (Tree): The node to render, defaults to self.
+            indent (str): The indentation of the first line.
+            max_depth (int): The levels of directories rendered below node, None renders all of them.
+            max_nodes (int): The number of lines rendered, None renders all of them.
 
-    def print_directory(self, node=None, indent=''):
+        Returns:
+            str: The rendered tree, "..." marks the parts left out by the limits.
+        """
         if node == None:
             node = self
-        tree_string = f"{indent}+ {node.name}/\n"
-
-        for child in node.get_children():
+        lines = [f"{indent}+ {node.name}/\n"]
+        # Iterative depth-first walk, a stack of (children iterator, indent, depth)
+        stack = [(iter(node.get_children()), indent, 0)]
+        while stack:
+            children, current_indent, depth = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+            if max_nodes is not None and len(lines) >= max_nodes:
+                lines.append(f"{current_indent}- ...\n")
+                break
             if child.get_children():
-                tree_string += self.print_directory(child, indent + '  ')
+                lines.append(f"{current_indent}  + {child.name}/\n")
+                if max_depth is None or depth + 1 < max_depth:
+                    stack.append((iter(child.get_children()), current_indent + "  ", depth + 1))
+                else:
+                    lines.append(f"{current_indent}  - ...\n")
             else:
-                tree_string += f"{indent}- {child.name}\n"
+                lines.append(f"{current_indent}- {child.name}\n")
 
-        return tree_string
+        return "".join(lines)
 
 class AdjNode:
     """
@@ -175,3 +216,82 @@ class Graph:
 
     def get_nodes(self):
         return [i for i in list(self.__nodes.keys()) if self.__adj_list.get(i, -1) != -1]
+
+    def get_components(self, nodes=None):
+        """
+        Group the nodes in strongly connected components, the nodes of a dependency
+        cycle end up in the same component.
+
+        Args:
+            nodes (list): The nodes to consider, defaults to all of them. Edges to other nodes are ignored.
+
+        Returns:
+            list: The components (lists of node ids), each one after the components it depends on.
+        """
+        nodes = list(self.__nodes.keys()) if nodes is None else list(nodes)
+        allowed = set(nodes)
+        index, lowlink = {}, {}
+        stack, on_stack = [], set()
+        components = []
+        counter = 0
+
+        # Iterative Tarjan, the order it emits the components is dependencies first
+        for start in nodes:
+            if start in index:
+                continue
+            work = [(start, 0)]
+            while work:
+                node, edge = work.pop()
+                if edge == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                dependencies = [d for d in self.__adj_list.get(node, []) if d in allowed]
+                for position in range(edge, len(dependencies)):
+                    dependency = dependencies[position]
+                    if dependency not in index:
+                        work.append((node, position + 1))
+                        work.append((dependency, 0))
+                        break
+                    if dependency in on_stack:
+                        lowlink[node] = min(lowlink[node], index[dependency])
+                else:
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return components
+
+    def get_levels(self, nodes=None):
+        """
+        Split the nodes in levels, leaves first: the nodes of a level only depend on
+        nodes of previous levels or on nodes of their own dependency cycle.
+
+        Returns:
+            list: The levels, each one a list of components (lists of node ids).
+        """
+        components = self.get_components(nodes)
+        component_of = {node: i for i, component in enumerate(components) for node in component}
+        levels_of = []
+        levels = []
+        for i, component in enumerate(components):
+            level = 0
+            for node in component:
+                for dependency in self.__adj_list.get(node, []):
+                    other = component_of.get(dependency)
+                    if other is not None and other != i:
+                        level = max(level, levels_of[other] + 1)
+            levels_of.append(level)
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(component)
+        return levels
@@ -0,0 +1,142 @@
+import os
+import re
+from fridacli.logger import Logger
+
+logger = Logger()
+
+# Directories that are never part of the project sources
+DEFAULT_IGNORED_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "__pycache__",
+    ".venv",
+    "venv",
+    ".env",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".idea",
+    ".vs",
+    ".vscode",
+}
+GITIGNORE_FILE = ".gitignore"
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a .gitignore glob into a regular expression over "/" separated paths.
+
+    Args:
+        pattern (str): The glob, without the negation and the trailing slash.
+
+    Returns:
+        str: The equivalent regular expression.
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += pattern[i : end + 1].replace("[!", "[^")
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+
+class IgnoreRule:
+    """
+    One line of a .gitignore file.
+
+    Attributes:
+        - base (str): The directory that contains the .gitignore file.
+        - negated (bool): If the line starts with "!" (the path is included again).
+        - dir_only (bool): If the line ends with "/" (only directories match).
+        - regex (re.Pattern): The compiled pattern, matched against the path relative to base.
+    """
+
+    def __init__(self, base: str, line: str) -> None:
+        self.base = base
+        self.__prefix = os.path.join(base, "")
+        self.negated = line.startswith("!")
+        if self.negated:
+            line = line[1:]
+        self.dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        regex = glob_to_regex(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        self.regex = re.compile(regex + "$")
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if not path.startswith(self.__prefix):
+            return False
+        relative = path[len(self.__prefix) :].replace("\\", "/")
+        return self.regex.match(relative) is not None
+
+
+class IgnoreRules:
+    """
+    The rules used to skip files and directories while traversing a project:
+    the DEFAULT_IGNORED_DIRS plus the patterns of every .gitignore found on the way.
+
+    The object is not modified after creation, child() returns a new one with the
+    rules of a nested .gitignore, so it can be shared between traversal threads.
+    """
+
+    def __init__(self, ignored_dirs: set = None, rules: tuple = ()) -> None:
+        self.ignored_dirs = DEFAULT_IGNORED_DIRS if ignored_dirs is None else ignored_dirs
+        self.rules = rules
+
+    def child(self, directory: str) -> "IgnoreRules":
+        """
+            Get the rules for a directory that contains a .gitignore, adding its patterns
+        """
+        gitignore_path = os.path.join(directory, GITIGNORE_FILE)
+        rules = list(self.rules)
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    line = line.rstrip("\n").rstrip()
+                    if line and not line.startswith("#"):
+                        rules.append(IgnoreRule(directory, line))
+        except Exception as e:
+            logger.error(__name__, "(child) Error reading %s: %s", gitignore_path, e)
+        return IgnoreRules(self.ignored_dirs, tuple(rules))
+
+    def is_ignored(self, path: str, name: str, is_dir: bool) -> bool:
+        """
+            Check if a path must be skipped, the last matching pattern wins like in git
+        """
+        if is_dir and name in self.ignored_dirs:
+            return True
+        ignored = False
+        for rule in self.rules:
+            if rule.negated == ignored and rule.matches(path, is_dir):
+                ignored = not rule.negated
+        return ignored
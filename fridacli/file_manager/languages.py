@@ -0,0 +1,32 @@
+import threading
+from tree_sitter import Language, Parser
+import tree_sitter_c_sharp as tscsharp
+import tree_sitter_java as tsjava
+import tree_sitter_python as tspython
+
+PY_LANGUAGE = Language(tspython.language())
+CS_LANGUAGE = Language(tscsharp.language())
+JAVA_LANGUAGE = Language(tsjava.language())
+
+# Tree-sitter language of each supported extension
+LANGUAGES = {
+    ".py": PY_LANGUAGE,
+    ".cs": CS_LANGUAGE,
+    ".java": JAVA_LANGUAGE,
+}
+
+# A Parser can't be shared between threads, each thread gets its own
+_local = threading.local()
+
+
+def get_parser(extension: str) -> Parser:
+    """
+        Get the parser of an extension for the current thread, None if it is not supported
+    """
+    parsers = getattr(_local, "parsers", None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    if extension not in parsers:
+        language = LANGUAGES.get(extension)
+        parsers[extension] = Parser(language) if language is not None else None
+    return parsers[extension]
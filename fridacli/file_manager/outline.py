@@ -0,0 +1,63 @@
+from collections import namedtuple
+from .languages import LANGUAGES, get_parser
+
+# Classes and functions of each language
+QUERIES = {
+    ".py": "(class_definition) @symbol (function_definition) @symbol",
+    ".java": """
+        (class_declaration) @symbol (interface_declaration) @symbol (enum_declaration) @symbol
+        (method_declaration) @symbol (constructor_declaration) @symbol
+    """,
+    ".cs": """
+        (class_declaration) @symbol (interface_declaration) @symbol (struct_declaration) @symbol
+        (method_declaration) @symbol (constructor_declaration) @symbol
+    """,
+}
+_compiled_queries = {}
+
+# A class or a function of a file. The lines are 0-based and end is included,
+# header_end is the first line of the body (the header is start..header_end-1, at least one line).
+Symbol = namedtuple("Symbol", ["name", "start", "end", "header_end", "children"])
+
+
+def get_query(extension: str):
+    if extension not in _compiled_queries:
+        _compiled_queries[extension] = LANGUAGES[extension].query(QUERIES[extension])
+    return _compiled_queries[extension]
+
+
+def is_supported(extension: str) -> bool:
+    return extension in QUERIES
+
+
+def get_outline(text: str, extension: str) -> list:
+    """
+        Get the top level symbols of a file, each one with its nested symbols, in the order of the file
+    """
+    if not is_supported(extension):
+        return []
+    tree = get_parser(extension).parse(bytes(text, "utf8"))
+    nodes = sorted(
+        (node for node, _ in get_query(extension).captures(tree.root_node)),
+        key=lambda node: (node.start_byte, -node.end_byte),
+    )
+    roots = []
+    # Open symbols that can still contain the next ones
+    stack = []
+    for node in nodes:
+        name_node = node.child_by_field_name("name")
+        body = node.child_by_field_name("body")
+        start, end = node.start_point[0], node.end_point[0]
+        header_end = max(start + 1, body.start_point[0]) if body is not None else end + 1
+        symbol = Symbol(
+            name_node.text.decode("utf8", errors="replace") if name_node is not None else "",
+            start,
+            end,
+            min(header_end, end + 1),
+            [],
+        )
+        while stack and stack[-1].end < start:
+            stack.pop()
+        (stack[-1].children if stack else roots).append(symbol)
+        stack.append(symbol)
+    return roots
@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import threading
+from fridacli.config import FRIDA_DIR_PATH
+from fridacli.logger import Logger
+
+logger = Logger()
+
+PROJECT_INDEX_PATH = os.path.join(FRIDA_DIR_PATH, "project_index")
+INDEX_VERSION = 2
+
+
+class ProjectIndex:
+    """
+    Persistent index of the folders of a project, stored in ~/fridacli/project_index.
+
+    Attributes:
+        - root (str): The path of the project folder.
+        - __dirs (dict): For each directory (relative to root) its mtime and its entries.
+        - __visited (dict): The directories listed during the current load.
+
+    Each entry of a directory is a list [name, is_dir], kept in the order os.scandir
+    returned them. A directory is only listed again when its own mtime changed, which
+    is what happens when an entry is created, deleted or renamed inside it. Editing a
+    file doesn't change the mtime of its directory, so no stat of the files is stored.
+    """
+
+    def __init__(self, root: str, index_dir: str = PROJECT_INDEX_PATH) -> None:
+        self.root = root
+        digest = hashlib.sha1(root.encode("utf-8")).hexdigest()
+        self.__index_path = os.path.join(index_dir, f"{digest}.json")
+        self.__dirs = {}
+        self.__visited = {}
+        self.__dirty = False
+        self.__lock = threading.Lock()
+        self.__load()
+
+    def __load(self) -> None:
+        """
+            Read the index from disk, a missing or outdated index is ignored
+        """
+        try:
+            if not os.path.exists(self.__index_path):
+                return
+            with open(self.__index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("root") == self.root:
+                self.__dirs = data.get("dirs", {})
+        except Exception as e:
+            logger.error(__name__, "(__load) Error reading the project index: %s", e)
+            self.__dirs = {}
+
+    def __relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace("\\", "/")
+
+    def __scan(self, path: str) -> list:
+        entries = []
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                try:
+                    # DirEntry caches the type returned by the directory listing
+                    is_dir = entry.is_dir()
+                except OSError:
+                    # Broken links are kept as files, like os.path.isdir did
+                    is_dir = False
+                entries.append([entry.name, is_dir])
+        return entries
+
+    def begin(self) -> None:
+        """
+            Start a new load of the project
+        """
+        self.__visited = {}
+        self.__dirty = False
+
+    def list_dir(self, path: str) -> list:
+        """
+            Get the entries of a directory, from the index when the directory didn't change
+        """
+        relative = self.__relative(path)
+        dir_mtime = os.stat(path).st_mtime_ns
+        cached = self.__dirs.get(relative)
+        if cached is not None and cached["mtime"] == dir_mtime:
+            record = cached
+        else:
+            record = {"mtime": dir_mtime, "entries": self.__scan(path)}
+            self.__dirty = True
+        with self.__lock:
+            self.__visited[relative] = record
+        return record["entries"]
+
+    def commit(self) -> None:
+        """
+            Keep only the directories seen in the last load and save the index if it changed
+        """
+        if len(self.__visited) != len(self.__dirs):
+            self.__dirty = True
+        self.__dirs = self.__visited
+        self.__visited = {}
+        if self.__dirty:
+            self.save()
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.__index_path), exist_ok=True)
+            tmp_path = f"{self.__index_path}.tmp"
+            # json.dumps uses the C encoder, json.dump to a file does not
+            data = json.dumps(
+                {"version": INDEX_VERSION, "root": self.root, "dirs": self.__dirs},
+                separators=(",", ":"),
+            )
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.__index_path)
+            self.__dirty = False
+        except Exception as e:
+            logger.error(__name__, "(save) Error saving the project index: %s", e)
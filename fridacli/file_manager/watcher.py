@@ -0,0 +1,362 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from collections import namedtuple
+from .ignore_rules import DEFAULT_IGNORED_DIRS
+from fridacli.logger import Logger
+
+logger = Logger()
+
+WATCHER_MODES = ("auto", "inotify", "polling", "off")
+DEFAULT_POLL_INTERVAL = 1.0
+# Time the events are collected before they are delivered, so a burst (a git checkout,
+# a documentation run) arrives as one batch
+DEFAULT_DEBOUNCE = 0.2
+# Seconds stop waits for the thread, a listener that blocks can't hang the caller
+STOP_TIMEOUT = 2.0
+
+CREATED = "created"
+DELETED = "deleted"
+MOVED = "moved"
+
+# kind is CREATED, DELETED or MOVED, dest_path is only set for MOVED
+FileEvent = namedtuple("FileEvent", ["kind", "path", "is_dir", "dest_path"], defaults=[None])
+
+# Constants of <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """
+    Watch a project with the Linux inotify API, one watch per directory.
+
+    New directories are watched as soon as their creation is read. A rename inside
+    the project is reported as one MOVED event when both halves arrive in the same read,
+    otherwise as a DELETED or a CREATED event.
+    """
+
+    def __init__(self, root: str, ignored_dirs: set = DEFAULT_IGNORED_DIRS) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.__add_watch = libc.inotify_add_watch
+        self.__add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.__rm_watch = libc.inotify_rm_watch
+        self.__rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.__fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.__paths = {}
+        self.watch_tree(root)
+
+    def watch_tree(self, path: str) -> None:
+        """
+            Watch a directory and its subdirectories
+        """
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            wd = self.__add_watch(self.__fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "inotify watch limit reached")
+                # The directory was deleted or is not readable
+                continue
+            self.__paths[wd] = directory
+            try:
+                with os.scandir(directory) as iterator:
+                    for entry in iterator:
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in self.ignored_dirs:
+                            pending.append(entry.path)
+            except OSError:
+                continue
+
+    def read_events(self, timeout: float) -> list:
+        """
+            Wait up to timeout seconds and return the events read
+        """
+        ready, _, _ = select.select([self.__fd], [], [], timeout)
+        if not ready:
+            return []
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self.__fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        return self.__parse(data)
+
+    def __parse(self, data: bytes) -> list:
+        events = []
+        moved_from = {}
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning(__name__, "(read_events) inotify queue overflow in %s", self.root)
+                continue
+            directory = self.__paths.get(wd)
+            if mask & IN_IGNORED:
+                self.__paths.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            is_dir = bool(mask & IN_ISDIR)
+            if is_dir and name in self.ignored_dirs:
+                continue
+
+            if mask & IN_CREATE:
+                events.append(FileEvent(CREATED, path, is_dir))
+                if is_dir:
+                    self.watch_tree(path)
+            elif mask & IN_DELETE:
+                events.append(FileEvent(DELETED, path, is_dir))
+            elif mask & IN_MOVED_FROM:
+                moved_from[cookie] = len(events)
+                events.append(FileEvent(DELETED, path, is_dir))
+            elif mask & IN_MOVED_TO:
+                index = moved_from.pop(cookie, None)
+                if index is not None:
+                    events[index] = FileEvent(MOVED, events[index].path, is_dir, path)
+                else:
+                    events.append(FileEvent(CREATED, path, is_dir))
+                if is_dir:
+                    if index is not None:
+                        self.__forget(events[index].path)
+                    self.watch_tree(path)
+        for index in moved_from.values():
+            # Moved out of the project
+            if events[index].is_dir:
+                self.__forget(events[index].path)
+        return events
+
+    def __forget(self, path: str) -> None:
+        # The watches of a moved directory keep reporting the old path
+        prefix = os.path.join(path, "")
+        for wd, directory in list(self.__paths.items()):
+            if directory == path or directory.startswith(prefix):
+                self.__rm_watch(self.__fd, wd)
+                self.__paths.pop(wd, None)
+
+    def close(self) -> None:
+        try:
+            os.close(self.__fd)
+        except OSError:
+            pass
+        self.__paths = {}
+
+
+class PollingBackend:
+    """
+    Watch a project comparing the mtime of its directories every interval seconds.
+
+    Only the directories whose mtime changed are listed again. Renames are reported
+    as a DELETED and a CREATED event.
+    """
+
+    def __init__(
+        self, root: str, ignored_dirs: set = DEFAULT_IGNORED_DIRS, interval: float = DEFAULT_POLL_INTERVAL
+    ) -> None:
+        self.root = root
+        self.ignored_dirs = ignored_dirs
+        self.interval = interval
+        self.__snapshots = {}
+        self.__snapshot_tree(root)
+
+    def __list(self, path: str):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            entries = {}
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not (is_dir and entry.name in self.ignored_dirs):
+                        entries[entry.name] = is_dir
+            return mtime, entries
+        except OSError:
+            return None
+
+    def __snapshot_tree(self, path: str) -> None:
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            snapshot = self.__list(directory)
+            if snapshot is None:
+                continue
+            self.__snapshots[directory] = snapshot
+            for name, is_dir in snapshot[1].items():
+                if is_dir:
+                    pending.append(os.path.join(directory, name))
+
+    def __forget(self, path: str) -> None:
+        prefix = os.path.join(path, "")
+        for directory in list(self.__snapshots):
+            if directory == path or directory.startswith(prefix):
+                del self.__snapshots[directory]
+
+    def read_events(self, timeout: float) -> list:
+        """
+            Wait up to timeout seconds and return the changes found
+        """
+        time.sleep(min(timeout, self.interval))
+        events = []
+        for directory, (mtime, entries) in list(self.__snapshots.items()):
+            if directory not in self.__snapshots:
+                # Removed while handling a previous directory of this round
+                continue
+            try:
+                if os.stat(directory).st_mtime_ns == mtime:
+                    continue
+            except OSError:
+                continue
+            snapshot = self.__list(directory)
+            if snapshot is None:
+                continue
+            self.__snapshots[directory] = snapshot
+            current = snapshot[1]
+            for name, is_dir in entries.items():
+                if current.get(name) != is_dir:
+                    path = os.path.join(directory, name)
+                    events.append(FileEvent(DELETED, path, is_dir))
+                    if is_dir:
+                        self.__forget(path)
+            for name, is_dir in current.items():
+                if entries.get(name) != is_dir:
+                    path = os.path.join(directory, name)
+                    events.append(FileEvent(CREATED, path, is_dir))
+                    if is_dir:
+                        self.__snapshot_tree(path)
+        return events
+
+    def close(self) -> None:
+        self.__snapshots = {}
+
+
+class ProjectWatcher:
+    """
+    Background thread that watches a project folder and delivers the changes in batches.
+
+    Attributes:
+        - root (str): The path of the project folder.
+        - callback (callable): Called with the list of FileEvent of each batch, from the watcher thread.
+        - mode (str): "auto" uses inotify when it is available and polling otherwise,
+          "inotify" and "polling" force a backend.
+
+    The entries inside a new directory have no events of their own, the listener
+    has to list it.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        callback,
+        mode: str = "auto",
+        interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        self.root = root
+        self.callback = callback
+        self.mode = mode if mode in WATCHER_MODES else "auto"
+        self.interval = interval
+        self.debounce = debounce
+        self.backend = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def __create_backend(self):
+        if self.mode in ("auto", "inotify"):
+            try:
+                return InotifyBackend(self.root)
+            except Exception as e:
+                if self.mode == "inotify":
+                    raise
+                logger.warning(__name__, "(start) inotify not available, using polling: %s", e)
+        return PollingBackend(self.root, interval=self.interval)
+
+    def start(self) -> None:
+        if self.__thread is not None:
+            return
+        self.backend = self.__create_backend()
+        logger.info(__name__, "(start) Watching %s with %s", self.root, type(self.backend).__name__)
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name="fridacli-watcher", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+            Stop the thread, it closes the backend when it ends. No batch is delivered after this call
+        """
+        if self.__thread is None:
+            return
+        self.__stop.set()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join(STOP_TIMEOUT)
+            if self.__thread.is_alive():
+                logger.warning(__name__, "(stop) The watcher of %s is still delivering a batch", self.root)
+        self.__thread = None
+
+    def is_running(self) -> bool:
+        return self.__thread is not None
+
+    def __run(self) -> None:
+        try:
+            self.__watch()
+        finally:
+            self.backend.close()
+
+    def __watch(self) -> None:
+        while not self.__stop.is_set():
+            try:
+                events = self.backend.read_events(self.interval)
+                if not events:
+                    continue
+                # Collect the rest of the burst before delivering it
+                deadline = time.monotonic() + self.debounce
+                while not self.__stop.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    more = self.backend.read_events(remaining)
+                    if not more:
+                        break
+                    events.extend(more)
+                if not self.__stop.is_set():
+                    self.callback(events)
+            except Exception as e:
+                logger.error(__name__, "(__run) Error watching %s: %s", self.root, e)
+                self.__stop.wait(self.interval)
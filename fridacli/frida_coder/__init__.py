@@ -1,12 +1,17 @@
 import os
-import re
+import asyncio
 import datetime
-from fridacli.frida_coder.languague.python import Python
+from fridacli.frida_coder.languague import get_available_languages
+# The backends register their languages when imported
+from fridacli.frida_coder.languague import python, native  # noqa: F401
 from fridacli.config import HOME_PATH, SUPPORTED_PROGRAMMING_LANGUAGES, FRIDA_DIR_PATH
 from .exception_message import ExceptionMessage
+from .code_fences import get_closed_blocks
 from fridacli.file_manager import FileManager
+from fridacli.file_manager.content_cache import ContentCache
 from fridacli.logger import Logger
 logger = Logger()
+content_cache = ContentCache()
 
 
 class FridaCoder:
@@ -15,50 +20,56 @@ class FridaCoder:
         self.result_files_dir = f"{FRIDA_DIR_PATH}/fridatmp/results"
         self.code_blocks = []
         self.__file_manager = FileManager()
-        self.languages = {"python": {"extension": "py", "worker": Python()}}
+        self.languages = get_available_languages()
         logger.info(
             __name__,
-            f"""FridaCoder init
-            Code files directory: {self.code_files_dir}
-            Result files directory: {self.result_files_dir}
-        """,
+            """FridaCoder init
+            Code files directory: %s
+            Result files directory: %s
+        """, self.code_files_dir, self.result_files_dir,
         )
 
     def prepare(self, response):
         """
             Prepare the code blocks to be run
         """
-        logger.info(__name__, "(prepare) Preparing code blocks")
+        logger.debug(__name__, "(prepare) Preparing code blocks")
         self.code_blocks = []
         self.code_blocks = self.extract_code(response)
         return self.code_blocks
     
-    def run(self, code_block, files_required):
+    def run(self, code_block, files_required, on_output=None, cancel_event=None):
         """
-            Run the code block
+            Run the code block, on_output(stream, text) receives the output while it is printed
+            and setting cancel_event stops the run
         """
-        logger.info(__name__, f"(run) Running code block with code block: {str(code_block)} and files required: {str(files_required)}")
+        logger.debug(__name__, "(run) Running code block with code block: %s and files required: %s", code_block, files_required)
         language_info = self.get_language(code_block["language"])
-        logger.info(__name__, f"(run) Language info: {str(language_info)}")
+        logger.debug(__name__, "(run) Language info: %s", language_info)
         if language_info != None:
             """
             TODO:
                 Insted of only one files_required should be able to work with multiple
             """
             path = ""
-            if len(files_required) == 1:
+            # A required file of another language can't be run by this one, the code block is run then
+            if len(files_required) == 1 and files_required[0].lower().endswith(f".{language_info['extension']}"):
                 file_name = files_required[0]
                 path = self.__file_manager.get_file_path(file_name)
             else:
                 path = self.save_code_files(
                     code_block["code"], language_info["extension"]
                 )
-            logger.info(__name__, f"(run) The path {path}")
+            logger.info(__name__, "(run) The path %s", path)
             exec_status, exec_result = language_info["worker"].run(
-                path=path, file_extesion=language_info["extension"], file_exist=True
+                path=path,
+                file_extesion=language_info["extension"],
+                file_exist=True,
+                on_output=on_output,
+                cancel_event=cancel_event,
             )
 
-            logger.info(__name__, f"(run) Exec status: {str(exec_status)} Exec result: {str(exec_result)}")
+            logger.debug(__name__, "(run) Exec status: %s Exec result: %s", exec_status, exec_result)
             try:
                 jump_point = exec_result.find("\n")
                 result_status = exec_result[:jump_point]
@@ -81,65 +92,70 @@ class FridaCoder:
                         else exec_result[jump_point:]
                     ),
                 }
-                logger.info(__name__, f"(run) Payload: {str(payload)}")
+                logger.debug(__name__, "(run) Payload: %s", payload)
                 return payload
             except Exception as e:
-                logger.error(__name__, f"(run) Error getting file path: {str(e)}")
+                logger.error(__name__, "(run) Error getting file path: %s", e)
         else:
             return {"code": code_block["code"], "status": "LANGNF"}
 
+    async def arun(self, code_block, files_required, on_output=None, cancel_event=None):
+        """
+            Run the code block in a thread, the event loop isn't blocked while the code runs
+        """
+        return await asyncio.to_thread(self.run, code_block, files_required, on_output, cancel_event)
+
     def write_code_to_path(self, path: str, code: str):
         """
             Write the code to the given path
         """
-        logger.info(__name__, f"(write_code_to_path) Writing code to path: {str(path)} with code: {str(code)}")
+        logger.debug(__name__, "(write_code_to_path) Writing code to path: %s with code: %s", path, code)
         try:
             with open(path, "w", encoding="utf-8") as f:
                 f.write(code)
         except Exception as e:
-            logger.error(__name__, f"(write_code_to_path) Error writing code to path: {str(e)}")
+            logger.error(__name__, "(write_code_to_path) Error writing code to path: %s", e)
+        finally:
+            content_cache.invalidate(path)
 
     def get_code_from_path(self, path: str):
         """
             Get the code from the given path
         """
-        logger.info(__name__, f"(get_code_from_path) Getting code from path: {str(path)}")
+        logger.debug(__name__, "(get_code_from_path) Getting code from path: %s", path)
         try:
-            with open(path, "r") as f:
-                code = f.read()
-                return code
+            return content_cache.read(path)
         except Exception as e:
-            logger.error(__name__, f"Error getting code from path: {str(e)}")
+            logger.error(__name__, "Error getting code from path: %s", e)
 
     def get_code_block(self, text):
         """
             Get the code block from the text
         """
-        logger.info(__name__, f"(get_code_block) Getting code block from text: {str(text)}")
+        logger.debug(__name__, "(get_code_block) Getting code block from text: %s", text)
         try:
-            code_pattern = re.compile(r"```(\w+)\n(.*?)```", re.DOTALL)
-            matches = code_pattern.findall(text)
             code_blocks = [
                 {
-                    "language": match[0],
-                    "code": match[1],
-                    "description": match[1][: match[1].find("\n")],
+                    "language": language,
+                    "code": code,
+                    "description": code[: code.find("\n")],
                 }
-                for match in matches
+                for language, code in get_closed_blocks(text)
+                if language
             ]
-            logger.info(__name__, f"(get_code_block) Code blocks: {str(code_blocks)}")
+            logger.debug(__name__, "(get_code_block) Code blocks: %s", code_blocks)
             return code_blocks
         except Exception as e:
-            logger.error(__name__, f"(get_code_block) Error get code block from text using regex: {str(e)}")
+            logger.error(__name__, "(get_code_block) Error getting the code blocks from the text: %s", e)
 
     def extract_code(self, text):
         """
             Extract the code from the text
         """
-        logger.info(__name__, f"(extract_code) Extracting code from text: {str(text)}")
+        logger.debug(__name__, "(extract_code) Extracting code from text: %s", text)
         try:
             code_blocks = self.get_code_block(text)
-            logger.info(__name__, f"(extract_code) Code blocks: {str(code_blocks)}")
+            logger.debug(__name__, "(extract_code) Code blocks: %s", code_blocks)
             for block in code_blocks:
                 first_line = block["code"][: block["code"].find("\n")]
                 """
@@ -154,27 +170,24 @@ class FridaCoder:
                     and "print" not in first_line
                 ):
                     block["code"] = "\n".join(block["code"].split("\n")[1:])
-            logger.info(__name__, f"(extract_code) Code block: {str(code_blocks)}")
+            logger.debug(__name__, "(extract_code) Code block: %s", code_blocks)
             return code_blocks
         except Exception as e:
-            logger.error(__name__, f"Error extracting code from text: {str(e)}")
+            logger.error(__name__, "Error extracting code from text: %s", e)
             return []
 
     def has_code_blocks(self, text):
         """
             Check if the text has code blocks
         """
-        logger.info(__name__, f"(has_code_blocks) Checking if the text has code blocks: {str(text)}")
-        self.extract_code(text)
-        if len(self.code_blocks) == 0:
-            return False
-        return True
+        logger.debug(__name__, "(has_code_blocks) Checking if the text has code blocks: %s", text)
+        return len(self.extract_code(text)) > 0
 
     def save_code_files(self, code: str, extension: str = None):
         """
             Save the code files
         """
-        logger.info(__name__, f"(save_code_files) Saving code files with code: {str(code)} and extension: {str(extension)}")
+        logger.debug(__name__, "(save_code_files) Saving code files with code: %s and extension: %s", code, extension)
         try:
             time_format = "%Y-%m-%d_%H-%M-%S"
             formatted_time = datetime.datetime.now().strftime(time_format)
@@ -182,22 +195,23 @@ class FridaCoder:
             os.makedirs(os.path.dirname(file_name), exist_ok=True)
             with open(file_name, "w", encoding="utf-8") as f:
                 f.write(code)
-            logger.info(__name__, f"(save_code_files) File name: {str(file_name)}")
+            logger.info(__name__, "(save_code_files) File name: %s", file_name)
             return file_name
         except Exception as e:
-            logger.error(__name__, f"Error saving code files: {str(e)}")
+            logger.error(__name__, "Error saving code files: %s", e)
 
     def get_language(self, language: str):
         """
             Get the language
         """
-        logger.info(__name__, f"(get_language) Getting language: {str(language)}")
+        logger.debug(__name__, "(get_language) Getting language: %s", language)
         try:
+            language = (language or "").lower()
             if self.languages.get(language, -1) == -1:
                 return None
             return self.languages[language]
         except Exception as e:
-            logger.error(__name__, f"Error getting language: {str(e)}")
+            logger.error(__name__, "Error getting language: %s", e)
     
     def get_file_manager(self):
         """
@@ -217,7 +231,7 @@ class FridaCoder:
         """
             Check if the extension is a programming language
         """
-        logger.info(__name__, f"(is_programming_language_extension) Checking if the extension is a programming language: {str(extension)}")
-        logger.info(__name__, f"(is_programming_language_extension) Supported programming languages: {str(SUPPORTED_PROGRAMMING_LANGUAGES)}")
+        logger.debug(__name__, "(is_programming_language_extension) Checking if the extension is a programming language: %s", extension)
+        logger.debug(__name__, "(is_programming_language_extension) Supported programming languages: %s", SUPPORTED_PROGRAMMING_LANGUAGES)
         return extension.lower() in SUPPORTED_PROGRAMMING_LANGUAGES
 
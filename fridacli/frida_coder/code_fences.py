@@ -0,0 +1,136 @@
+import re
+from functools import lru_cache
+
+# A line that opens or closes a fenced code block: the fence and the info string (language)
+FENCE_LINE = re.compile(r"^[ \t]*(`{3,}|~{3,})([^\n]*)$", re.MULTILINE)
+# Responses whose blocks are kept by parse_fences
+PARSED_RESPONSES = 64
+
+
+class CodeFence:
+    """
+    A fenced code block of a text, only the offsets are kept.
+
+    Attributes:
+        - language (str): The first word of the info string, "" if there is none.
+        - start (int): Offset of the opening fence.
+        - end (int): Offset after the closing fence, the end of the text if the block isn't closed.
+        - code_start (int): Offset of the first line of code.
+        - code_end (int): Offset of the closing fence, the code keeps its last line break.
+        - closed (bool): False if the text ended inside the block.
+    """
+
+    __slots__ = ("language", "start", "end", "code_start", "code_end", "closed")
+
+    def __init__(self, language: str, start: int, end: int, code_start: int, code_end: int, closed: bool) -> None:
+        self.language = language
+        self.start = start
+        self.end = end
+        self.code_start = code_start
+        self.code_end = code_end
+        self.closed = closed
+
+    def code(self, text: str) -> str:
+        return text[self.code_start : self.code_end]
+
+    def __repr__(self) -> str:
+        return f"CodeFence({self.language!r}, {self.start}, {self.end}, closed={self.closed})"
+
+
+class FenceParser:
+    """
+    Finds the fenced code blocks of a markdown text in one pass, the text can be fed in chunks while it is streamed.
+
+    Attributes:
+        - text (str): The text received so far.
+        - blocks (list): The closed blocks, in the order of the text.
+
+    Only complete lines are scanned, so a fence split between two chunks is found when its line ends.
+    Fences of backticks and tildes are supported, a block is closed by a bare fence of the same
+    character at least as long as the opening one. Fences with a language inside a block open a
+    nested block (models answer markdown that contains code this way), the outer block is closed
+    once they are. Nested blocks are part of the code of the outer one, they aren't returned.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.blocks = []
+        self.__scanned = 0
+        # (fence, language, start, code_start) of the outer open block and the fences nested in it
+        self.__open = None
+        self.__nested = []
+
+    def feed(self, chunk: str) -> list:
+        """
+            Add a chunk of the text, returns the blocks closed by it
+        """
+        self.text += chunk
+        end = self.text.rfind("\n", self.__scanned)
+        if end == -1:
+            return []
+        return self.__scan(end)
+
+    def finish(self) -> list:
+        """
+            Scan the last line once the text is complete, returns the blocks closed by it.
+            A block still open after it is in unterminated.
+        """
+        return self.__scan(len(self.text))
+
+    @property
+    def unterminated(self):
+        """
+            The block the text ended in, None if every block was closed
+        """
+        if self.__open is None:
+            return None
+        fence, language, start, code_start = self.__open
+        code_start = min(code_start, len(self.text))
+        return CodeFence(language, start, len(self.text), code_start, len(self.text), False)
+
+    def __scan(self, end: int) -> list:
+        closed = []
+        for match in FENCE_LINE.finditer(self.text, self.__scanned, end):
+            fence, info = match.group(1), match.group(2).strip()
+            if fence[0] == "`" and "`" in info:
+                # Inline code, not a fence
+                continue
+            if self.__open is None:
+                language = info.split()[0] if info else ""
+                self.__open = (fence, language, match.start(), match.end() + 1)
+                continue
+            open_fence = self.__nested[-1] if self.__nested else self.__open[0]
+            if info:
+                if fence[0] == open_fence[0]:
+                    self.__nested.append(fence)
+            elif fence[0] == open_fence[0] and len(fence) >= len(open_fence):
+                if self.__nested:
+                    self.__nested.pop()
+                    continue
+                _, language, start, code_start = self.__open
+                block = CodeFence(language, start, match.end(), code_start, match.start(), True)
+                self.__open = None
+                self.blocks.append(block)
+                closed.append(block)
+        self.__scanned = end
+        return closed
+
+
+@lru_cache(maxsize=PARSED_RESPONSES)
+def parse_fences(text: str) -> tuple:
+    """
+        Get the code blocks of a complete text, the unterminated one last. The result is cached for each text,
+        so a response is only parsed once by the chat, FridaCoder and the recipes.
+    """
+    parser = FenceParser()
+    parser.feed(text)
+    parser.finish()
+    unterminated = parser.unterminated
+    return tuple(parser.blocks) + ((unterminated,) if unterminated is not None else ())
+
+
+def get_closed_blocks(text: str) -> list:
+    """
+        Get the (language, code) of each closed code block of a text
+    """
+    return [(block.language, block.code(text)) for block in parse_fences(text) if block.closed]
@@ -4,16 +4,69 @@ from fridacli.logger import Logger
 
 logger = Logger()
 
+# Language of a code block -> the Language class that runs it, filled by register_language
+LANGUAGE_BACKENDS = {}
+
+
+def register_language(*names):
+    """
+        Register a Language class for the languages of the code blocks with these names
+    """
+    def decorator(cls):
+        for name in names:
+            LANGUAGE_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_number(env_vars: dict, key: str, default):
+    """
+        Get a numeric configuration variable, default if it is missing or invalid
+    """
+    try:
+        return max(0, type(default)(env_vars.get(key, default)))
+    except (TypeError, ValueError):
+        logger.warning(__name__, "(get_number) Invalid %s, using %s", key, default)
+        return default
+
+
+def get_available_languages() -> dict:
+    """
+        Get the extension and the worker of each registered language whose tools are installed,
+        the names of a language share one worker
+    """
+    workers = {}
+    languages = {}
+    for name, cls in LANGUAGE_BACKENDS.items():
+        if cls not in workers:
+            workers[cls] = cls() if cls.is_available() else None
+            if workers[cls] is None:
+                logger.info(__name__, "(get_available_languages) %s is not installed", cls.__name__)
+        if workers[cls] is not None:
+            languages[name] = {"extension": cls.extension, "worker": workers[cls]}
+    return languages
+
+
 class Language(ABC):
+    # Extension of the files of the language
+    extension = ""
+
     def __init__(self) -> None:
         super().__init__()
         self.result_files_dir = f"{FRIDA_DIR_PATH}/tmp/results"
         self.code_files_dir = f"{FRIDA_DIR_PATH}/tmp/code"
-        logger.info(__name__, f"""Language init
-            Result files directory: {self.result_files_dir}
-            Code files directory: {self.code_files_dir}
-        """)
+        logger.info(__name__, """Language init
+            Result files directory: %s
+            Code files directory: %s
+        """, self.result_files_dir, self.code_files_dir)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+            Whether the tools to run the language are installed
+        """
+        return True
 
     @abstractmethod
     def run(self, code):
-        raise NotImplementedError("run method must be overridden")
\ No newline at end of file
+        raise NotImplementedError("run method must be overridden")
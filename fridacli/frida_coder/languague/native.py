@@ -0,0 +1,334 @@
+import os
+import sys
+import time
+import queue
+import shutil
+import hashlib
+import threading
+import subprocess
+from typing_extensions import override
+from fridacli.frida_coder.languague import Language, register_language, get_number
+from ..exception_message import ExceptionMessage
+from fridacli.config import get_config_vars, FRIDA_DIR_PATH
+from fridacli.logger import Logger
+from .python_pool import RunResult, DEFAULT_RUN_TIMEOUT, DEFAULT_CPU_SECONDS, DEFAULT_MAX_OUTPUT
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = Logger()
+
+BUILD_CACHE_PATH = os.path.join(FRIDA_DIR_PATH, "fridatmp", "build")
+# Compiled programs kept by each language, the least recently used are removed
+MAX_CACHED_ARTIFACTS = 50
+COMPILE_TIMEOUT = 120
+
+
+def run_process(
+    command: list,
+    cwd: str,
+    timeout: float = DEFAULT_RUN_TIMEOUT,
+    cpu_seconds: float = 0,
+    on_output=None,
+    cancel_event: threading.Event = None,
+    max_output: int = DEFAULT_MAX_OUTPUT,
+) -> RunResult:
+    """
+        Run a command with the limits of the Python runs: on_output(stream, text) receives the output while it is
+        printed, cancel_event, the timeout and max_output stop it. The process and its children are killed then.
+    """
+    result = RunResult()
+
+    def limit_cpu():
+        if cpu_seconds:
+            limit = int(cpu_seconds) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (limit, limit))
+
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Its own process group, so the children are killed with it
+            start_new_session=sys.platform != "win32",
+            preexec_fn=limit_cpu if resource is not None and cpu_seconds else None,
+        )
+    except OSError as e:
+        result.error = True
+        result.traceback = f"Couldn't start {command[0]}: {e}"
+        if on_output is not None:
+            on_output("stderr", result.traceback)
+        return result
+
+    messages = queue.Queue()
+
+    def read(stream, name):
+        # Chunks as they come, a line of a program that doesn't flush arrives when it does
+        for chunk in iter(lambda: stream.read1(4096), b""):
+            messages.put((name, chunk.decode("utf-8", errors="replace")))
+        messages.put((name, None))
+
+    for stream, name in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+        threading.Thread(target=read, args=(stream, name), name="fridacli-run-output", daemon=True).start()
+
+    start = time.perf_counter()
+    output = []
+    output_size = 0
+    open_streams = 2
+    while open_streams:
+        if cancel_event is not None and cancel_event.is_set():
+            result.cancelled = result.error = True
+            result.traceback = "The run was cancelled"
+            break
+        remaining = timeout - (time.perf_counter() - start) if timeout else None
+        if remaining is not None and remaining <= 0:
+            result.timed_out = result.error = True
+            result.traceback = f"The code took more than {timeout} seconds"
+            break
+        try:
+            name, data = messages.get(timeout=min(0.1, remaining) if remaining else 0.1)
+        except queue.Empty:
+            continue
+        if data is None:
+            open_streams -= 1
+            continue
+        if max_output and output_size + len(data) > max_output:
+            data = data[: max_output - output_size]
+            result.truncated = result.error = True
+            result.traceback = f"The output reached {max_output} characters, the run was stopped"
+        output.append(data)
+        output_size += len(data)
+        if on_output is not None and data:
+            on_output(name, data)
+        if result.truncated:
+            break
+
+    if process.poll() is None and open_streams == 0:
+        # The output is closed, the process is ending
+        try:
+            process.wait(timeout=max(0.1, timeout - (time.perf_counter() - start)) if timeout else None)
+        except subprocess.TimeoutExpired:
+            result.timed_out = result.error = True
+            result.traceback = f"The code took more than {timeout} seconds"
+    if process.poll() is None:
+        kill_process(process)
+    elif not result.error and process.returncode != 0:
+        result.error = True
+        result.traceback = f"The program exited with code {process.returncode}"
+    result.output = "".join(output)
+    if on_output is not None and result.traceback:
+        on_output("stderr", result.traceback)
+    return result
+
+
+def kill_process(process: subprocess.Popen) -> None:
+    try:
+        if sys.platform != "win32":
+            os.killpg(process.pid, 9)
+        else:
+            process.kill()
+        process.wait(timeout=5)
+    except Exception as e:
+        logger.error(__name__, "(kill_process) Error stopping the process: %s", e)
+
+
+class ProcessLanguage(Language):
+    """
+    A language run by an installed program, like node or bash.
+
+    Attributes:
+        - program (str): The program that runs the files, it must be in the PATH.
+        - command (list): The arguments before the path of the file.
+
+    The limits are the ones of the Python runs: PYTHON_RUN_TIMEOUT, PYTHON_RUN_CPU_SECONDS
+    and PYTHON_RUN_MAX_OUTPUT_KB.
+    """
+
+    program = ""
+    command = []
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return shutil.which(cls.program) is not None
+
+    @override
+    def run(
+        self,
+        path: str,
+        file_extesion: str = None,
+        file_exist: bool = False,
+        on_output=None,
+        cancel_event: threading.Event = None,
+    ):
+        """
+            Run the file in the given path, the result is built like the one of the Python runs
+        """
+        logger.debug(__name__, "(run) Running %s with %s", path, self.program)
+        code_path = os.path.abspath(path if file_exist else f"{self.code_files_dir}/{path}.{file_extesion}")
+        try:
+            limits = self.get_limits()
+            command = self.prepare(code_path, on_output, cancel_event)
+            if isinstance(command, RunResult):
+                # Couldn't be compiled, the result has the errors
+                return self.build_result(command)
+            result = run_process(
+                command,
+                os.path.dirname(code_path),
+                limits["timeout"],
+                limits["cpu_seconds"],
+                on_output,
+                cancel_event,
+                limits["max_output"],
+            )
+            return self.build_result(result)
+        except Exception as e:
+            logger.error(__name__, "(run) Error running %s: %s", path, e)
+            return (ExceptionMessage.EXEC_ERROR, None)
+
+    def prepare(self, code_path: str, on_output=None, cancel_event: threading.Event = None):
+        """
+            Get the command that runs the file
+        """
+        return [shutil.which(self.program), *self.command, code_path]
+
+    def get_limits(self) -> dict:
+        env_vars = {}
+        try:
+            env_vars = get_config_vars()
+        except Exception as e:
+            logger.error(__name__, "(get_limits) %s", e)
+        return {
+            "timeout": get_number(env_vars, "PYTHON_RUN_TIMEOUT", float(DEFAULT_RUN_TIMEOUT)),
+            "cpu_seconds": get_number(env_vars, "PYTHON_RUN_CPU_SECONDS", float(DEFAULT_CPU_SECONDS)),
+            "max_output": get_number(env_vars, "PYTHON_RUN_MAX_OUTPUT_KB", DEFAULT_MAX_OUTPUT // 1024) * 1024,
+        }
+
+    def build_result(self, result: RunResult):
+        """
+            Build the result of the execution, an error starts with an ERROR line like FridaCoder expects
+        """
+        if result.error:
+            return (ExceptionMessage.GET_RESULT_SUCCESS, f"ERROR\n{result.output}{result.traceback}")
+        return (ExceptionMessage.GET_RESULT_SUCCESS, result.output)
+
+
+class CompiledLanguage(ProcessLanguage):
+    """
+    A language compiled to a program before it runs, like C or Go.
+
+    Attributes:
+        - compile_command (list): The arguments of the compiler before the source and the output paths.
+
+    The programs are kept in ~/fridacli/fridatmp/build/<language>/<hash> where the hash is
+    the one of the compiler command and the source, so running the same code again skips
+    the compilation. The MAX_CACHED_ARTIFACTS most recently used programs are kept.
+    """
+
+    compile_command = []
+
+    @override
+    def prepare(self, code_path: str, on_output=None, cancel_event: threading.Event = None):
+        with open(code_path, "rb") as f:
+            source = f.read()
+        compiler = shutil.which(self.program)
+        digest = hashlib.sha256(
+            "\0".join([compiler, *self.compile_command]).encode("utf-8") + b"\0" + source
+        ).hexdigest()
+        cache_dir = os.path.join(BUILD_CACHE_PATH, type(self).__name__.lower())
+        artifact = os.path.join(cache_dir, digest, "program.exe" if sys.platform == "win32" else "program")
+        if os.path.exists(artifact):
+            logger.info(__name__, "(prepare) Using the compiled program of %s", code_path)
+            os.utime(os.path.dirname(artifact))
+            return [artifact]
+
+        os.makedirs(os.path.dirname(artifact), exist_ok=True)
+        building = f"{artifact}.{os.getpid()}.{threading.get_ident()}.tmp"
+        start = time.perf_counter()
+        result = run_process(
+            self.get_compile_command(compiler, code_path, building),
+            os.path.dirname(code_path),
+            COMPILE_TIMEOUT,
+            0,
+            None,
+            cancel_event,
+            DEFAULT_MAX_OUTPUT,
+        )
+        if result.error or not os.path.exists(building):
+            if os.path.exists(building):
+                os.remove(building)
+            result.error = True
+            result.traceback = result.traceback or "The compiler didn't create the program"
+            if on_output is not None:
+                on_output("stderr", result.output + result.traceback)
+            return result
+        os.replace(building, artifact)
+        logger.info(__name__, "(prepare) Compiled %s in %.3f s", code_path, time.perf_counter() - start)
+        self.prune(cache_dir)
+        return [artifact]
+
+    def get_compile_command(self, compiler: str, source: str, output: str) -> list:
+        return [compiler, *self.compile_command, source, "-o", output]
+
+    def prune(self, cache_dir: str) -> None:
+        """
+            Remove the least recently used programs over MAX_CACHED_ARTIFACTS
+        """
+        try:
+            entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            for entry in entries[MAX_CACHED_ARTIFACTS:]:
+                shutil.rmtree(entry, ignore_errors=True)
+        except OSError as e:
+            logger.error(__name__, "(prune) %s", e)
+
+
+@register_language("javascript", "js", "node")
+class JavaScript(ProcessLanguage):
+    extension = "js"
+    program = "node"
+
+
+@register_language("bash", "sh", "shell")
+class Bash(ProcessLanguage):
+    extension = "sh"
+    program = "bash"
+
+
+@register_language("ruby", "rb")
+class Ruby(ProcessLanguage):
+    extension = "rb"
+    program = "ruby"
+
+
+@register_language("c")
+class C(CompiledLanguage):
+    extension = "c"
+    program = "gcc"
+    compile_command = ["-O2", "-std=c11"]
+
+    @override
+    def get_compile_command(self, compiler: str, source: str, output: str) -> list:
+        # The math library goes after the source
+        return [compiler, *self.compile_command, source, "-o", output, "-lm"]
+
+
+@register_language("cpp", "c++")
+class Cpp(CompiledLanguage):
+    extension = "cpp"
+    program = "g++"
+    compile_command = ["-O2", "-std=c++17"]
+
+
+@register_language("go", "golang")
+class Go(CompiledLanguage):
+    extension = "go"
+    program = "go"
+    compile_command = ["build"]
+
+    @override
+    def get_compile_command(self, compiler: str, source: str, output: str) -> list:
+        return [compiler, *self.compile_command, "-o", output, source]
@@ -0,0 +1,304 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import struct
+import threading
+import subprocess
+from fridacli.logger import Logger
+
+logger = Logger()
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_worker.py")
+HEADER = struct.Struct(">I")
+DEFAULT_WORKERS = 2
+DEFAULT_RUN_TIMEOUT = 30
+DEFAULT_CPU_SECONDS = 20
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+# Seconds a new worker has to start
+START_TIMEOUT = 30
+# Runs after which a worker is replaced, the modules it imported stay loaded until then
+MAX_RUNS_PER_WORKER = 50
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class RunResult:
+    """
+    The result of running a file in a worker.
+
+    Attributes:
+        - output (str): What the code printed, stdout and stderr in the order they were written.
+        - error (bool): True if the code raised an exception, was stopped or exited with an error code.
+        - traceback (str): The traceback of the exception, or the reason the run was stopped.
+        - timed_out (bool): True if the run took more than its timeout.
+        - cancelled (bool): True if the run was cancelled.
+        - truncated (bool): True if the run was stopped because its output reached the limit.
+    """
+
+    def __init__(self) -> None:
+        self.output = ""
+        self.error = False
+        self.traceback = ""
+        self.timed_out = False
+        self.cancelled = False
+        self.truncated = False
+
+
+class PythonWorker:
+    """
+    A Python interpreter of the environment running python_worker.py, the code and the results go through its pipes.
+
+    Attributes:
+        - process (subprocess.Popen): The interpreter.
+        - runs (int): The runs it has made.
+        - messages (queue.Queue): The frames read from the worker, None once its pipe is closed.
+    """
+
+    def __init__(self, python_path: str, memory_mb: int) -> None:
+        self.runs = 0
+        self.messages = queue.Queue()
+        creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        self.process = subprocess.Popen(
+            [python_path, "-u", WORKER_PATH, str(memory_mb * 1024 * 1024)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=creationflags,
+        )
+        threading.Thread(target=self.__read, name="fridacli-python-worker", daemon=True).start()
+
+    def __read(self) -> None:
+        stream = self.process.stdout
+        try:
+            while True:
+                header = stream.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                (size,) = HEADER.unpack(header)
+                self.messages.put(json.loads(stream.read(size).decode("utf-8")))
+        except (OSError, ValueError) as e:
+            logger.debug(__name__, "(__read) Worker pipe closed: %s", e)
+        self.messages.put(None)
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            message = self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        return message is not None and message.get("type") == "ready"
+
+    def send(self, request: dict) -> None:
+        data = json.dumps(request).encode("utf-8")
+        self.process.stdin.write(HEADER.pack(len(data)) + data)
+        self.process.stdin.flush()
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self) -> None:
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception as e:
+            logger.error(__name__, "(kill) Error stopping a Python worker: %s", e)
+
+
+class PythonWorkerPool:
+    """
+    Pre-warmed interpreters of PYTHON_ENV_PATH that run the code of the chat.
+
+    Attributes:
+        - python_path (str): The interpreter of the environment.
+        - size (int): The idle workers kept started.
+        - memory_mb (int): The address space limit of each worker, 0 disables it.
+        - __idle (queue.Queue): The workers waiting for a run.
+
+    Each run gets a new namespace as __main__, with the folder of the file as working directory
+    and first entry of sys.path, and the worker restores its state afterwards. The modules of
+    the environment stay imported, which is what makes a warm run take milliseconds instead of
+    an interpreter start. A worker that times out, is cancelled, dies or leaves threads running
+    is discarded and a new one is started in the background.
+    """
+
+    def __init__(self, python_path: str, size: int = DEFAULT_WORKERS, memory_mb: int = DEFAULT_MEMORY_MB) -> None:
+        self.python_path = python_path
+        self.size = size
+        self.memory_mb = memory_mb
+        self.__idle = queue.Queue()
+        self.__starting = 0
+        self.__closed = False
+        self.__lock = threading.Lock()
+        self.warm()
+
+    def warm(self) -> None:
+        """
+            Start in the background the workers missing to have size idle ones
+        """
+        with self.__lock:
+            missing = self.size - self.__idle.qsize() - self.__starting
+            self.__starting += max(0, missing)
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self.__start_worker, name="fridacli-python-pool", daemon=True).start()
+
+    def __start_worker(self) -> None:
+        worker = None
+        try:
+            worker = self.__new_worker()
+        finally:
+            with self.__lock:
+                self.__starting -= 1
+        if worker is not None:
+            self.__release(worker)
+
+    def __new_worker(self):
+        try:
+            worker = PythonWorker(self.python_path, self.memory_mb)
+        except OSError as e:
+            logger.error(__name__, "(__new_worker) Couldn't start %s: %s", self.python_path, e)
+            return None
+        if not worker.wait_ready(START_TIMEOUT):
+            logger.error(__name__, "(__new_worker) The worker of %s didn't start", self.python_path)
+            worker.kill()
+            return None
+        return worker
+
+    def __acquire(self):
+        while True:
+            try:
+                worker = self.__idle.get_nowait()
+            except queue.Empty:
+                # Every worker is busy or still starting, this run gets its own
+                return self.__new_worker()
+            if worker.is_alive():
+                return worker
+            worker.kill()
+
+    def __release(self, worker: PythonWorker) -> None:
+        if (
+            self.__closed
+            or worker.runs >= MAX_RUNS_PER_WORKER
+            or not worker.is_alive()
+            or self.__idle.qsize() >= self.size
+        ):
+            worker.kill()
+        else:
+            self.__idle.put(worker)
+
+    def run(
+        self,
+        path: str,
+        code: str,
+        timeout: float = DEFAULT_RUN_TIMEOUT,
+        cpu_seconds: float = DEFAULT_CPU_SECONDS,
+        on_output=None,
+        cancel_event: threading.Event = None,
+        max_output: int = DEFAULT_MAX_OUTPUT,
+    ) -> RunResult:
+        """
+            Run the code of a file in an idle worker. on_output(stream, text) receives the output while it is printed,
+            and the traceback or the reason the run stopped as stderr at the end. Setting cancel_event stops the run.
+            The run is stopped when it prints more than max_output characters. A timeout or max_output of 0 disables them.
+        """
+        result = RunResult()
+        worker = self.__acquire()
+        if worker is None:
+            result.error = True
+            result.traceback = f"Couldn't start the Python interpreter {self.python_path}"
+            return result
+        start = time.perf_counter()
+        output = []
+        output_size = 0
+        reusable = False
+        try:
+            worker.runs += 1
+            worker.send({"path": path, "code": code, "cpu_seconds": cpu_seconds})
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    result.cancelled = result.error = True
+                    result.traceback = "The run was cancelled"
+                    break
+                remaining = timeout - (time.perf_counter() - start) if timeout else None
+                if remaining is not None and remaining <= 0:
+                    result.timed_out = result.error = True
+                    result.traceback = f"The code took more than {timeout} seconds"
+                    break
+                try:
+                    # Short waits so a cancellation is seen
+                    message = worker.messages.get(timeout=min(0.1, remaining) if remaining else 0.1)
+                except queue.Empty:
+                    continue
+                if message is None:
+                    result.error = True
+                    result.traceback = "The Python interpreter stopped, the code may have used more memory than allowed"
+                    break
+                if message["type"] == "output":
+                    data = message["data"]
+                    if max_output and output_size + len(data) > max_output:
+                        data = data[: max_output - output_size]
+                        result.truncated = result.error = True
+                        result.traceback = f"The output reached {max_output} characters, the run was stopped"
+                    output.append(data)
+                    output_size += len(data)
+                    if on_output is not None and data:
+                        on_output(message["stream"], data)
+                    if result.truncated:
+                        break
+                elif message["type"] == "result":
+                    result.error = message["error"]
+                    result.traceback = message["traceback"]
+                    reusable = message.get("reusable", True)
+                    break
+        except OSError as e:
+            result.error = True
+            result.traceback = f"Couldn't send the code to the Python interpreter: {e}"
+        finally:
+            result.output = "".join(output)
+            if on_output is not None and result.traceback:
+                on_output("stderr", result.traceback)
+            if reusable:
+                self.__release(worker)
+            else:
+                worker.kill()
+            self.warm()
+        logger.info(
+            __name__,
+            "(run) %s ran in %.3f s, error: %s",
+            path,
+            time.perf_counter() - start,
+            result.error,
+        )
+        return result
+
+    def close(self) -> None:
+        self.__closed = True
+        while True:
+            try:
+                self.__idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+
+def get_pool(python_path: str, size: int = DEFAULT_WORKERS, memory_mb: int = DEFAULT_MEMORY_MB) -> PythonWorkerPool:
+    """
+        Get the pool of the configured interpreter, the pool of a previous configuration is closed
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (_pool.python_path, _pool.size, _pool.memory_mb) == (python_path, size, memory_mb):
+            return _pool
+        if _pool is not None:
+            _pool.close()
+        _pool = PythonWorkerPool(python_path, size, memory_mb)
+        return _pool
+
+
+@atexit.register
+def close_pool() -> None:
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
@@ -0,0 +1,192 @@
+"""
+Worker of the Python pool, it runs in the interpreter of PYTHON_ENV_PATH and only uses the standard library.
+
+The parent sends one frame per run: a 4 bytes big-endian length and a JSON object
+{"path", "code", "cpu_seconds"}. The worker answers with "output" frames while the code
+prints ({"type": "output", "stream": "stdout" | "stderr", "data"}) and one "result" frame
+({"type": "result", "error": bool, "traceback", "reusable"}). The frames go to a copy of the original
+stdout, the file descriptors 1 and 2 of the worker point to stderr so nothing the code
+writes at the OS level can break them.
+"""
+import os
+import sys
+import json
+import struct
+import builtins
+import threading
+import traceback
+
+try:
+    import resource
+    import signal
+except ImportError:
+    # Windows, the limits aren't available
+    resource = None
+
+HEADER = struct.Struct(">I")
+# Characters buffered before an output frame is sent
+OUTPUT_BUFFER = 4096
+
+channel_in = os.fdopen(os.dup(0), "rb", buffering=0)
+channel_out = os.fdopen(os.dup(1), "wb", buffering=0)
+os.dup2(2, 1)
+channel_lock = threading.Lock()
+
+
+class CpuLimitExceeded(Exception):
+    pass
+
+
+def send(message):
+    data = json.dumps(message).encode("utf-8")
+    with channel_lock:
+        channel_out.write(HEADER.pack(len(data)) + data)
+
+
+def receive():
+    header = channel_in.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (size,) = HEADER.unpack(header)
+    data = b""
+    while len(data) < size:
+        chunk = channel_in.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return json.loads(data.decode("utf-8"))
+
+
+class OutputStream:
+    """
+    Replaces sys.stdout and sys.stderr during a run, the text is sent to the parent by lines.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        self.buffer.append(text)
+        self.size += len(text)
+        if "\n" in text or self.size >= OUTPUT_BUFFER:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            send({"type": "output", "stream": self.name, "data": "".join(self.buffer)})
+            self.buffer = []
+            self.size = 0
+
+    def isatty(self):
+        return False
+
+    def writable(self):
+        return True
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+
+def on_cpu_limit(signum, frame):
+    raise CpuLimitExceeded("The code used more CPU time than allowed")
+
+
+def set_limits(memory_bytes):
+    if resource is None:
+        return
+    if memory_bytes > 0:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        except (ValueError, OSError):
+            pass
+    signal.signal(signal.SIGXCPU, on_cpu_limit)
+
+
+def set_cpu_limit(seconds):
+    """
+        The CPU limit counts the time of the whole process, the run gets seconds more than it has used
+    """
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds > 0:
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        limit = int(used.ru_utime + used.ru_stime + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+    else:
+        limit = hard
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+
+
+def forget_modules(directory, known):
+    """
+        Remove the modules the code imported from its own folder, so an edited file is imported again next run
+    """
+    for name, module in list(sys.modules.items()):
+        if name in known:
+            continue
+        file = getattr(module, "__file__", None) or ""
+        if file and os.path.abspath(file).startswith(directory + os.sep):
+            del sys.modules[name]
+
+
+def run(request):
+    path = request["path"]
+    directory = os.path.dirname(os.path.abspath(path))
+    state = (os.getcwd(), list(sys.path), list(sys.argv), dict(os.environ))
+    known = set(sys.modules)
+    stdout, stderr = OutputStream("stdout"), OutputStream("stderr")
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": builtins}
+    error, trace = False, ""
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        os.chdir(directory)
+        sys.path.insert(0, directory)
+        sys.argv = [path]
+        set_cpu_limit(request.get("cpu_seconds", 0))
+        exec(compile(request["code"], path, "exec"), namespace)
+    except SystemExit as e:
+        error = e.code not in (None, 0)
+        trace = "" if not error else f"SystemExit: {e.code}\n"
+    except BaseException:
+        error = True
+        # The first frame is this function
+        exc_type, value, tb = sys.exc_info()
+        trace = "".join(traceback.format_exception(exc_type, value, tb.tb_next))
+    finally:
+        set_cpu_limit(0)
+        stdout.flush()
+        stderr.flush()
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        cwd, path_list, argv, environ = state
+        os.chdir(cwd)
+        sys.path[:] = path_list
+        sys.argv = argv
+        os.environ.clear()
+        os.environ.update(environ)
+        forget_modules(directory, known)
+        namespace.clear()
+    # Threads left running would keep using the worker, the parent replaces it then
+    alive = [t for t in threading.enumerate() if t is not threading.main_thread() and not t.daemon]
+    send({"type": "result", "error": error, "traceback": trace, "reusable": not alive})
+
+
+def main():
+    set_limits(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    send({"type": "ready", "pid": os.getpid()})
+    while True:
+        request = receive()
+        if request is None:
+            break
+        run(request)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 from textual.containers import Horizontal, Vertical, VerticalScroll
-from textual.widgets import Static, Label, Button, MarkdownViewer
+from textual.widgets import Static, Label, Button, Log
 from .custom_labels import ResultErrorExceptionMessage
 from fridacli.frida_coder.exception_message import ExceptionMessage
 from fridacli.logger import Logger
+import threading
 import pyperclip
 
 logger = Logger()
 
+# Seconds between two updates of the output of a run
+RUN_REFRESH_INTERVAL = 0.1
+# Lines of output kept in the panel
+RUN_OUTPUT_LINES = 2000
+
 class RunCodeConfirmation(Static):
 
     def __init__(self, id, frida_coder, code_block, files_required, files_open) -> None:
@@ -15,10 +21,10 @@ class RunCodeConfirmation(Static):
         self.code_block = code_block
         self.files_required = files_required
         self.files_open = files_open
-        logger.info(__name__, f"""RunCodeConfirmation
-            files_required: {str(self.files_required)}
-            files_open: {str(self.files_open)}
-        """)
+        logger.info(__name__, """RunCodeConfirmation
+            files_required: %s
+            files_open: %s
+        """, self.files_required, self.files_open)
 
     def compose(self):
         logger.info(__name__, "Composing RunCodeConfirmation")
@@ -30,42 +36,123 @@ class RunCodeConfirmation(Static):
 
     def on_button_pressed(self, event):
         button_pressed = str(event.button.id)
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
+        chat_scroll = self.parent.parent.query_one("#chat_scroll", VerticalScroll)
         if button_pressed == "btn_rcc_yes":
-            try:
-                code_result = self.frida_coder.run(self.code_block, self.files_required)
-                logger.info(__name__, f"(on_button_pressed) Code result: {str(code_result)}")
-                if code_result["status"] == ExceptionMessage.RESULT_ERROR:
-                    self.parent.parent.query_one("#chat_scroll", VerticalScroll).mount(
-                        ResultErrorExceptionMessage()
-                    )
-                    self.parent.parent.query_one("#chat_scroll", VerticalScroll).mount(
-                        MarkdownViewer(code_result["result"], classes="markdown_response")
-                    )
-                if code_result["status"] == ExceptionMessage.GET_RESULT_SUCCESS:
-                    self.parent.parent.query_one("#chat_scroll", VerticalScroll).mount(
-                        MarkdownViewer(
-                            code_result["result"],
-                            classes="markdown_response",
-                            show_table_of_contents=False,
-                        )
-                    )
-            except Exception as e:
-                logger.error(__name__, f"(on_button_pressed) Error running code: {e}")
-                self.app.notify(
-                    "An error occurred running the code, check Python environment.", 
-                    severity="error"
+            # The panel runs the code and asks about the changes once it ends
+            chat_scroll.mount(
+                CodeRunPanel(
+                    id="code_run_panel" + str(self.id),
+                    frida_coder=self.frida_coder,
+                    code_block=self.code_block,
+                    files_required=self.files_required,
+                )
+            )
+        else:
+            chat_scroll.mount(
+                CodeChangeQuestion(
+                    id = "code_change_question" + str(self.id),
+                    code=self.code_block["code"],
+                    frida_coder=self.frida_coder,
+                    files=self.files_required,
                 )
+            )
+        self.remove()
+
+
+class CodeRunPanel(Static):
+    """
+    Runs a code block without blocking the interface, the output is shown while it is printed.
+
+    Attributes:
+        - cancel_event (threading.Event): Set by the cancel button, the worker running the code is stopped.
+        - __pending (list): Output received from the worker thread and not shown yet.
+    """
+
+    def __init__(self, id, frida_coder, code_block, files_required) -> None:
+        super().__init__(id=id)
+        self.frida_coder = frida_coder
+        self.code_block = code_block
+        self.files_required = files_required
+        self.cancel_event = threading.Event()
+        self.__pending = []
+        self.__pending_lock = threading.Lock()
 
-        self.parent.parent.query_one("#chat_scroll", VerticalScroll).mount(
+    def compose(self):
+        logger.info(__name__, "Composing CodeRunPanel")
+        with Vertical(id="crp_vertical"):
+            yield Label("Running the code...", id="crp_status")
+            yield Log(id="crp_output", classes="crp_output", max_lines=RUN_OUTPUT_LINES)
+            yield Button.error("Cancel", id="btn_crp_cancel", classes="btn_rcc")
+
+    def on_mount(self):
+        self.__timer = self.set_interval(RUN_REFRESH_INTERVAL, self.show_output)
+        self.run_worker(self.run_code(), exclusive=False)
+
+    def on_output(self, stream, text):
+        """Called from the thread of the run, the text is shown by the timer"""
+        with self.__pending_lock:
+            self.__pending.append(text)
+
+    def show_output(self):
+        """Write the output received since the last call"""
+        with self.__pending_lock:
+            text = "".join(self.__pending)
+            self.__pending = []
+        if text:
+            self.query_one("#crp_output", Log).write(text)
+
+    async def run_code(self):
+        try:
+            code_result = await self.frida_coder.arun(
+                self.code_block,
+                self.files_required,
+                on_output=self.on_output,
+                cancel_event=self.cancel_event,
+            )
+            logger.debug(__name__, "(run_code) Code result: %s", code_result)
+            if code_result is None or code_result["status"] not in (
+                ExceptionMessage.RESULT_ERROR,
+                ExceptionMessage.GET_RESULT_SUCCESS,
+            ):
+                raise ValueError(f"Unexpected result {code_result}")
+            if code_result["status"] == ExceptionMessage.RESULT_ERROR:
+                self.query_one("#crp_vertical", Vertical).mount(ResultErrorExceptionMessage(), before="#crp_output")
+                status = "The code was stopped." if self.cancel_event.is_set() else "The code ended with an error."
+            else:
+                status = "The code ended."
+            self.show_output()
+            if not self.query_one("#crp_output", Log).line_count and code_result["result"]:
+                # Nothing was streamed, like the message when there's no environment configured
+                self.query_one("#crp_output", Log).write(code_result["result"])
+        except Exception as e:
+            logger.error(__name__, "(run_code) Error running code: %s", e)
+            status = "The code couldn't be run."
+            self.app.notify(
+                "An error occurred running the code, check Python environment.",
+                severity="error"
+            )
+        finally:
+            self.__timer.stop()
+        self.show_output()
+        self.query_one("#crp_status", Label).update(status)
+        self.query_one("#btn_crp_cancel", Button).remove()
+        self.parent.mount(
             CodeChangeQuestion(
                 id = "code_change_question" + str(self.id),
                 code=self.code_block["code"],
                 frida_coder=self.frida_coder,
                 files=self.files_required,
-            )
+            ),
+            after=self,
         )
-        self.remove()
+
+    def on_button_pressed(self, event):
+        if event.button.id == "btn_crp_cancel":
+            logger.info(__name__, "(on_button_pressed) Cancelling the run")
+            event.button.disabled = True
+            self.cancel_event.set()
+            event.stop()
 
 
 class CodeChangeQuestion(Static):
@@ -75,13 +162,13 @@ class CodeChangeQuestion(Static):
         self.files = files
         self.frida_coder = frida_coder
 
-        logger.info(__name__, f"""CodeChangeQuestion
-            code: {str(self.code)}
-            files: {str(self.files)}
-        """)
+        logger.debug(__name__, """CodeChangeQuestion
+            code: %s
+            files: %s
+        """, self.code, self.files)
 
     def compose(self):
-        logger.info(__name__, f"Composing CodeChangeQuestion with files: {len(self.files)}")
+        logger.info(__name__, "Composing CodeChangeQuestion with files: %s", len(self.files))
         with Horizontal(id="ccq_horizontal"):
             if len(self.files) > 0:
                 yield Button(
@@ -106,7 +193,7 @@ class CodeChangeQuestion(Static):
 
     def on_button_pressed(self, event):
         button_pressed = str(event.button.id)
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
         if button_pressed == "btn_copy_code":
             pyperclip.copy(self.code)
             # TODO move all the str into a file to update from there
@@ -115,12 +202,12 @@ class CodeChangeQuestion(Static):
             if len(self.files) == 1:
                 try:
                     path = self.frida_coder.get_file_manager().get_file_path(self.files[0])
-                    logger.info(__name__, f"Overwriting file {path}")
+                    logger.info(__name__, "Overwriting file %s", path)
                     self.frida_coder.write_code_to_path(path, self.code)
                     self.parent.parent.parent.parent.query_one("#code_view_pather").update_file_code_view(path, True)
                     self.notify("The file has been overwritten.")
                 except Exception as e:
-                    logger.error(__name__, f"(on_button_pressed) Error overwriting file: {e}")
+                    logger.error(__name__, "(on_button_pressed) Error overwriting file: %s", e)
                     self.notify("An error has occurred overwriting the file.")
         elif button_pressed == "btn_create_commit":
             pass
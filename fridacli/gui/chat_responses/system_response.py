@@ -10,3 +10,7 @@ class SystemFridaResponse(Static):
     def compose(self):
         yield Label(f"[#A4CE95]Frida>[/]", classes="chat_label")
         yield MarkdownViewer(str(self.renderable), classes = "chat_markdown", show_table_of_contents=False)
+
+    def update_response(self, text):
+        """Replace the text of the response, used while it is streamed"""
+        return self.query_one(MarkdownViewer).document.update(text)
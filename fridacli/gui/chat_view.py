@@ -6,6 +6,7 @@ from textual.worker import Worker, WorkerState
 from fridacli.file_manager import FileManager
 from fridacli.frida_coder import FridaCoder
 from fridacli.chatbot import ChatbotAgent
+from fridacli.frida_coder.code_fences import FenceParser
 from textual.app import ComposeResult
 from rich.traceback import Traceback
 from fridacli.logger import Logger
@@ -13,9 +14,36 @@ from textual.events import Mount
 from rich.syntax import Syntax
 from fridacli.config import OS
 from .code_view import CodeView
+import asyncio
+import hashlib
 
 logger = Logger()
 
+# Seconds between two renders of a response while it is streamed
+STREAM_REFRESH_INTERVAL = 0.1
+
+
+class StreamedResponse:
+    """
+    The state of a response while it is streamed.
+
+    Attributes:
+        - loading_indicator (LoadingIndicator): Shown until the first chunk arrives.
+        - text (str): The text received.
+        - widget (SystemFridaResponse): The widget of the response, None before the first chunk.
+        - rendered (str): The text shown in the widget.
+        - render_lock (asyncio.Lock): One render of the response at a time.
+        - code_confirmation_mounted (bool): True once the confirmation to run its code is shown.
+    """
+
+    def __init__(self, loading_indicator: LoadingIndicator) -> None:
+        self.loading_indicator = loading_indicator
+        self.text = ""
+        self.widget = None
+        self.rendered = ""
+        self.render_lock = asyncio.Lock()
+        self.code_confirmation_mounted = False
+
 
 class ChatView(Static):
     chatbot_agent = ChatbotAgent()
@@ -23,8 +51,8 @@ class ChatView(Static):
     file_manager = FileManager()
     mentioned_files = []
     file_open = ""
+    file_buttons = {}
     chat_label_sz = 0
-    chat_response = ""
     run_code_confirmation_counter = 0
 
     CSS_PATH = "fridacli/gui/tcss/frida_styles.tcss"
@@ -44,100 +72,139 @@ class ChatView(Static):
         """
             Mount children in the HorizontalScroll representing the files opened
         """
-        logger.info(__name__, f"(mount_file_button) Mounting file button from path: {path} and in_chat: {in_chat}")
+        logger.info(__name__, "(mount_file_button) Mounting file button from path: %s and in_chat: %s", path, in_chat)
+        # The files are identified by their path relative to the project, two files can share the name
+        file_key = self.file_manager.get_relative_path(path)
         file_name = path.split("\\")[-1] if OS == "win" else path.split("/")[-1]
-        logger.info(__name__, f"(mount_file_button) mentioned_files: {self.mentioned_files} and file_open: {self.file_open}")
-        if file_name not in self.mentioned_files and self.file_open != file_name:
+        logger.debug(__name__, "(mount_file_button) mentioned_files: %s and file_open: %s", self.mentioned_files, self.file_open)
+        if file_key not in self.mentioned_files and self.file_open != file_key:
             if in_chat:
-                self.mentioned_files.append(file_name)
+                self.mentioned_files.append(file_key)
             else:
-                self.file_open = file_name
+                self.file_open = file_key
 
-            id = file_name.replace(".", "---")
+            id = self.get_file_button_id(file_key)
+            self.file_buttons[id] = file_key
+            label = file_key if len(self.file_manager.find_files(file_name)) > 1 else file_name
             self.query_one("#cv_hs", HorizontalScroll).mount(
                 Button(
-                    str(file_name),
-                    id=f"cv_hs_file_{id}",
+                    str(label),
+                    id=id,
                     classes="cv_hs_file_label",
                 )
             )
 
-    def delete_file_button(self, file_name, in_chat):
+    def get_file_button_id(self, file_key):
+        """
+            Get a valid widget id for the button of a file
+        """
+        return f"cv_hs_file_{hashlib.md5(file_key.encode('utf-8')).hexdigest()[:12]}"
+
+    def delete_file_button(self, file_key, in_chat):
         """
         Delete children in the HorizontalScroll representing the files
         mentioned in the Input
         """
-        logger.info(__name__, f"(delete_file_button) Deleting file button with file name: {file_name} and in_chat: {in_chat}")
-        id = file_name.replace(".", "---")
+        logger.info(__name__, "(delete_file_button) Deleting file button with file: %s and in_chat: %s", file_key, in_chat)
+        id = self.get_file_button_id(file_key)
 
         try:
             if in_chat:
-                self.mentioned_files.remove(file_name)
+                self.mentioned_files.remove(file_key)
             else:
                 self.file_open = ""
 
-            self.query_one("#cv_hs", HorizontalScroll).remove_children(
-                f"#cv_hs_file_{id}"
-            )
+            self.file_buttons.pop(id, None)
+            self.query_one("#cv_hs", HorizontalScroll).remove_children(f"#{id}")
         except Exception as e:
-            logger.error(__name__, f"(delete_file_button) Error deleting file button: {str(e)}")
+            logger.error(__name__, "(delete_file_button) Error deleting file button: %s", e)
 
     def display_code_file(self, path):
         """Change and display the file that was mentioned
         """
-        logger.info(__name__, f"(display_code_file) Displaying code file from path: {path}")
+        logger.info(__name__, "(display_code_file) Displaying code file from path: %s", path)
         try:
             self.parent.parent.query_one(CodeView).update_file_code_view(path, True)
         except Exception as e:
-            logger.error(__name__, f"(display_code_file) Error displaying code file: {str(e)}")
+            logger.error(__name__, "(display_code_file) Error displaying code file: %s", e)
     
-    async def chat_callback(self, user_input):
-        """Callback function to chat with the chatbot"""
-        logger.info(__name__, f"(chat_callback) Chat callback with user input: {user_input}")
+    async def chat_callback(self, user_input, loading_indicator):
+        """Callback function to chat with the chatbot, the response is shown while it arrives"""
+        logger.debug(__name__, "(chat_callback) Chat callback with user input: %s", user_input)
         self.chatbot_agent.add_files_required(self.mentioned_files, self.file_open)
-        self.chat_response = self.chatbot_agent.chat(user_input, False)
-
-    def build_chatbot_response(self):
-        """Build the chatbot response displaying on the chat"""
-        logger.info(__name__, "(build_chatbot_response) Building chatbot response")
-        loading_indicator = self.query_one("#loading_indicator", LoadingIndicator)
-        if loading_indicator:
-            loading_indicator.remove()
-
-        chat_scroll = self.query_one("#chat_scroll", VerticalScroll)
-        chat_scroll.mount(SystemFridaResponse(self.chat_response))
-
-        code_blocks = self.frida_coder.prepare(self.chat_response)
-        logger.info(__name__, f"(build_chatbot_response) Code blocks len: {len(code_blocks)}")
-        logger.info(__name__, f"(build_chatbot_response) Code blocks info: {code_blocks}")
-        if len(code_blocks) > 0:
-            code_block = code_blocks[0]
-            logger.info(__name__, f"(build_chatbot_response) Code block: {code_block}")
-            self.run_code_confirmation_counter += 1
-            # Confirmation to run the code
-            self.query_one("#chat_scroll", VerticalScroll).mount(
-                RunCodeConfirmation(
-                    id=f"run_code_confirmation_{self.run_code_confirmation_counter}",
-                    frida_coder=self.frida_coder,
-                    code_block=code_block,
-                    files_required=list(self.chatbot_agent.get_files_required()),
-                    files_open=self.chatbot_agent.is_files_open(),
-                ),
-            )
-        self.query_one("#chat_scroll", VerticalScroll).scroll_down(animate=True)
+        # Another message can be sent while this one streams, each response keeps its own state
+        response = StreamedResponse(loading_indicator)
+        fences = FenceParser()
+        # The chunks only update the text, the timer renders it a few times per second
+        timer = self.set_interval(STREAM_REFRESH_INTERVAL, lambda: self.render_chatbot_response(response))
+        try:
+            async for chunk in self.chatbot_agent.astream(user_input, False):
+                if response.widget is None:
+                    self.start_chatbot_response(response)
+                closed = fences.feed(chunk)
+                response.text = fences.text
+                for block in closed:
+                    await self.render_chatbot_response(response)
+                    self.mount_run_code_confirmation(response, fences.text[block.start : block.end])
+            for block in fences.finish():
+                self.mount_run_code_confirmation(response, fences.text[block.start : block.end])
+        finally:
+            timer.stop()
+            if response.widget is None:
+                # The chat failed before the first chunk
+                response.loading_indicator.remove()
+        await self.render_chatbot_response(response)
+
+    def start_chatbot_response(self, response):
+        """Replace the loading indicator of the response with the text that is being received"""
+        logger.info(__name__, "(start_chatbot_response) Building chatbot response")
+        response.widget = SystemFridaResponse("")
+        self.query_one("#chat_scroll", VerticalScroll).mount(response.widget, after=response.loading_indicator)
+        response.loading_indicator.remove()
+
+    async def render_chatbot_response(self, response):
+        """Show the text received since the last render"""
+        # The timer and the callback can render at the same time, the document is updated once at a time
+        async with response.render_lock:
+            if response.widget is None or response.rendered == response.text:
+                return
+            response.rendered = response.text
+            await response.widget.update_response(response.text)
+            self.query_one("#chat_scroll", VerticalScroll).scroll_end(animate=False)
+
+    def mount_run_code_confirmation(self, response, block):
+        """Offer to run the first code block of the response as soon as its fence closes"""
+        if response.code_confirmation_mounted:
+            return
+        code_blocks = self.frida_coder.prepare(block)
+        logger.debug(__name__, "(mount_run_code_confirmation) Code blocks info: %s", code_blocks)
+        if not code_blocks:
+            return
+        response.code_confirmation_mounted = True
+        self.run_code_confirmation_counter += 1
+        # Confirmation to run the code
+        self.query_one("#chat_scroll", VerticalScroll).mount(
+            RunCodeConfirmation(
+                id=f"run_code_confirmation_{self.run_code_confirmation_counter}",
+                frida_coder=self.frida_coder,
+                code_block=code_blocks[0],
+                files_required=list(self.chatbot_agent.get_files_required()),
+                files_open=self.chatbot_agent.is_files_open(),
+            ),
+        )
 
     """Event handlers"""
 
     async def on_input_changed(self, message: Input.Changed) -> None:
         """A coroutine to handle a text changed message."""
 
-        logger.info(__name__, f"(on_input_changed) Input changed with message: {message.value}")
+        logger.debug(__name__, "(on_input_changed) Input changed with message: %s", message.value)
         text = message.value
         self.chat_label_sz = len(text)
 
         if len(self.mentioned_files) > 0:
-            for file in self.mentioned_files:
-                if file not in str(text):
+            for file in list(self.mentioned_files):
+                if file not in str(text) and file.split("/")[-1] not in str(text):
                     self.delete_file_button(file, True)
 
         self.chat_label_sz = len(message.value)
@@ -154,32 +221,30 @@ class ChatView(Static):
 
         logger.info(__name__, "(on_input_submitted) Input submitted")
         user_input = str(self.query_one("#input_chat", Input).value)
-        logger.info(__name__, f"(on_input_submitted) User input: {user_input}")
+        logger.debug(__name__, "(on_input_submitted) User input: %s", user_input)
         self.query_one("#chat_scroll", VerticalScroll).mount(
             SystemUserResponse(user_input)
         )
         self.query_one("#input_chat", Input).clear()
 
-        self.query_one("#chat_scroll", VerticalScroll).mount(
-            LoadingIndicator(id="loading_indicator")
-        )
-        logger.info(__name__, f"(on_input_submitted) Running worker with user input")
-        self.run_worker(self.chat_callback(user_input),  exclusive=False, thread=True)
+        loading_indicator = LoadingIndicator(classes="loading_indicator")
+        self.query_one("#chat_scroll", VerticalScroll).mount(loading_indicator)
+        logger.info(__name__, "(on_input_submitted) Running worker with user input")
+        self.run_worker(self.chat_callback(user_input, loading_indicator), exclusive=False)
 
     def on_button_pressed(self, event):
         """Event when a button in clicked"""
-        logger.info(__name__, f"(on_button_pressed) Button pressed with event: {event.button.id}")
+        logger.info(__name__, "(on_button_pressed) Button pressed with event: %s", event.button.id)
         button_pressed = str(event.button.id)
-        if "cv_hs_file_" in button_pressed:
-            file_name = button_pressed.split("_")[-1].replace("---", ".")
-            path = self.file_manager.get_file_path(file_name)
+        if button_pressed in self.file_buttons:
+            path = self.file_manager.get_file_path(self.file_buttons[button_pressed])
             self.display_code_file(path)
     
     def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
         """Called when the worker state changes."""
-        logger.info(__name__, f"(on_worker_state_changed) Worker state changed with event: {str(event)}")
+        logger.info(__name__, "(on_worker_state_changed) Worker state changed with event: %s", event)
         if WorkerState.SUCCESS == event.worker.state and event.worker.name == "chat_callback":
-            self.build_chatbot_response()
-        logger.info(__name__, f"{event}")
+            self.query_one("#chat_scroll", VerticalScroll).scroll_down(animate=True)
+        logger.info(__name__, "%s", event)
 
     
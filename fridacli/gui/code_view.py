@@ -1,9 +1,11 @@
 from textual.containers import  VerticalScroll, Vertical, Horizontal
 from textual.widgets import DirectoryTree, Static, Select, Button
 from fridacli.config import get_vars_as_dict
+from fridacli.file_manager import FileManager
 from rich.traceback import Traceback
 from fridacli.logger import Logger
 from textual.reactive import var
+from textual.message import Message
 from rich.syntax import Syntax
 from typing import Iterable
 from pathlib import Path
@@ -13,6 +15,7 @@ import subprocess
 import os
 
 logger = Logger()
+file_manager = FileManager()
 
 LINES = """Generate Documentation
 generate_epics
@@ -24,7 +27,7 @@ class FilteredDirectoryTree(DirectoryTree):
         """
             Filter out paths that start with a dot or tilde.
         """
-        logger.info(__name__, "(filter_paths) Filtering paths")
+        logger.debug(__name__, "(filter_paths) Filtering paths")
         return [path for path in paths if not path.name.startswith((".", "~"))]
     
 class CodeView(Static):
@@ -33,6 +36,15 @@ class CodeView(Static):
     recipe_selected = ""
     file_button_open = ""
 
+    class ProjectChanged(Message):
+        """
+            The changes of a batch of the watcher
+        """
+
+        def __init__(self, events) -> None:
+            super().__init__()
+            self.events = events
+
     def watch_show_tree(self, show_tree: bool) -> None:
         """Called when show_tree is modified."""
         self.set_class(show_tree, "-show-tree")
@@ -40,7 +52,7 @@ class CodeView(Static):
     def compose(self):
         logger.info(__name__, "(compose) Composing CodeView")
         path = get_vars_as_dict()["PROJECT_PATH"]
-        logger.info(__name__, f"(compose) Project path: {path}")
+        logger.info(__name__, "(compose) Project path: %s", path)
 
         with Horizontal():
             with Vertical(id="code_view_left"):
@@ -54,13 +66,59 @@ class CodeView(Static):
     def on_mount(self) -> None:
         logger.info(__name__, "(on_mount) Mounting CodeView")
         self.query_one(DirectoryTree).focus()
+        file_manager.add_listener(self.on_project_changed)
+
+    def on_unmount(self) -> None:
+        file_manager.remove_listener(self.on_project_changed)
+
+    def on_project_changed(self, events):
+        """
+            Called from the watcher thread with the changes of the project. post_message doesn't wait
+            for the event loop, a watcher being stopped from the UI thread would wait for this call otherwise
+        """
+        self.post_message(self.ProjectChanged(events))
+
+    def on_code_view_project_changed(self, message: ProjectChanged) -> None:
+        self.refresh_tree_nodes(message.events)
+
+    def refresh_tree_nodes(self, events):
+        """
+            Reload only the loaded directories of the tree where something changed
+        """
+        tree = self.query_one("#cv_tree_view", FilteredDirectoryTree)
+        directories = set()
+        for event in events:
+            directories.add(Path(event.path).parent)
+            if event.dest_path:
+                directories.add(Path(event.dest_path).parent)
+        for directory in directories:
+            node = self.find_tree_node(tree, directory)
+            if node is not None and (node.data is None or node.data.loaded):
+                tree.reload_node(node)
+
+    def find_tree_node(self, tree, path):
+        """
+            Get the node of a directory in the tree, None if it is not loaded
+        """
+        node = tree.root
+        if Path(tree.path).resolve() == path.resolve():
+            return node
+        while node.data is None or node.data.path != path:
+            for child in node.children:
+                child_path = child.data.path if child.data is not None else None
+                if child_path == path or (child_path is not None and child_path in path.parents):
+                    node = child
+                    break
+            else:
+                return None
+        return node
 
     def on_directory_tree_file_selected(
         self, event: DirectoryTree.FileSelected
     ) -> None:
         """Called when the user click a file in the directory tree."""
 
-        logger.info(__name__, f"(on_directory_tree_file_selected) File selected: {str(event.path)}")
+        logger.info(__name__, "(on_directory_tree_file_selected) File selected: %s", event.path)
         event.stop()
         try:
             extension = event.path.suffix
@@ -73,10 +131,10 @@ class CodeView(Static):
             else:
                 self.update_file_code_view(event.path, False)
         except Exception as e :
-            logger.error(__name__, f"Error opening file: {e}")
+            logger.error(__name__, "Error opening file: %s", e)
 
     def update_file_code_view(self, path, is_chat):
-        logger.info(__name__, f"update_file_code_view")
+        logger.info(__name__, "update_file_code_view")
         code_view = self.query_one("#cv_code", Static)
         try:
             syntax = Syntax.from_path(
@@ -99,8 +157,8 @@ class CodeView(Static):
                     self.file_button_open = str(path)
                     self.parent.parent.query_one("#chat_view").mount_file_button(str(path), False)
                 else:
-                    file_name = self.file_button_open.split("\\")[-1] if OS == "win" else self.file_button_open.split("/")[-1]
-                    self.parent.parent.query_one("#chat_view").delete_file_button(file_name, False)
+                    file_key = file_manager.get_relative_path(self.file_button_open)
+                    self.parent.parent.query_one("#chat_view").delete_file_button(file_key, False)
                     self.file_button_open = str(path)
                     self.parent.parent.query_one("#chat_view").mount_file_button(str(path), False)
 
@@ -116,7 +174,7 @@ class CodeView(Static):
 
     def on_button_pressed(self, event: Button.Pressed):
         button_pressed = str(event.button.id)
-        logger.info(__name__, button_pressed)
+        logger.info(__name__, "%s", button_pressed)
         if button_pressed == "btn_recipe" :
             """
             TODO: Assure that the threads are syncroniced and do not stop the GUI  thread
@@ -132,4 +190,6 @@ class CodeView(Static):
 
     def doc_generator_callback(self, result):
         self.app.push_screen(DocumentResultResume(result))
-        self.query_one("#cv_tree_view", FilteredDirectoryTree).reload()
+        # The watcher already refreshed the directories where documents were written
+        if not file_manager.is_watching():
+            self.query_one("#cv_tree_view", FilteredDirectoryTree).reload()
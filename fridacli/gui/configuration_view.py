@@ -78,20 +78,20 @@ class ConfigurationView(Static):
         input_chat_model_name_v4.value = env_vars["CHAT_MODEL_NAME_V4"]
         input_python_env.value = env_vars["PYTHON_ENV_PATH"]
 
-        logger.info(__name__, f"""(on_mount) 
-            input_project_path: {input_project_path.value}
-            input_llmops_api_key: {input_llmops_api_key.value}
-            input_chat_model_name: {input_chat_model_name.value}
-            input_chat_model_name_v4: {input_chat_model_name_v4.value} 
-            input_python_env: {input_python_env.value}          
-        """)
+        logger.debug(__name__, """(on_mount) 
+            input_project_path: %s
+            input_llmops_api_key: %s
+            input_chat_model_name: %s
+            input_chat_model_name_v4: %s 
+            input_python_env: %s          
+        """, input_project_path.value, input_llmops_api_key.value, input_chat_model_name.value, input_chat_model_name_v4.value, input_python_env.value)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """
         Update the configuration file
         """
         button_pressed = str(event.button.id)
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
         if button_pressed == "btn_project_confirm":
             project_path = self.query_one("#input_project_path", Input).value
 
@@ -149,7 +149,7 @@ class ConfigurationView(Static):
         """
             Update the input with the selected directory
         """
-        logger.info(__name__, f"(on_directory_tree_directory_selected) Directory selected: {str(event.path)}")
+        logger.info(__name__, "(on_directory_tree_directory_selected) Directory selected: %s", event.path)
         tree_id = event.control.id
         if tree_id == "configuration_directorytree_projectpath":
             self.query_one("#input_project_path", Input).value = str(event.path)
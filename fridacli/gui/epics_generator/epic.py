@@ -74,7 +74,7 @@ class Epic(Static):
         user_stories_component = self.query_one("#user_story_vertical", Vertical)
         user_stories_component.remove_children(UserStory)
         for user_story in user_stories:
-            logger.info(__name__, "user story: " + str(user_story))
+            logger.debug(__name__, "user story: %s", user_story)
             user_stories_component.mount(UserStory(user_story))
 
     def get_data(self):
@@ -123,7 +123,7 @@ class Epic(Static):
         text = self.selected_text_area.text
         id = self.selected_text_area.id
         user_story_obj = self.selected_text_area.parent.parent
-        logger.info(__name__, f"TextArea clicked parent: " + str(user_story_obj))
+        logger.debug(__name__, "TextArea clicked parent: %s", user_story_obj)
         if text == "":
             #Complete the cell when is empty
             enhanced_text = await complete_epic_cell(user_story_obj.user_story, id)
@@ -131,7 +131,7 @@ class Epic(Static):
         else:
             #Enhance the text    
             enhanced_text = await enhance_text(text, id)
-            logger.info(__name__, f"Enhanced text: " + enhanced_text)
+            logger.debug(__name__, "Enhanced text: %s", enhanced_text)
             self.selected_text_area.text = enhanced_text
 
     async def complete_epic_callback(self):
@@ -199,7 +199,7 @@ class Epic(Static):
     
     def on_text_area_selection_changed(self, event: TextArea.SelectionChanged):
         self.selected_text_area = event.text_area
-        logger.info(__name__, f"TextArea clicked: " + event.text_area.id)
+        logger.info(__name__, "TextArea clicked: %s", event.text_area.id)
 
     def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
         """Called when the worker state changes."""
@@ -207,4 +207,4 @@ class Epic(Static):
             if event.worker.name == "enheance_text_callback" or event.worker.name == "complete_epic_callback":
                 self.app.pop_screen()
                 #self.build_completed_epic_callback()
-        logger.info(__name__, f"{event}")
\ No newline at end of file
+        logger.info(__name__, "%s", event)
\ No newline at end of file
@@ -69,7 +69,7 @@ class EpicsGeneration(Static):
         #Get the raw data from file
         data = get_data_from_file(self.PATH)
         self.projects = data
-        logger.info(__name__, str(data))
+        logger.debug(__name__, "%s", data)
 
         if data != None:
             if data.get("projects") != -1:
@@ -132,7 +132,7 @@ class EpicsGeneration(Static):
                 formatted_time,
                 params["csv_data"]
             )
-        logger.info(__name__, "project created with csv: " + str(project))
+        logger.debug(__name__, "project created with csv: %s", project)
         self.projects["projects"].append(project)
 
 
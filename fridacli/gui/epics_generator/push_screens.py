@@ -69,7 +69,7 @@ class NewObjectPushScreen(Screen):
             if event.worker.name == "new_object_push_screen":
                 #self.app.pop_screen()
                 self.dismiss("OK")
-        logger.info(__name__, f"{event}")
+        logger.info(__name__, "%s", event)
 
 class CreateNewProject(Screen):
     path = FRIDA_DIR_PATH
@@ -95,7 +95,7 @@ class CreateNewProject(Screen):
         )
     def on_radio_set_changed(self, event: RadioSet.Changed):
         self.radio_set_value = event.pressed.label
-        logger.info(__name__, self.radio_set_value)
+        logger.info(__name__, "%s", self.radio_set_value)
 
     def get_data_from_csv(self, path):
         try:
@@ -112,18 +112,18 @@ class CreateNewProject(Screen):
                             epics[epic_name].append(row)
             return epics
         except Exception as e:
-            logger.info(__name__, "Error while trying to get the data from the CSV file: " + str(e))
+            logger.info(__name__, "Error while trying to get the data from the CSV file: %s", e)
             return {}
         
     def upload_excel_callback(self, path):
-        logger.info(__name__, "path: " + str(path))
+        logger.info(__name__, "path: %s", path)
         csv_data = self.get_data_from_csv(path)
         if csv_data != {}:
             self.csv_data = csv_data
             self.notify("CSV data retrived successfully")
         else:
             self.notify("An error occurred while trying to get the data from the CSV file", severity="error")
-        logger.info(__name__, "data from csv" + str(self.csv_data))
+        logger.debug(__name__, "data from csv %s", self.csv_data)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         button_pressed = event.button.id
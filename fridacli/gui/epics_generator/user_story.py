@@ -86,7 +86,7 @@ class UserStory(Static):
             logger.info(__name__, "p")
 
     def on_text_area_pressed(self, event):
-        logger.info(__name__, f"TextArea gained focus")
+        logger.info(__name__, "TextArea gained focus")
 
     def on_radio_button_changed(self, event: RadioButton.Changed):
         self.selected = event.radio_button.value
\ No newline at end of file
@@ -3,7 +3,7 @@ import datetime
 
 from fridacli.chatbot import ChatbotAgent
 from fridacli.logger import Logger
-import re
+from fridacli.frida_coder.code_fences import get_closed_blocks
 import csv
 
 chatbot_agent = ChatbotAgent()
@@ -30,7 +30,7 @@ def get_data_from_file(path):
 
 def save_csv(path, project):
     """Save the project in a csv file"""
-    logger.info(__name__, "project in save csv:" + str(project))
+    logger.debug(__name__, "project in save csv: %s", project)
     try:
         with open(path, "w") as file:
             writer = csv.DictWriter(file, fieldnames=['epic', 'user_story', 'description', 'acceptance_criteria', 'out_of_scope'])
@@ -118,21 +118,16 @@ def generate_project_with_csv(project_name, project_description, plataform, date
 def get_code_block(text):
     """Get the code blocks from a text"""
 
-    try:
-        code_pattern = re.compile(r"```([\w#]*)\n(.*?)```", re.DOTALL)
-        matches = code_pattern.findall(text)
-        code_blocks = [
-            {
-                "language": match[0],
-                "code": match[1],
-            }
-            for match in matches
-        ]
-        if code_blocks == []:
-            logger.info(__name__, f"Revisar: {text}")
-        return code_blocks
-    except Exception as e:
-        pass
+    code_blocks = [
+        {
+            "language": language,
+            "code": code,
+        }
+        for language, code in get_closed_blocks(text)
+    ]
+    if code_blocks == []:
+        logger.debug(__name__, "Revisar: %s", text)
+    return code_blocks
 
 def has_expected_epic_structure(expected_structure, json_obj):
     """Check if the json object has the expected structure"""
@@ -203,15 +198,15 @@ async def create_generated_epic(epic, name, empty, project_description):
         ]
     }}
     """
-    logger.info(__name__, "Prompttt: " + prompt)
+    logger.debug(__name__, "Prompttt: %s", prompt)
     trys = 3
     # Try 3 times until the response is the expected
     for i in range(trys):
-        response = chatbot_agent.chat(prompt, True)
+        response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", retries=i, session=None, cache=False)
         try:
             json_response = json.loads(response)
             if has_expected_epic_structure(expected_structure, json_response):
-                logger.info(__name__, str(json_response))
+                logger.debug(__name__, "%s", json_response)
                 return json_response
             else:
                 logger.info(__name__, "not the same")
@@ -220,7 +215,7 @@ async def create_generated_epic(epic, name, empty, project_description):
             if len(blocks) > 0:
                 json_response = blocks[0]["code"]
                 json_response = json.loads(json_response)
-                logger.info(__name__, "blocks " + str(json_response))
+                logger.debug(__name__, "blocks %s", json_response)
                 if has_expected_epic_structure(expected_structure, json_response):
                     return json_response
     return {}
@@ -256,16 +251,16 @@ async def create_generated_user_story(user_story, name, empty, project_descripti
         "out_of_scope": ""
     }}
     """
-    logger.info(__name__, "Prompttt: " + prompt)
+    logger.debug(__name__, "Prompttt: %s", prompt)
     trys = 3
     for i in range(trys):
-        response = chatbot_agent.chat(prompt, True)
-        logger.info(__name__, "response" + str(response))
+        response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", retries=i, session=None, cache=False)
+        logger.debug(__name__, "response %s", response)
 
         try:
             json_response = json.loads(response)
             if has_expected_epic_structure(expected_structure, json_response):
-                logger.info(__name__, str(json_response))
+                logger.debug(__name__, "%s", json_response)
                 return json_response
             else:
                 logger.info(__name__, "not the same")
@@ -274,7 +269,7 @@ async def create_generated_user_story(user_story, name, empty, project_descripti
             if len(blocks) > 0:
                 json_response = blocks[0]["code"]
                 json_response = json.loads(json_response)
-                logger.info(__name__, "blocks " + str(json_response))
+                logger.debug(__name__, "blocks %s", json_response)
                 if has_expected_epic_structure(expected_structure, json_response):
                     return json_response
     return {}
@@ -302,12 +297,12 @@ async def complete_epic(epic, description):
     trys = 4
     # Try 3 times until the response is the expected
     for i in range(trys):
-        response = chatbot_agent.chat(prompt, True)
-        logger.info(__name__, response)
+        response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", retries=i, session=None, cache=False)
+        logger.debug(__name__, "%s", response)
         try:
             json_response = json.loads(response)
             if has_expected_epic_structure(expected_structure, json_response):
-                logger.info(__name__, str(json_response))
+                logger.debug(__name__, "%s", json_response)
                 return json_response
             else:
                 logger.info(__name__, "not the same")
@@ -317,7 +312,7 @@ async def complete_epic(epic, description):
             if len(blocks) > 0:
                 json_response = blocks[0]["code"]
                 json_response = json.loads(json_response)
-                logger.info(__name__, "blocks " + str(json_response))
+                logger.debug(__name__, "blocks %s", json_response)
                 if has_expected_epic_structure(expected_structure, json_response):
                     return json_response
     return {}
@@ -328,7 +323,7 @@ async def enhance_project_description(description):
     {description}
     IMPORTANT Response ONLY with the enhanced project description.
     """
-    response = chatbot_agent.chat(prompt, True)
+    response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", session=None, cache=False)
     return response
 
 async def complete_epic_cell(user_story, id):
@@ -347,7 +342,7 @@ async def complete_epic_cell(user_story, id):
     {user_story}
     IMPORTANT Response ONLY with the {text_type}.
     """
-    response = chatbot_agent.chat(prompt, True)
+    response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", session=None, cache=False)
     return response
 
 async def enhance_text(text, id):
@@ -366,7 +361,7 @@ async def enhance_text(text, id):
     {text}
     IMPORTANT Response ONLY with the enhanced text.
     """
-    response = chatbot_agent.chat(prompt, True)
+    response = await chatbot_agent.achat(prompt, True, recipe="epics_generator", session=None, cache=False)
     return response
 
 def create_empty_userstory():
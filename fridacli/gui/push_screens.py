@@ -13,6 +13,7 @@ from typing import Iterable
 from pathlib import Path
 import csv
 import os
+import threading
 
 
 logger = Logger()
@@ -51,7 +52,7 @@ class PathSelector(ModalScreen):
         """
             Called when a button is pressed.
         """
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {event.button.id}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", event.button.id)
         if event.button.id == "confirm_path_doc":
             path = self.query_one("#input_documentation_path", Input).value
             if path != "":
@@ -65,7 +66,7 @@ class PathSelector(ModalScreen):
         """
             Called when a directory is selected.
         """
-        logger.info(__name__, f"(on_directory_tree_directory_selected) Directory selected: {str(event.path)}")
+        logger.info(__name__, "(on_directory_tree_directory_selected) Directory selected: %s", event.path)
         tree_id = event.control.id
         if tree_id == "configuration_documentation_path":
             self.query_one("#input_documentation_path", Input).value = str(event.path)
@@ -75,7 +76,7 @@ class PathSelector(ModalScreen):
             tree_id = event.control.id
             if tree_id == "configuration_documentation_path":
                 self.query_one("#input_documentation_path", Input).value = str(event.path)
-            logger.info(__name__, f"File selected: {str(event.path)}")
+            logger.info(__name__, "File selected: %s", event.path)
 
 class DocGenerator(Screen):
     def compose(self):
@@ -86,6 +87,8 @@ class DocGenerator(Screen):
             Horizontal(Button("Select path", id="select_path_button"), Input(id="input_doc_path",  disabled=True, value=file_manager.get_folder_path()), classes="doc_generator_horizontal"),
             Label("Select if you want your code formatted after the documentation (only for C# and Python code):", classes="format_selection", shrink=True),
             Checkbox("Yes, use the formatter", id="use_formater"),
+            Label("Select if you only want to document the functions that are new, changed or without documentation since the last run:", classes="format_selection", shrink=True),
+            Checkbox("Only document new or changed functions", id="incremental_check"),
             Label("Select a method to generate the documentation:", classes="format_selection", shrink=True),
             Select(((line, line) for line in LINES), id="select_method", value="Quick (ChatGPT-3.5)"),
             Horizontal(Button("Quit", variant="error", id="quit"), Button("Create Documentation", variant="success", id="generate_documentation"), classes="doc_generator_horizontal"),
@@ -96,7 +99,7 @@ class DocGenerator(Screen):
         """
             Called when the worker state changes.
         """
-        logger.info(__name__, f"(on_worker_state_changed) Worker state changed with event: {str(event)}")
+        logger.info(__name__, "(on_worker_state_changed) Worker state changed with event: %s", event)
         if WorkerState.SUCCESS == event.worker.state and event.worker.name == "document_files":
             self.app.pop_screen()
             self.dismiss(event.worker.result)
@@ -105,7 +108,7 @@ class DocGenerator(Screen):
         """
             Called when a button is pressed.
         """
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {event.button.id}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", event.button.id)
         if event.button.id == "quit":
             self.app.pop_screen()
         elif event.button.id == "select_path_button":
@@ -115,11 +118,13 @@ class DocGenerator(Screen):
             md = self.query_one("#md_check", Checkbox).value
             doc_path = self.query_one("#input_doc_path", Input).value
             method = self.query_one("#select_method", Select)
-            logger.info(__name__, f"(on_button_pressed) docx: {str(docx)} md: {str(md)} doc_path: {str(doc_path)} method: {str(method.value)}")
+            logger.info(__name__, "(on_button_pressed) docx: %s md: %s doc_path: %s method: %s", docx, md, doc_path, method.value)
             if (docx or md) and doc_path != "" and not method.is_blank():
                 use_formatter = self.query_one("#use_formater", Checkbox).value
-                self.app.push_screen(Loader("Working on your documentation!"))
-                self.run_worker(document_files({"docx": docx, "md": md}, method.value.split(" ")[0], doc_path, use_formatter), exclusive=False, thread=True)
+                incremental = self.query_one("#incremental_check", Checkbox).value
+                self.cancel_event = threading.Event()
+                self.app.push_screen(Loader("Working on your documentation!", self.cancel_documentation))
+                self.run_worker(document_files({"docx": docx, "md": md}, method.value.split(" ")[0], doc_path, use_formatter, self.cancel_event, incremental), exclusive=False, thread=True)
             else:
                 self.notify(f"You must select at least one format and a method for the documentation.")
 
@@ -127,23 +132,40 @@ class DocGenerator(Screen):
         """
             Callback for the path selection modal.
         """
-        logger.info(__name__, f"(select_doc_path_callback) Path selected: {str(path)}")
+        logger.info(__name__, "(select_doc_path_callback) Path selected: %s", path)
         if path != "":
             self.query_one("#input_doc_path", Input).value = path
+
+    def cancel_documentation(self):
+        """
+            Callback for the cancel button of the loader, the files already documented are kept.
+        """
+        logger.info(__name__, "(cancel_documentation) Cancelling the documentation")
+        self.cancel_event.set()
+        self.notify("Cancelling, waiting for the files in progress...")
             
 
 class Loader(Screen):
-    def __init__(self, text) -> None:
+    def __init__(self, text, cancel_callback=None) -> None:
         self.text = text
+        self.cancel_callback = cancel_callback
         super().__init__()
 
     def compose(self):
         logger.info(__name__, "Composing DocLoader")
-        yield Vertical(
-            Label(self.text, id = "doc_title"),
-            LoadingIndicator(),
-            classes="loader",
-        )
+        with Vertical(classes="loader"):
+            yield Label(self.text, id = "doc_title")
+            yield LoadingIndicator()
+            if self.cancel_callback is not None:
+                yield Button("Cancel", variant="error", id="cancel_loader")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """
+            Called when the cancel button is pressed.
+        """
+        if event.button.id == "cancel_loader":
+            event.button.disabled = True
+            self.cancel_callback()
 
 class EpicGenerator(Screen):
     path = FRIDA_DIR_PATH
@@ -158,22 +180,22 @@ class EpicGenerator(Screen):
             classes="dialog",
         )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         """
             Called when a button is pressed.
         """
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {event.button.id}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", event.button.id)
         if event.button.id == "quit":
             self.app.pop_screen()
         elif event.button.id == "generate":
             epics_text = self.query_one("#epics_text", Input).value
-            logger.info(__name__, f"(on_button_pressed) epics_text: {str(epics_text)}")
-            generate_epics(epics_text, self.path)
+            logger.info(__name__, "(on_button_pressed) epics_text: %s", epics_text)
+            await generate_epics(epics_text, self.path)
             self.app.pop_screen()
 
     def on_directory_tree_directory_selected(self, event: DirectoryTree.DirectorySelected):
         self.path = event.path
-        logger.info(__name__, self.path)
+        logger.info(__name__, "%s", self.path)
 
 class CreateNewEpic(Screen):
     path = FRIDA_DIR_PATH
@@ -202,7 +224,7 @@ class CreateNewEpic(Screen):
         """
             Called when the radio set changes.
         """
-        logger.info(__name__, f"(on_radio_set_changed) Radio set changed to: {event.pressed.label}")  
+        logger.info(__name__, "(on_radio_set_changed) Radio set changed to: %s", event.pressed.label)  
         self.radio_set_value = event.pressed.label
 
 
@@ -210,7 +232,7 @@ class CreateNewEpic(Screen):
         """
             Get the data from the csv file
         """
-        logger.info(__name__, f"get_data_from_csv Getting data from csv from path: {path}")
+        logger.info(__name__, "get_data_from_csv Getting data from csv from path: %s", path)
         try:
             epics = {}
             with open(path, "r") as file:
@@ -223,10 +245,10 @@ class CreateNewEpic(Screen):
                             epics[epic_name] = [row]
                         else:
                             epics[epic_name].append(row)
-            logger.info(__name__, f"(get_data_from_csv) Epics: {str(epics)}")
+            logger.debug(__name__, "(get_data_from_csv) Epics: %s", epics)
             return epics
         except Exception as e:
-            logger.error(__name__, f"(get_data_from_csv) Error getting data from csv: {str(e)}")
+            logger.error(__name__, "(get_data_from_csv) Error getting data from csv: %s", e)
             return {}
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
@@ -234,14 +256,14 @@ class CreateNewEpic(Screen):
             Called when a button is pressed.
         """
         button_pressed = event.button.id
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
         if button_pressed == "create_epic_quit":
             self.app.pop_screen()
         elif button_pressed == "create_epic_generate":
             epic_name_input = self.query_one("#epic_name_input", Input).value
             plataform = str(self.radio_set_value)
             project_context_input = self.query_one("#project_context_input", TextArea).text
-            logger.info(__name__, f"(on_button_pressed) epic_name_input: {str(epic_name_input)} plataform: {str(plataform)} project_context_input: {str(project_context_input)}")
+            logger.debug(__name__, "(on_button_pressed) epic_name_input: %s plataform: %s project_context_input: %s", epic_name_input, plataform, project_context_input)
             if len(epic_name_input) > 0  and len(plataform) > 0 and len(project_context_input) > 0:
                 params = {"epic_name": epic_name_input, "plataform": plataform, "project_description": project_context_input}
                 if self.csv_data != {}:
@@ -261,7 +283,7 @@ class CreateNewEpic(Screen):
                 self.notify("CSV data retrived successfully")
             else:
                 self.notify("An error occurred while trying to get the data from the CSV file", severity="error")
-            logger.info(__name__, "data from csv" + str(self.csv_data))
+            logger.debug(__name__, "data from csv %s", self.csv_data)
 
 class ConfirmPushView(Screen):
     def __init__(self, text) -> None:
@@ -279,7 +301,7 @@ class ConfirmPushView(Screen):
             Called when a button is pressed.
         """
         button_pressed =  event.button.id
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
         if button_pressed == "cancel":
             self.app.pop_screen()
         elif button_pressed == "confirm":
@@ -303,7 +325,24 @@ class DocumentResultResume(Screen):
         logger.info(__name__, "(buildMD) Loading the Markdown documentation resume")
         markdown_text = ""
 
+        # Order in which the files were documented, the dependencies of a file go first
+        levels = {}
+        for result in self.result:
+            if result.get("level") is not None:
+                levels.setdefault(result["level"], []).append(result)
+        if levels:
+            markdown_text += "## Schedule\n"
+            for level in sorted(levels):
+                markdown_text += f"### Level {level}\n"
+                for result in levels[level]:
+                    dependencies = result.get("dependencies") or []
+                    uses = f" (uses {', '.join(dependencies)})" if dependencies else ""
+                    markdown_text += f"- {result['file']}{uses}\n"
+
         for result in self.result:
+            if result.get("unchanged"):
+                markdown_text += f"## {result['file']} is unchanged since the last run\n"
+                continue
             if result['total_functions'] == 0:
                 markdown_text += f"## {result['file']} was documented at 0%\n"
                 markdown_text += f"Couldn't count the number of functions\n"
@@ -326,7 +365,7 @@ class DocumentResultResume(Screen):
         self.buildMD()
 
     def save_result_callback(self, path):
-        logger.info(__name__, f"(save_result_callback) Path selected: {str(path)}")
+        logger.info(__name__, "(save_result_callback) Path selected: %s", path)
         if path != "":
             try:
                 with open(os.path.join(path, "result.md"), "w") as file:
@@ -342,7 +381,7 @@ class DocumentResultResume(Screen):
             Called when a button is pressed.
         """
         button_pressed =  event.button.id
-        logger.info(__name__, f"(on_button_pressed) Button pressed: {button_pressed}")
+        logger.info(__name__, "(on_button_pressed) Button pressed: %s", button_pressed)
         if button_pressed == "save_result_btn":
             self.app.push_screen(PathSelector(), self.save_result_callback)
         else:
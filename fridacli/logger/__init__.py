@@ -1,10 +1,37 @@
 import os
+import json
 import logging
 import datetime
+from .log_writer import LogWriter
+from .log_rotation import LogRotator
 HOME_PATH = os.path.expanduser("~")
 frida_dir = "fridacli"
 FRIDA_DIR_PATH = f"{HOME_PATH}/{frida_dir}"
-config_file_path = f"{HOME_PATH}/.fridacli"
+config_file_path = f"{FRIDA_DIR_PATH}/.fridacli"
+
+# Numeric value of each level, a message is written when its level is >= the configured one
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+DEFAULT_LOG_LEVEL = "INFO"
+# Maximum number of characters of a message (and of each argument), 0 disables the cap
+DEFAULT_MAX_PAYLOAD = 4000
+
+
+class _ForwardHandler(logging.Handler):
+    """
+    Handler for the standard logging module that writes through the Logger,
+    so those records share the writer and the rotation of app.log.
+    """
+
+    def __init__(self, append) -> None:
+        super().__init__()
+        self.__append = append
+
+    def emit(self, record):
+        try:
+            self.__append(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
 
 class Logger:
     _instance = None
@@ -17,51 +44,166 @@ class Logger:
 
             cls._instance.LOG_FILE_LOCATION = f"{path}{cls._log_file_name}"
             cls._instance.STATS_FILE_LOCATION = f"{path}{cls._stat_file_name}"
+            cls._instance._writer = None
+            cls._instance._rotator = LogRotator()
+            cls._instance._level = LOG_LEVELS[DEFAULT_LOG_LEVEL]
+            cls._instance._max_payload = DEFAULT_MAX_PAYLOAD
+            cls._instance.load_config()
             cls._instance.setup_logger()
+            cls._instance.set_async_mode(True)
         return cls._instance
 
     def setup_logger(self):
         os.makedirs(os.path.dirname(self.LOG_FILE_LOCATION), exist_ok=True)
         self.logger = logging.getLogger()
-        self.logger.setLevel(logging.INFO)
-        file_handler = logging.FileHandler(self.LOG_FILE_LOCATION)
+        self.logger.setLevel(self._level)
+        file_handler = _ForwardHandler(
+            lambda line: self.__append(self.LOG_FILE_LOCATION, line)
+        )
         formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
         file_handler.setFormatter(formatter)
         self.logger.handlers = []
         self.logger.addHandler(file_handler)
 
+    def configure(self, level: str = None, max_payload: int = None):
+        """
+            Change the minimum level written and the size cap of the messages
+        """
+        if level is not None and level.upper() in LOG_LEVELS:
+            self._level = LOG_LEVELS[level.upper()]
+            logging.getLogger().setLevel(self._level)
+        if max_payload is not None and max_payload >= 0:
+            self._max_payload = max_payload
+
+    def load_config(self, path: str = config_file_path):
+        """
+            Read the LOG_* variables from the configuration file, if present
+        """
+        try:
+            if not os.path.exists(path):
+                return
+            config_variables = {}
+            with open(path, "r") as file:
+                for line in file:
+                    key, _, value = line.strip().partition("=")
+                    config_variables[key] = value
+            numbers = {}
+            for key in ("LOG_MAX_PAYLOAD", "LOG_MAX_BYTES", "LOG_MAX_AGE_HOURS", "LOG_RETENTION"):
+                value = config_variables.get(key, "")
+                numbers[key] = int(value) if value.isdigit() else None
+            self.configure(
+                level=config_variables.get("LOG_LEVEL") or None,
+                max_payload=numbers["LOG_MAX_PAYLOAD"],
+            )
+            self._rotator.configure(
+                max_bytes=numbers["LOG_MAX_BYTES"],
+                max_age_hours=numbers["LOG_MAX_AGE_HOURS"],
+                retention=numbers["LOG_RETENTION"],
+            )
+        except Exception as e:
+            print("Error:", e)
+
+    def is_enabled_for(self, level: str) -> bool:
+        """
+            Check if the messages of the given level are written
+        """
+        return LOG_LEVELS[level] >= self._level
+
+    def set_async_mode(self, enabled: bool):
+        """
+            Switch between the queue-based writer and the synchronous open/write/close mode
+        """
+        if enabled and self._writer is None:
+            self._writer = LogWriter(rotator=self._rotator)
+        elif not enabled and self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def flush(self):
+        """
+            Wait until every queued line has been written
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def __append(self, path: str, line: str):
+        if self._writer is not None:
+            self._writer.write(path, line)
+            return
+        if os.path.exists(path) and self._rotator.should_rotate(path, os.path.getsize(path)):
+            self._rotator.rotate(path)
+        with open(path, "a") as f:
+            f.write(line)
+            f.flush()
+
+    def __truncate(self, text: str) -> str:
+        if self._max_payload and len(text) > self._max_payload:
+            hidden = len(text) - self._max_payload
+            return f"{text[: self._max_payload]}... [truncated {hidden} chars]"
+        return text
+
+    def __format(self, text: str, args: tuple) -> str:
+        """
+            Build the message, only the str arguments are truncated so numeric formats like %.3f keep working
+        """
+        if args:
+            text = text % tuple(self.__truncate(arg) if isinstance(arg, str) else arg for arg in args)
+        return self.__truncate(text)
+
+    def __log(self, log_type: str, position: str, text: str, args: tuple):
+        if LOG_LEVELS[log_type] < self._level:
+            return
+        try:
+            text = self.__format(text, args)
+        except Exception as e:
+            text = f"{text} (Error formatting the message: {e})"
+        self.__write_log(position, log_type, text)
+
     def __write_log(self, position: str, log_type: str, text: str):
         try:
             current_time = datetime.datetime.now()
             formatted_time = current_time.strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.LOG_FILE_LOCATION, "a") as f:
-                line = f"{formatted_time} - {position} - {log_type} - {text}\n"
-                f.write(line)
-                f.flush()
+            line = f"{formatted_time} - {position} - {log_type} - {text}\n"
+            self.__append(self.LOG_FILE_LOCATION, line)
         except Exception as e:
             print("Error:", e)
 
-    def __write_log_stat(self, position: str, log_type: str, text: str):
-        current_time = datetime.datetime.now()
-        formatted_time = current_time.strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.STATS_FILE_LOCATION, "a") as f:
-            line = f"{formatted_time} - {position} - {log_type} - {text}\n"
-            f.write(line)
+    def debug(self, position: str, text: str, *args):
+        self.__log("DEBUG", position, text, args)
 
-    def info(self, position: str, text: str):
-        self.__write_log(position, "INFO", text)
+    def info(self, position: str, text: str, *args):
+        self.__log("INFO", position, text, args)
 
-    def error(self, position: str, text: str):
-        self.__write_log(position, "ERROR", text)
+    def warning(self, position: str, text: str, *args):
+        self.__log("WARNING", position, text, args)
 
-    def stat_tokens(self, prompt_tokens, completion_tokens):
-        self.__write_log_stat(
-            "Tokens",
-            "STAT",
-            f"prompt_tokens: {prompt_tokens}, completion_tokens:{completion_tokens}",
-        )
+    def error(self, position: str, text: str, *args):
+        self.__log("ERROR", position, text, args)
+
+    def stat_tokens(self, prompt_tokens, completion_tokens, **fields):
+        """
+            Append a JSON line with the token usage (and any extra field) to stats.log
+        """
+        try:
+            record = {
+                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+            }
+            record.update(fields)
+            self.__append(self.STATS_FILE_LOCATION, json.dumps(record) + "\n")
+        except Exception as e:
+            print("Error:", e)
+
+    def get_rotated_segments(self, path: str) -> list:
+        """
+            Get the rotated segments of a log file, from the oldest to the newest
+        """
+        return self._rotator.get_rotated_segments(path)
 
     def update_log_paths(self, file_location):
+        if self._writer is not None:
+            self._writer.close_files()
         self.LOG_FILE_LOCATION = f"{file_location}{self._log_file_name}"
         self.STATS_FILE_LOCATION = f"{file_location}{self._stat_file_name}"
         self.setup_logger()
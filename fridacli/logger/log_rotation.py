@@ -0,0 +1,177 @@
+import os
+import json
+import gzip
+import queue
+import shutil
+import datetime
+import threading
+
+# Suffix added to a log file when it is rotated, e.g. app.log.2024-05-01_10-30-00-000123.gz
+ROTATED_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S-%f"
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_RETENTION = 5
+
+
+class LogRotator:
+    """
+    Size- and time-based rotation of the log files.
+
+    Attributes:
+        - max_bytes (int): Size in bytes that triggers a rotation, 0 disables it.
+        - max_age_hours (int): Age of the first line of a file that triggers a rotation, 0 disables it.
+        - retention (int): Number of rotated segments kept for each log file, 0 keeps all of them.
+
+    Rotating only renames the current file, which is fast, so the writers keep going.
+    The compression of the rotated segment and the deletion of the oldest ones run in
+    a background thread.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_hours: int = DEFAULT_MAX_AGE_HOURS,
+        retention: int = DEFAULT_RETENTION,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_age_hours = max_age_hours
+        self.retention = retention
+        self.__segment_start = {}
+        self.__jobs = queue.Queue()
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def configure(
+        self, max_bytes: int = None, max_age_hours: int = None, retention: int = None
+    ) -> None:
+        """
+            Update the rotation limits, None keeps the current value
+        """
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if max_age_hours is not None:
+            self.max_age_hours = max_age_hours
+        if retention is not None:
+            self.retention = retention
+
+    def get_segment_start(self, path: str):
+        """
+            Get the time of the first line of the current file, cached until the file is rotated
+        """
+        if path not in self.__segment_start:
+            start = None
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    first_line = f.readline()
+                # The stats log uses JSON lines with a timestamp field
+                if first_line.startswith("{"):
+                    first_line = json.loads(first_line)["timestamp"]
+                start = datetime.datetime.strptime(first_line[:19], LOG_TIME_FORMAT)
+            except Exception:
+                start = datetime.datetime.now() if os.path.exists(path) else None
+            if start is None:
+                return None
+            self.__segment_start[path] = start
+        return self.__segment_start[path]
+
+    def should_rotate(self, path: str, size: int) -> bool:
+        """
+            Check if the file in path must be rotated before writing more lines
+        """
+        if size <= 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        if self.max_age_hours:
+            start = self.get_segment_start(path)
+            if start is not None:
+                age = datetime.datetime.now() - start
+                return age >= datetime.timedelta(hours=self.max_age_hours)
+        return False
+
+    def rotate(self, path: str) -> bool:
+        """
+            Rename the current file and schedule its compression, the caller must have closed it
+        """
+        try:
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return False
+            rotated_path = f"{path}.{datetime.datetime.now().strftime(ROTATED_TIME_FORMAT)}"
+            os.replace(path, rotated_path)
+            self.__segment_start.pop(path, None)
+            self.__schedule(path)
+            return True
+        except Exception as e:
+            print("Error:", e)
+            return False
+
+    def get_rotated_segments(self, path: str) -> list:
+        """
+            Get the rotated segments of a log file, from the oldest to the newest
+        """
+        directory, base_name = os.path.split(path)
+        prefix = f"{base_name}."
+        try:
+            names = [
+                name
+                for name in os.listdir(directory or ".")
+                if name.startswith(prefix) and not name.endswith(".tmp")
+            ]
+        except FileNotFoundError:
+            return []
+        # The timestamps have a fixed width, so the names sort chronologically
+        return [os.path.join(directory, name) for name in sorted(names)]
+
+    def compress_segments(self, path: str) -> None:
+        """
+            Gzip every rotated segment of the log file that is not compressed yet
+        """
+        for segment in self.get_rotated_segments(path):
+            if segment.endswith(".gz"):
+                continue
+            try:
+                tmp_path = f"{segment}.gz.tmp"
+                with open(segment, "rb") as source, gzip.open(tmp_path, "wb") as target:
+                    shutil.copyfileobj(source, target)
+                os.replace(tmp_path, f"{segment}.gz")
+                os.remove(segment)
+            except Exception as e:
+                print("Error:", e)
+
+    def apply_retention(self, path: str) -> None:
+        """
+            Delete the oldest rotated segments beyond the retention cap
+        """
+        if not self.retention:
+            return
+        segments = self.get_rotated_segments(path)
+        for segment in segments[: max(0, len(segments) - self.retention)]:
+            try:
+                os.remove(segment)
+            except Exception as e:
+                print("Error:", e)
+
+    def wait(self) -> None:
+        """
+            Block until the scheduled compressions are done
+        """
+        self.__jobs.join()
+
+    def __schedule(self, path: str) -> None:
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="fridacli-log-rotation", daemon=True
+                )
+                self.__thread.start()
+        self.__jobs.put(path)
+
+    def __run(self) -> None:
+        while True:
+            path = self.__jobs.get()
+            try:
+                self.compress_segments(path)
+                self.apply_retention(path)
+            finally:
+                self.__jobs.task_done()
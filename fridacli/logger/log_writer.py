@@ -0,0 +1,167 @@
+import atexit
+import queue
+import threading
+from .log_rotation import LogRotator
+
+
+class LogWriter:
+    """
+    Background writer used by the Logger in its queue-based mode.
+
+    Attributes:
+        - __queue (queue.Queue): Bounded FIFO of (path, line) items waiting to be written.
+        - __handles (dict): One long-lived file handle per log file.
+        - __batch_size (int): Maximum number of lines written in a single batch.
+        - __rotator (LogRotator): Decides when a file is rotated, None disables the rotation.
+
+    The writer runs in a single daemon thread, so the lines are written in the
+    same order in which they were queued. When the queue is full the callers wait,
+    which keeps the memory used by the pending lines bounded. The rotation happens
+    in the writer thread as well, so the callers never wait for it.
+    """
+
+    __STOP = object()
+    __CLOSE_FILES = object()
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        rotator: LogRotator = None,
+    ) -> None:
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__handles = {}
+        self.__rotator = rotator
+        self.__closed = False
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(
+            target=self.__run, name="fridacli-log-writer", daemon=True
+        )
+        self.__thread.start()
+        atexit.register(self.close)
+
+    def write(self, path: str, line: str) -> None:
+        """
+            Queue a line to be appended to the file in path
+        """
+        if self.__closed:
+            self.__write_direct(path, line)
+            return
+        self.__queue.put((path, line))
+
+    def flush(self) -> None:
+        """
+            Block until every queued line has been written to disk
+        """
+        if not self.__closed:
+            self.__queue.join()
+
+    def close_files(self) -> None:
+        """
+            Close the open handles once the pending lines are written, used when the paths change
+        """
+        if not self.__closed:
+            self.__queue.put((self.__CLOSE_FILES, None))
+
+    def close(self) -> None:
+        """
+            Write the pending lines, close the handles and stop the writer thread
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            # The lines written from now on go directly to the file
+            self.__closed = True
+            self.__queue.put((self.__STOP, None))
+            self.__thread.join()
+            # A caller could check __closed just before it was set and queue its line after the writer stopped
+            self.__write_queued()
+
+    def __write_direct(self, path: str, line: str) -> None:
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except Exception as e:
+            print("Error:", e)
+
+    def __get_handle(self, path: str):
+        handle = self.__handles.get(path)
+        if handle is None:
+            handle = open(path, "a", encoding="utf-8")
+            self.__handles[path] = handle
+        if self.__rotator is not None and self.__rotator.should_rotate(
+            path, handle.tell()
+        ):
+            handle.close()
+            self.__rotator.rotate(path)
+            handle = open(path, "a", encoding="utf-8")
+            self.__handles[path] = handle
+        return handle
+
+    def __close_handles(self) -> None:
+        for handle in self.__handles.values():
+            try:
+                handle.close()
+            except Exception as e:
+                print("Error:", e)
+        self.__handles = {}
+
+    def __write_pending(self, pending: dict) -> None:
+        for path, lines in pending.items():
+            try:
+                handle = self.__get_handle(path)
+                handle.write("".join(lines))
+                handle.flush()
+            except Exception as e:
+                print("Error:", e)
+        pending.clear()
+
+    def __write_batch(self, batch: list) -> bool:
+        """
+            Write a batch grouping the lines by file, returns True when the writer must stop
+        """
+        pending = {}
+        stop = False
+        for path, line in batch:
+            if path is self.__CLOSE_FILES or path is self.__STOP:
+                self.__write_pending(pending)
+                self.__close_handles()
+                stop = stop or path is self.__STOP
+            else:
+                pending.setdefault(path, []).append(line)
+        self.__write_pending(pending)
+        if stop:
+            self.__close_handles()
+        return stop
+
+    def __run(self) -> None:
+        while True:
+            try:
+                batch = [self.__queue.get(timeout=self.__flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.__batch_size:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self.__write_batch(batch)
+            for _ in batch:
+                self.__queue.task_done()
+            if stop:
+                break
+        # Lines queued while the writer was stopping are written synchronously
+        self.__write_queued()
+
+    def __write_queued(self) -> None:
+        while True:
+            try:
+                path, line = self.__queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(path, str):
+                self.__write_direct(path, line)
+            self.__queue.task_done()
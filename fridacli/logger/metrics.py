@@ -0,0 +1,214 @@
+import os
+import sys
+import gzip
+import json
+import bisect
+import threading
+from . import Logger
+
+logger = Logger()
+
+# Upper bounds (in seconds) of the latency buckets, each one 25% larger than the previous
+LATENCY_BUCKETS = [0.01 * 1.25**i for i in range(60)]
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of latencies, cheap to update and with bounded memory.
+
+    Attributes:
+        - __counts (list): Number of samples that fall in each bucket of LATENCY_BUCKETS.
+        - count (int): Number of samples recorded.
+        - total (float): Sum of the samples, in seconds.
+        - max (float): Largest sample, in seconds.
+
+    The percentiles are estimated with the upper bound of the bucket that contains them,
+    so the error is at most the width of one bucket (25%).
+    """
+
+    def __init__(self) -> None:
+        self.__counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.__counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+            Estimate the latency under which percent % of the samples fall
+        """
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * percent / 100
+        accumulated = 0
+        for index, bucket_count in enumerate(self.__counts):
+            accumulated += bucket_count
+            if accumulated >= threshold:
+                if index >= len(LATENCY_BUCKETS):
+                    return self.max
+                return min(LATENCY_BUCKETS[index], self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricsGroup:
+    """
+    Aggregated metrics of the LLM calls that share a key (recipe and model).
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cached = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = LatencyHistogram()
+
+    def add(self, record: dict) -> None:
+        self.calls += 1
+        self.errors += 0 if record.get("success", True) else 1
+        self.retries += 1 if record.get("retries", 0) > 0 else 0
+        self.cached += 1 if record.get("cached", False) else 0
+        self.prompt_tokens += record.get("prompt_tokens") or 0
+        self.completion_tokens += record.get("completion_tokens") or 0
+        self.latency.add(record.get("wall_time", 0.0))
+
+    def to_dict(self) -> dict:
+        result = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "mean": self.latency.mean(),
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}"] = self.latency.percentile(percent)
+        return result
+
+
+class Metrics:
+    """
+    Singleton that records every LLM call in stats.log (one JSON line per call)
+    and keeps in-memory latency histograms per recipe and model.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+            cls._instance.__groups = {}
+            cls._instance.__lock = threading.Lock()
+        return cls._instance
+
+    def record_llm_call(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        wall_time: float,
+        retries: int = 0,
+        recipe: str = "chat",
+        success: bool = True,
+        cached: bool = False,
+    ) -> dict:
+        """
+            Record the usage and the latency of one call to the model, cached calls were answered by the response cache
+        """
+        record = {
+            "model": model,
+            "recipe": recipe,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "wall_time": round(wall_time, 4),
+            "retries": retries,
+            "success": success,
+            "cached": cached,
+        }
+        self.add(record)
+        logger.stat_tokens(**record)
+        return record
+
+    def add(self, record: dict) -> None:
+        """
+            Add a record to the in-memory histograms
+        """
+        key = (record.get("recipe") or "", record.get("model") or "")
+        with self.__lock:
+            group = self.__groups.get(key)
+            if group is None:
+                group = self.__groups[key] = MetricsGroup()
+            group.add(record)
+
+    def summary(self) -> dict:
+        """
+            Get the aggregated metrics, keyed by (recipe, model)
+        """
+        with self.__lock:
+            return {key: group.to_dict() for key, group in self.__groups.items()}
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__groups = {}
+
+
+def read_stats_records(path: str):
+    """
+        Read the JSON records of a stats log and its rotated segments, the other lines are skipped
+    """
+    rotated = logger.get_rotated_segments(path)
+    for segment in rotated + [path]:
+        if not os.path.exists(segment):
+            continue
+        opener = gzip.open if segment.endswith(".gz") else open
+        try:
+            with opener(segment, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line.startswith("{"):
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except Exception as e:
+            logger.error(__name__, "(read_stats_records) Error reading %s: %s", segment, e)
+
+
+def build_stats_report(path: str = None) -> str:
+    """
+        Aggregate the LLM calls recorded in stats.log into a plain text table
+    """
+    path = path or logger.STATS_FILE_LOCATION
+    aggregated = {}
+    for record in read_stats_records(path):
+        key = (record.get("recipe") or "", record.get("model") or "")
+        aggregated.setdefault(key, MetricsGroup()).add(record)
+    if not aggregated:
+        return f"No LLM calls recorded in {path}"
+
+    header = f"{'recipe':<18}{'model':<22}{'calls':>7}{'errors':>8}{'retries':>9}{'cached':>8}{'prompt tk':>11}{'compl tk':>10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+    lines = [header, "-" * len(header)]
+    for (recipe, model), group in sorted(aggregated.items()):
+        data = group.to_dict()
+        lines.append(
+            f"{recipe[:17]:<18}{model[:21]:<22}{data['calls']:>7}{data['errors']:>8}{data['retries']:>9}{data['cached']:>8}"
+            f"{data['prompt_tokens']:>11}{data['completion_tokens']:>10}"
+            f"{data['p50']:>8.2f}{data['p95']:>8.2f}{data['p99']:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(build_stats_report(sys.argv[1] if len(sys.argv) > 1 else None))